@@ -1,10 +1,32 @@
 # github_pages/app.py
 
 import os
+import gzip
+import zlib
+import codecs
 import json
+import time
 import threading
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, Response, render_template, request, jsonify, send_from_directory, stream_with_context
 from datetime import datetime
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.wsgi import LimitedStream
+
+try:
+    from github_pages.serving import serve, resolve_mode
+    from github_pages.jobs import JobManager, JobQueueFull, TooManyStreams, request_key
+    from github_pages.response_cache import ResponseCache
+    from github_pages.push import PushChannel, concat_text, concat_lists
+except ImportError:
+    from serving import serve, resolve_mode
+    from jobs import JobManager, JobQueueFull, TooManyStreams, request_key
+    from response_cache import ResponseCache
+    from push import PushChannel, concat_text, concat_lists
+
+try:
+    from processing.manuscript_analyzer import ManuscriptAnalysis
+except ImportError:
+    from src.processing.manuscript_analyzer import ManuscriptAnalysis
 
 app = Flask(__name__, 
            static_folder='static',
@@ -18,21 +40,44 @@ class GitHubPagesApp:
         self.conversation_history = []
         self.is_running = False
         
-    def start_server(self, host='0.0.0.0', port=5000):
-        """Start the GitHub Pages Flask server"""
-        print(f"🌐 Starting GitHub Pages interface on port {port}...")
+        # Generation runs here, off the request threads
+        self.jobs = JobManager(listener=self._on_job_event)
+        
+        # Socket.IO push of progress, history and job completions; attached to the app with the routes
+        self.push = PushChannel()
+        if memory_system:
+            memory_system.listeners.append(self._on_history)
+        
+        # ETag/304 handling for the endpoints clients poll
+        self.response_cache = ResponseCache(ttl=2.0)
+        
+        # Largest manuscript /api/analyze accepts, both as sent and after gunzip
+        self.max_analyze_bytes = 64 * 2 ** 20
+        
+        # Tile pyramids written by the world map engine
+        images_dir = content_generator.images_dir if content_generator else "outputs/images"
+        self.maps_dir = os.path.join(images_dir, 'maps')
+        
+    def start_server(self, host='0.0.0.0', port=5000, mode='development', threads=16):
+        """Start the GitHub Pages Flask server; mode is 'development' or 'production'"""
+        print(f"🌐 Starting GitHub Pages interface on port {port} ({mode} mode)...")
         
         try:
-            # Set up routes
-            self._setup_routes()
+            # Set up routes; push is development-only, since waitress can't upgrade to websockets
+            # and production clients follow state by polling the REST endpoints
+            mode = resolve_mode(mode)
+            self._setup_routes(push=(mode == 'development'))
+            # Event streams may take a quarter of the request threads, never all of them
+            self.jobs.max_streams = max(1, threads // 4)
             
             # Start in background thread
             server_thread = threading.Thread(
-                target=lambda: app.run(
-                    host=host, 
-                    port=port, 
-                    debug=False, 
-                    use_reloader=False
+                target=lambda: serve(
+                    app,
+                    host=host,
+                    port=port,
+                    mode=mode,
+                    threads=threads
                 )
             )
             server_thread.daemon = True
@@ -46,8 +91,9 @@ class GitHubPagesApp:
             print(f"❌ GitHub Pages failed: {e}")
             return False
 
-    def _setup_routes(self):
+    def _setup_routes(self, push: bool = True):
         """Set up all Flask routes"""
+        self.push.init_app(app, websocket=push)
         
         @app.route('/')
         def index():
@@ -57,12 +103,17 @@ class GitHubPagesApp:
         @app.route('/api/status')
         def api_status():
             """API status endpoint"""
-            return jsonify({
+            jobs = self.jobs.get_stats()
+            return self.response_cache.respond('status', (self._memory_version(), self._learning_version(),
+                                                          tuple(sorted(jobs.items()))), lambda: {
                 'status': 'running',
                 'service': 'RawAI GitHub Pages',
                 'timestamp': datetime.now().isoformat(),
                 'memory_entries': len(self.memory_system.conversation_history) if self.memory_system else 0,
-                'learning_files': len(self.learning_system.knowledge_base) if self.learning_system else 0
+                'learning_files': len(self.learning_system.knowledge_base) if self.learning_system else 0,
+                'memory_writes': self.memory_system.get_write_stats() if self.memory_system else None,
+                'push': self.push.get_stats(),
+                'jobs': jobs
             })
         
         @app.route('/api/sync', methods=['POST'])
@@ -73,10 +124,11 @@ class GitHubPagesApp:
                 print(f"📥 Received sync data: {data.get('type', 'unknown')}")
                 
                 if self.memory_system:
-                    self.memory_system.store_interaction(
+                    self.memory_system.log_interaction(
                         user_input=f"Extension sync: {data.get('type', 'unknown')}",
                         ai_response="Data received and processed",
-                        metadata=data
+                        metadata=data,
+                        source='extension'
                     )
                 
                 return jsonify({'status': 'success', 'message': 'Data synced'})
@@ -84,9 +136,28 @@ class GitHubPagesApp:
             except Exception as e:
                 return jsonify({'status': 'error', 'message': str(e)})
         
+        @app.route('/api/sync/batch', methods=['POST'])
+        def api_sync_batch():
+            """Many extension events in one request: a JSON array or NDJSON, optionally gzip-encoded"""
+            try:
+                events, errors = self._read_sync_batch()
+            except ValueError as e:
+                return jsonify({'status': 'error', 'message': str(e)}), 400
+            
+            if self.memory_system and events:
+                # One queue entry, so the whole batch lands in a single storage write
+                self.memory_system.log_interactions([
+                    (f"Extension sync: {event.get('type', 'unknown')}", "Data received and processed", event, 'extension')
+                    for event in events
+                ])
+            
+            print(f"📥 Received sync batch: {len(events)} events, {len(errors)} rejected")
+            return jsonify({'status': 'success' if not errors else 'partial', 'accepted': len(events),
+                            'rejected': len(errors), 'errors': errors[:100]})
+        
         @app.route('/api/generate', methods=['POST'])
         def api_generate():
-            """Generate content via API"""
+            """Queue a generation job; pass "wait": true to block for the result as before"""
             try:
                 data = request.get_json()
                 prompt = data.get('prompt', '')
@@ -94,41 +165,96 @@ class GitHubPagesApp:
                 
                 print(f"🎨 Generation request: {content_type}")
                 
-                # Store in memory
+                # Logged by the memory writer thread, off the request path
                 if self.memory_system:
-                    self.memory_system.store_interaction(
+                    self.memory_system.log_interaction(
                         user_input=f"API generation: {prompt}",
                         ai_response=f"Generating {content_type} content",
-                        metadata=data
+                        metadata=data,
+                        source='pages'
                     )
                 
-                # Generate content based on type
-                if content_type == 'story':
-                    result = self._generate_story_content(prompt, data)
-                elif content_type == 'code':
-                    result = self._generate_code_content(prompt, data)
-                else:
-                    result = self._generate_text_content(prompt, data)
+                # Identical requests already in flight share that job's result
+                job = self.jobs.submit(content_type, lambda job: self._run_generation(job, prompt, content_type, data),
+                                       params={'prompt': prompt, 'type': content_type}, key=request_key(data))
                 
-                return jsonify({'status': 'success', 'result': result})
+                if data.get('wait'):
+                    job.wait(timeout=float(data.get('timeout', 300)))
+                    if job.status == 'completed':
+                        return jsonify({'status': 'success', 'result': job.result, 'job_id': job.id})
+                    if job.status == 'failed':
+                        return jsonify({'status': 'error', 'message': job.error, 'job_id': job.id})
                 
+                return jsonify({
+                    'status': 'accepted',
+                    'job_id': job.id,
+                    'status_url': f"/api/jobs/{job.id}",
+                    'events_url': f"/api/jobs/{job.id}/events"
+                }), 202
+                
+            except JobQueueFull as e:
+                return jsonify({'status': 'error', 'message': f"Generation queue is full: {e}"}), 503, {'Retry-After': '5'}
             except Exception as e:
                 return jsonify({'status': 'error', 'message': str(e)})
         
+        @app.route('/api/jobs/<job_id>', methods=['GET'])
+        def api_job(job_id):
+            """Poll a generation job: status, progress, output streamed so far, and the result when done"""
+            job = self.jobs.get(job_id)
+            if job is None:
+                return jsonify({'status': 'error', 'message': 'Job not found'}), 404
+            return jsonify({'status': 'success', 'job': job.to_dict(include_chunks=True)})
+        
+        @app.route('/api/jobs/<job_id>/events', methods=['GET'])
+        def api_job_events(job_id):
+            """Server-sent events for a job; reconnecting with Last-Event-ID resumes where it left off"""
+            job = self.jobs.get(job_id)
+            if job is None:
+                return jsonify({'status': 'error', 'message': 'Job not found'}), 404
+            try:
+                after = int(request.headers.get('Last-Event-ID') or request.args.get('after', 0))
+            except ValueError:
+                after = -1
+            if after < 0:
+                return jsonify({'status': 'error', 'message': 'Last-Event-ID must be a non-negative integer'}), 400
+            try:
+                release = self.jobs.reserve_stream()
+            except TooManyStreams as e:
+                return jsonify({'status': 'error', 'message': f"{e}; poll /api/jobs/{job_id} instead"}), 503, {'Retry-After': '5'}
+            response = Response(stream_with_context(self.jobs.events(job, after)), mimetype='text/event-stream',
+                                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+            # The server closes the response however the stream ends, even if it never started
+            response.call_on_close(release)
+            return response
+        
         @app.route('/api/analyze', methods=['POST'])
         def api_analyze():
-            """Analyze content via API"""
+            """Analyze content via API.
+
+            Either JSON {"content", "analysis_type"}, or the raw text as the body (any
+            non-JSON type, chunked or gzip-encoded) with ?analysis_type=...; raw bodies
+            are analyzed as they arrive and never held in memory whole.
+            """
+            limit = self.max_analyze_bytes
             try:
-                data = request.get_json()
-                content = data.get('content', '')
-                analysis_type = data.get('analysis_type', 'general')
-                
-                print(f"🔍 Analysis request: {analysis_type}")
-                
-                analysis_result = self._analyze_content(content, analysis_type)
+                stream = self._request_body_stream(max_bytes=limit)
+                if request.mimetype == 'application/json':
+                    body = stream.read(limit + 1)
+                    if len(body) > limit:
+                        raise RequestEntityTooLarge(f"Body larger than {limit} bytes after decompression")
+                    data = json.loads(body or b'{}')
+                    analysis_type = data.get('analysis_type', 'general')
+                    print(f"🔍 Analysis request: {analysis_type}")
+                    analysis_result = self._analyze_content(data.get('content', ''), analysis_type)
+                else:
+                    analysis_type = request.args.get('analysis_type', 'general')
+                    print(f"🔍 Streaming analysis request: {analysis_type}")
+                    analysis_result = self._analyze_stream(stream, analysis_type, max_bytes=limit)
                 
                 return jsonify({'status': 'success', 'analysis': analysis_result})
                 
+            except RequestEntityTooLarge as e:
+                return jsonify({'status': 'error', 'message': e.description}), 413
             except Exception as e:
                 return jsonify({'status': 'error', 'message': str(e)})
         
@@ -137,8 +263,10 @@ class GitHubPagesApp:
             """Get training data statistics"""
             try:
                 if self.learning_system:
-                    stats = self.learning_system.get_knowledge_base_stats()
-                    return jsonify({'status': 'success', 'stats': stats})
+                    # Scans are not versioned, so the learning stats also expire every 30 seconds
+                    version = (self._learning_version(), int(time.time() // 30))
+                    return self.response_cache.respond('training', version, lambda: {
+                        'status': 'success', 'stats': self.learning_system.get_knowledge_base_stats()})
                 else:
                     return jsonify({'status': 'error', 'message': 'Learning system not available'})
                     
@@ -147,11 +275,32 @@ class GitHubPagesApp:
         
         @app.route('/api/conversation/history', methods=['GET'])
         def api_conversation_history():
-            """Get conversation history"""
+            """Conversation history, newest page first; page with ?before=<id> or ?after=<id>.
+
+            Also takes limit (max 500), source, since/until (ISO timestamps) and
+            fields (comma-separated, or 'all' to include metadata).
+            """
             try:
                 if self.memory_system:
-                    history = self.memory_system.get_conversation_context(50)
-                    return jsonify({'status': 'success', 'history': history})
+                    args = request.args
+                    fields = args.get('fields')
+                    page_args = {
+                        'limit': max(1, min(500, args.get('limit', 50, type=int))),
+                        'before': args.get('before', type=int),
+                        'after': args.get('after', type=int),
+                        'source': args.get('source'),
+                        'since': args.get('since'),
+                        'until': args.get('until')
+                    }
+                    if fields:
+                        page_args['fields'] = None if fields == 'all' else fields.split(',')
+                    
+                    def build():
+                        page = self.memory_system.get_conversation_page(**page_args)
+                        return dict(page, status='success', history=page.pop('entries'))
+                    
+                    name = f"history?{request.query_string.decode('latin-1')}"
+                    return self.response_cache.respond(name, self._memory_version(), build)
                 else:
                     return jsonify({'status': 'error', 'message': 'Memory system not available'})
                     
@@ -161,20 +310,155 @@ class GitHubPagesApp:
         @app.route('/api/extension/status', methods=['GET'])
         def api_extension_status():
             """Get browser extension status"""
-            return jsonify({
+            return self.response_cache.respond('extension', '1.0.0', lambda: {
                 'status': 'connected',
                 'extension': 'RawAI Creator',
                 'version': '1.0.0',
                 'timestamp': datetime.now().isoformat()
             })
         
+        @app.route('/api/maps', methods=['GET'])
+        def api_maps():
+            """List generated world maps and their render progress"""
+            try:
+                return jsonify({'status': 'success', 'maps': self._list_maps()})
+            except Exception as e:
+                return jsonify({'status': 'error', 'message': str(e)})
+        
+        @app.route('/api/maps/<map_id>', methods=['GET'])
+        def api_map(map_id):
+            """Metadata for one map; levels_ready grows while it renders"""
+            metadata = self._load_map_metadata(map_id)
+            if metadata is None:
+                return jsonify({'status': 'error', 'message': 'Map not found'}), 404
+            return jsonify({'status': 'success', 'map': metadata})
+        
+        @app.route('/maps/<map_id>/tiles/<int:z>/<int:x>/<int:y>.png')
+        def map_tile(map_id, z, x, y):
+            """Serve one tile of a map pyramid"""
+            tiles_dir = os.path.join(self.maps_dir, os.path.basename(map_id), 'tiles')
+            return send_from_directory(os.path.abspath(tiles_dir), f"{z}/{x}/{y}.png", max_age=86400)
+        
+        @app.route('/maps/<map_id>')
+        def map_viewer(map_id):
+            """Zoomable viewer that picks up new zoom levels as they finish rendering"""
+            metadata = self._load_map_metadata(map_id)
+            if metadata is None:
+                return jsonify({'status': 'error', 'message': 'Map not found'}), 404
+            return MAP_VIEWER_HTML.replace('{{MAP_ID}}', metadata['id'])
+        
         # Static file serving
         @app.route('/static/<path:filename>')
         def static_files(filename):
             return send_from_directory(app.static_folder, filename)
 
-    def _generate_story_content(self, prompt: str, data: dict) -> dict:
-        """Generate story content"""
+    def _request_body_stream(self, max_bytes: int = None):
+        """The raw request body, transparently gunzipped when sent with Content-Encoding: gzip.
+
+        With max_bytes, reading more than that many bytes off the wire (chunked bodies
+        included) raises RequestEntityTooLarge; the decompressed size is the caller's to bound.
+        """
+        stream = request.stream
+        if max_bytes is not None:
+            if request.content_length is not None and request.content_length > max_bytes:
+                raise RequestEntityTooLarge(f"Body larger than {max_bytes} bytes")
+            stream = LimitedStream(stream, max_bytes, is_max=True)
+        encoding = request.headers.get('Content-Encoding', '').lower()
+        if encoding == 'gzip':
+            return gzip.GzipFile(fileobj=stream)
+        if encoding not in ('', 'identity'):
+            raise ValueError(f"Unsupported Content-Encoding: {encoding}")
+        return stream
+
+    def _read_sync_batch(self, max_bytes: int = 16 * 2 ** 20, max_events: int = 10000) -> tuple:
+        """Decode and validate a batch body in one pass; returns (events, errors)"""
+        stream = self._request_body_stream()
+        
+        # Bounded read, so a small gzip body can't inflate without limit
+        try:
+            body = stream.read(max_bytes + 1)
+        except (OSError, EOFError, zlib.error) as e:
+            raise ValueError(f"Bad gzip body: {e}")
+        if len(body) > max_bytes:
+            raise ValueError(f"Batch larger than {max_bytes} bytes")
+        
+        if 'ndjson' in request.mimetype or 'jsonlines' in request.mimetype:
+            records = []
+            for number, line in enumerate(body.splitlines(), 1):
+                if line.strip():
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError as e:
+                        records.append(ValueError(f"line {number}: {e}"))
+        else:
+            try:
+                records = json.loads(body or b'[]')
+            except ValueError as e:
+                raise ValueError(f"Invalid JSON: {e}")
+            if isinstance(records, dict):
+                records = records.get('events', [])
+            if not isinstance(records, list):
+                raise ValueError("Expected an array of events")
+        if len(records) > max_events:
+            raise ValueError(f"More than {max_events} events in one batch")
+        
+        events, errors = [], []
+        for index, record in enumerate(records):
+            if isinstance(record, Exception):
+                errors.append({'index': index, 'error': str(record)})
+            elif not isinstance(record, dict):
+                errors.append({'index': index, 'error': 'event must be an object'})
+            elif not isinstance(record.get('type', ''), str):
+                errors.append({'index': index, 'error': "'type' must be a string"})
+            else:
+                events.append(record)
+        return events, errors
+
+    def _on_history(self, entries: list):
+        """Push new history entries (without metadata) and the updated counts"""
+        self.push.publish('history', 'history', {'entries': [
+            {field: entry.get(field) for field in ('id', 'timestamp', 'input', 'response', 'source')}
+            for entry in entries
+        ]}, merge=concat_lists('entries'))
+        self._publish_status()
+
+    def _on_job_event(self, job, name: str, data: dict):
+        """Mirror job events into the job's room; completions also go to the shared jobs feed"""
+        room = f"job:{job.id}"
+        if name == 'chunk':
+            self.push.publish(room, 'chunk', data, merge=concat_text)
+        else:
+            self.push.publish(room, name, dict(data, id=job.id))
+        if name in ('completed', 'failed'):
+            self.push.publish('jobs', 'jobs_finished', {'jobs': [{'id': job.id, 'kind': job.kind, 'status': name}]},
+                              merge=concat_lists('jobs'))
+            self._publish_status()
+
+    def _publish_status(self):
+        self.push.publish('status', 'status', {
+            'memory_entries': len(self.memory_system.conversation_history) if self.memory_system else 0,
+            'memory_version': self._memory_version(),
+            'jobs': self.jobs.get_stats()
+        })
+
+    def _memory_version(self) -> int:
+        return self.memory_system.version if self.memory_system else 0
+
+    def _learning_version(self) -> int:
+        return len(self.learning_system.knowledge_base) if self.learning_system else 0
+
+    def _run_generation(self, job, prompt: str, content_type: str, data: dict) -> dict:
+        """Job body for /api/generate"""
+        job.update(0.05, f"Generating {content_type} content")
+        if content_type == 'story':
+            return self._generate_story_content(prompt, data, job)
+        elif content_type == 'code':
+            return self._generate_code_content(prompt, data)
+        else:
+            return self._generate_text_content(prompt, data, job)
+
+    def _generate_story_content(self, prompt: str, data: dict, job=None) -> dict:
+        """Generate story content, reporting per-chapter progress and chapters to the job"""
         story_data = {
             'genre_info': data.get('genre', 'fantasy'),
             'story_description': prompt,
@@ -184,7 +468,7 @@ class GitHubPagesApp:
         }
         
         if self.content_generator:
-            result = self.content_generator.generate_novel_content(story_data)
+            result = self.content_generator.generate_novel_content(story_data, job=job)
             return {
                 'type': 'story',
                 'content': result,
@@ -210,8 +494,29 @@ class GitHubPagesApp:
             'complexity': 'medium'
         }
 
-    def _generate_text_content(self, prompt: str, data: dict) -> dict:
-        """Generate general text content"""
+    def _generate_text_content(self, prompt: str, data: dict, job=None) -> dict:
+        """Generate general text content, streaming it to the job as it is sampled"""
+        if self.content_generator:
+            max_tokens = int(data.get('max_tokens', 400))
+            tokens, pending = [], []
+            for token in self.content_generator.text_engine.stream(prompt, max_tokens=max_tokens):
+                tokens.append(token)
+                pending.append(token)
+                # Send whole words in small batches rather than single characters
+                if job and len(pending) >= 32 and token.isspace():
+                    job.emit(''.join(pending))
+                    job.update(len(tokens) / max_tokens)
+                    pending = []
+            if job and pending:
+                job.emit(''.join(pending))
+            content = ''.join(tokens).strip()
+            return {
+                'type': 'text',
+                'content': content,
+                'word_count': len(content.split()),
+                'tone': data.get('tone', 'professional')
+            }
+        
         return {
             'type': 'text',
             'content': f"Generated content based on your request: {prompt}\n\nThis is AI-generated content created by the RawAI system.",
@@ -221,30 +526,81 @@ class GitHubPagesApp:
 
     def _analyze_content(self, content: str, analysis_type: str) -> dict:
         """Analyze content"""
-        word_count = len(content.split())
-        char_count = len(content)
-        
+        stats = ManuscriptAnalysis()
+        stats.feed(content)
+        return self._analysis_result(stats.close(), analysis_type)
+
+    def _analyze_stream(self, stream, analysis_type: str, chunk_size: int = 65536, max_bytes: int = None) -> dict:
+        """Analyze a byte stream chunk by chunk; UTF-8 sequences split across chunks are reassembled"""
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        stats = ManuscriptAnalysis()
+        total = 0
+        while True:
+            block = stream.read(chunk_size)
+            if not block:
+                break
+            total += len(block)
+            if max_bytes is not None and total > max_bytes:
+                raise RequestEntityTooLarge(f"Body larger than {max_bytes} bytes after decompression")
+            stats.feed(decoder.decode(block))
+        stats.feed(decoder.decode(b'', final=True))
+        return self._analysis_result(stats.close(), analysis_type)
+
+    def _analysis_result(self, stats: ManuscriptAnalysis, analysis_type: str) -> dict:
+        result = stats.result()
         analysis = {
-            'word_count': word_count,
-            'character_count': char_count,
+            'word_count': result['word_count'],
+            'character_count': result['character_count'],
+            'sentence_count': result['sentence_count'],
             'analysis_type': analysis_type,
             'timestamp': datetime.now().isoformat()
         }
         
         if analysis_type == 'sentiment':
-            analysis['sentiment'] = 'neutral'
-            analysis['confidence'] = 0.8
+            for key in ('sentiment', 'confidence', 'sentiment_score', 'positive_weight',
+                        'negative_weight', 'sentiment_arc'):
+                analysis[key] = result[key]
             
         elif analysis_type == 'complexity':
-            analysis['readability'] = 'medium'
-            analysis['grade_level'] = 'high_school'
+            ease = result['flesch_reading_ease']
+            analysis['readability'] = 'easy' if ease >= 70 else 'medium' if ease >= 50 else 'difficult'
+            analysis['grade_level'] = result['grade_level']
+            for key in ('flesch_reading_ease', 'flesch_kincaid_grade', 'gunning_fog',
+                        'average_sentence_length', 'average_word_length', 'syllables_per_word'):
+                analysis[key] = result[key]
             
         elif analysis_type == 'topics':
-            analysis['topics'] = ['ai', 'content', 'generation']
-            analysis['key_phrases'] = content.split()[:5]
+            analysis['topics'] = result['topics']
+            analysis['key_phrases'] = result['key_phrases']
+            analysis['topic_scores'] = result['topic_scores']
+            analysis['topic_counts'] = result['topic_counts']
+            
+        elif analysis_type == 'full':
+            analysis.update(result)
             
         return analysis
 
+    def _list_maps(self) -> list:
+        """Metadata of every map under maps_dir, newest first"""
+        if not os.path.isdir(self.maps_dir):
+            return []
+        maps = []
+        for map_id in sorted(os.listdir(self.maps_dir), reverse=True):
+            metadata = self._load_map_metadata(map_id)
+            if metadata:
+                maps.append({key: metadata[key] for key in
+                             ('id', 'title', 'max_zoom', 'levels_ready', 'status', 'created_at')})
+        return maps
+
+    def _load_map_metadata(self, map_id: str):
+        """Read map.json for one map, or None when it does not exist"""
+        path = os.path.join(self.maps_dir, os.path.basename(map_id), 'map.json')
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
     def open_in_browser(self, port=5000):
         """Open GitHub Pages in browser"""
         import webbrowser
@@ -252,6 +608,49 @@ class GitHubPagesApp:
         print(f"🔗 Opening GitHub Pages: {url}")
         webbrowser.open(url)
 
+MAP_VIEWER_HTML = """<!DOCTYPE html>
+<html>
+<head>
+  <meta charset="utf-8">
+  <title>RawAI Map Viewer</title>
+  <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css">
+  <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
+  <style>html, body, #map { height: 100%; margin: 0; background: #0a1e50; }</style>
+</head>
+<body>
+<div id="map"></div>
+<script>
+  const mapId = '{{MAP_ID}}';
+  const view = L.map('map', {crs: L.CRS.Simple, minZoom: 0});
+  let layer = null;
+
+  function refresh() {
+    fetch('/api/maps/' + mapId).then(r => r.json()).then(data => {
+      const meta = data.map;
+      const ready = meta.levels_ready - 1;
+      if (ready < 0) { return setTimeout(refresh, 1000); }
+      if (!layer) {
+        const size = meta.tile_size;
+        view.setMaxBounds([[-size, 0], [0, size]]);
+        view.setView([-size / 2, size / 2], 0);
+        view.setMaxZoom(meta.max_zoom + 2);
+        layer = L.tileLayer('/maps/' + mapId + '/tiles/{z}/{x}/{y}.png',
+                            {tileSize: size, noWrap: true, maxNativeZoom: ready,
+                             bounds: [[-size, 0], [0, size]]}).addTo(view);
+      } else if (layer.options.maxNativeZoom !== ready) {
+        // Finer levels become available progressively while the map renders
+        layer.options.maxNativeZoom = ready;
+        layer.redraw();
+      }
+      if (meta.status !== 'completed') { setTimeout(refresh, 2000); }
+    });
+  }
+  refresh();
+</script>
+</body>
+</html>
+"""
+
 # Global instance
 github_pages_app = GitHubPagesApp()
 
@@ -0,0 +1,240 @@
+# github_pages/jobs.py
+
+import re
+import json
+import time
+import uuid
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Callable, Iterator, Tuple
+
+FINISHED = ('completed', 'failed')
+
+# Request fields that only affect delivery, never the generated output
+TRANSPORT_FIELDS = ('wait', 'timeout', 'client', 'client_id', 'request_id', 'timestamp', 'source')
+
+
+def request_key(data: Dict[str, Any], ignore: Tuple[str, ...] = TRANSPORT_FIELDS) -> str:
+    """Hash of a request with whitespace collapsed and delivery-only fields dropped"""
+    def normalize(value):
+        if isinstance(value, str):
+            return re.sub(r'\s+', ' ', value).strip()
+        if isinstance(value, dict):
+            return {key: normalize(item) for key, item in value.items() if key not in ignore}
+        if isinstance(value, list):
+            return [normalize(item) for item in value]
+        return value
+
+    canonical = normalize(data)
+    if isinstance(canonical.get('type'), str):
+        canonical['type'] = canonical['type'].lower()
+    return hashlib.sha1(json.dumps(canonical, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class TooManyStreams(Exception):
+    pass
+
+
+class Job:
+    """One background generation; every state change is also appended as an event for SSE replay"""
+
+    def __init__(self, kind: str, params: Optional[Dict] = None, key: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params or {}
+        self.key = key
+        self.requests = 1
+        self.status = 'queued'
+        self.progress = 0.0
+        self.message = ''
+        self.result = None
+        self.error = None
+        self.created_at = datetime.now().isoformat()
+        self.finished_at: Optional[float] = None
+        self.events: List[Tuple[str, Dict[str, Any]]] = []
+        self.changed = threading.Condition()
+        self.listener: Optional[Callable[['Job', str, Dict[str, Any]], None]] = None
+
+    def update(self, progress: Optional[float] = None, message: str = ''):
+        """Report progress between 0 and 1 from inside the job function"""
+        with self.changed:
+            if progress is not None:
+                self.progress = max(0.0, min(1.0, progress))
+            self.message = message or self.message
+            self._event('progress', {'progress': round(self.progress, 3), 'message': self.message})
+
+    def emit(self, chunk: str):
+        """Stream a piece of output to subscribers as soon as it exists"""
+        with self.changed:
+            self._event('chunk', {'text': chunk})
+
+    def _start(self):
+        with self.changed:
+            self.status = 'running'
+            self._event('progress', {'progress': 0.0, 'message': 'started'})
+
+    def _finish(self, result: Any = None, error: Optional[str] = None):
+        with self.changed:
+            self.status = 'failed' if error else 'completed'
+            self.progress = 1.0 if not error else self.progress
+            self.result, self.error = result, error
+            self.finished_at = time.time()
+            self._event(self.status, {'result': result} if not error else {'error': error})
+
+    def _event(self, name: str, data: Dict[str, Any]):
+        self.events.append((name, data))
+        self.changed.notify_all()
+        if self.listener:
+            self.listener(self, name, data)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        with self.changed:
+            return self.changed.wait_for(lambda: self.status in FINISHED, timeout)
+
+    def to_dict(self, include_chunks: bool = False) -> Dict[str, Any]:
+        job = {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': round(self.progress, 3),
+            'message': self.message,
+            'created_at': self.created_at,
+            'requests': self.requests,
+            'events': len(self.events)
+        }
+        if self.status == 'completed':
+            job['result'] = self.result
+        if self.error:
+            job['error'] = self.error
+        if include_chunks:
+            job['output'] = ''.join(data['text'] for name, data in self.events if name == 'chunk')
+        return job
+
+
+class JobManager:
+    """Runs jobs on a bounded pool so request threads never wait on generation.
+
+    Jobs submitted with a key are single-flight: while one with that key is queued
+    or running, identical submissions attach to it instead of starting new work.
+
+    An event stream holds a server thread for the whole job, so at most max_streams
+    are open at once; the rest of the server's threads stay free for other requests.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 32, ttl: float = 3600, max_jobs: int = 1000,
+                 max_streams: int = 4, listener: Optional[Callable[[Job, str, Dict[str, Any]], None]] = None):
+        self.listener = listener
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self.jobs: Dict[str, Job] = {}
+        self.inflight: Dict[str, Job] = {}
+        self.pending = 0
+        self.max_streams = max_streams
+        self.streams = 0
+        self.lock = threading.Lock()
+        self.stats = {'submitted': 0, 'coalesced': 0, 'rejected': 0, 'completed': 0, 'failed': 0,
+                      'streams_rejected': 0}
+
+    def submit(self, kind: str, fn: Callable[[Job], Any], params: Optional[Dict] = None,
+               key: Optional[str] = None) -> Job:
+        """Queue fn(job), or return the in-flight job with the same key.
+
+        Raises JobQueueFull when max_pending jobs are already waiting or running.
+        """
+        with self.lock:
+            running = self.inflight.get(key) if key else None
+            if running is not None:
+                running.requests += 1
+                self.stats['coalesced'] += 1
+                return running
+            if self.pending >= self.max_pending:
+                self.stats['rejected'] += 1
+                raise JobQueueFull(f"{self.pending} jobs already pending")
+            self._expire()
+            job = Job(kind, params, key)
+            job.listener = self.listener
+            self.jobs[job.id] = job
+            if key:
+                self.inflight[key] = job
+            self.pending += 1
+            self.stats['submitted'] += 1
+        self.executor.submit(self._run, job, fn)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def reserve_stream(self) -> Callable[[], None]:
+        """Take an event-stream slot and return the function that frees it.
+
+        Raises TooManyStreams when max_streams streams are already open.
+        """
+        with self.lock:
+            if self.streams >= self.max_streams:
+                self.stats['streams_rejected'] += 1
+                raise TooManyStreams(f"{self.streams} event streams already open")
+            self.streams += 1
+
+        def release():
+            with self.lock:
+                self.streams -= 1
+        return release
+
+    def events(self, job: Job, after: int = 0, heartbeat: float = 15.0) -> Iterator[str]:
+        """Server-sent events from event number `after` until the job finishes"""
+        position = after
+        while True:
+            with job.changed:
+                if position >= len(job.events) and job.status not in FINISHED:
+                    job.changed.wait(heartbeat)
+                pending = job.events[position:]
+                finished = job.status in FINISHED
+            if not pending:
+                if finished:
+                    return
+                # Comment lines keep proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+                continue
+            for name, data in pending:
+                position += 1
+                yield f"id: {position}\nevent: {name}\ndata: {json.dumps(data, default=str)}\n\n"
+
+    def _run(self, job: Job, fn: Callable[[Job], Any]):
+        job._start()
+        try:
+            result, error = fn(job), None
+            self.stats['completed'] += 1
+        except Exception as e:
+            print(f"❌ Job {job.id} ({job.kind}) failed: {e}")
+            result, error = None, str(e)
+            self.stats['failed'] += 1
+        # Leave the single-flight table before waking waiters, so later requests start fresh work
+        with self.lock:
+            if job.key and self.inflight.get(job.key) is job:
+                del self.inflight[job.key]
+            self.pending -= 1
+        job._finish(result=result, error=error)
+
+    def _expire(self):
+        """Forget finished jobs past their TTL, and the oldest finished ones beyond max_jobs"""
+        now = time.time()
+        finished = [job for job in self.jobs.values() if job.finished_at is not None]
+        for job in finished:
+            if now - job.finished_at > self.ttl:
+                del self.jobs[job.id]
+        overflow = len(self.jobs) - self.max_jobs
+        if overflow > 0:
+            for job in sorted((j for j in finished if j.id in self.jobs), key=lambda j: j.finished_at)[:overflow]:
+                del self.jobs[job.id]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats, pending=self.pending, inflight=len(self.inflight), tracked=len(self.jobs),
+                    streams=self.streams)
@@ -0,0 +1,121 @@
+# github_pages/push.py
+
+import time
+import threading
+from typing import Dict, Any, Callable, Tuple
+
+try:
+    from flask_socketio import SocketIO, emit, join_room, leave_room
+    SOCKETIO_AVAILABLE = True
+except ImportError:
+    SOCKETIO_AVAILABLE = False
+
+# Rooms clients may join: global feeds plus one room per job ("job:<id>")
+ROOMS = ('status', 'history', 'jobs')
+
+
+def latest(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    return new
+
+
+def concat_text(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    return dict(new, text=old['text'] + new['text'])
+
+
+def concat_lists(field: str) -> Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]:
+    return lambda old, new: {field: old[field] + new[field]}
+
+
+class PushChannel:
+    """Socket.IO fan-out of state changes to subscribed rooms.
+
+    publish() only records the message; a flusher thread emits every `interval`
+    seconds, so a burst of updates to the same room and event goes out as one
+    message (merged by the publisher's merge function, latest-wins by default).
+
+    Push is a development-server feature. Only the websocket transport is offered
+    (a long-polling client would hold a server thread per open poll), and of the
+    serving modes only Werkzeug's development server upgrades connections; waitress,
+    the production server, cannot. In production, or without flask-socketio, every
+    method is a no-op and the REST endpoints (ETag/304 polling) remain the supported
+    way to follow state.
+    """
+
+    def __init__(self, app=None, interval: float = 0.25):
+        self.interval = interval
+        self.pending: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.socketio = None
+        self.flusher = None
+        self.stats = {'published': 0, 'emitted': 0, 'clients': 0}
+        if app is not None:
+            self.init_app(app)
+
+    @property
+    def enabled(self) -> bool:
+        return self.socketio is not None
+
+    def init_app(self, app, websocket: bool = True):
+        """Attach to `app`; pass websocket=False when the WSGI server can't upgrade connections"""
+        if not SOCKETIO_AVAILABLE:
+            print("⚠️ flask-socketio not installed; push channel disabled, clients keep polling")
+            return
+        if not websocket:
+            print("⚠️ Server can't upgrade to websockets; push channel disabled, clients keep polling")
+            return
+        self.socketio = SocketIO(app, async_mode='threading', cors_allowed_origins='*', transports=['websocket'])
+
+        @self.socketio.on('connect')
+        def on_connect(auth=None):
+            self.stats['clients'] += 1
+            # Everyone gets status changes without asking
+            join_room('status')
+
+        @self.socketio.on('disconnect')
+        def on_disconnect(*args):
+            self.stats['clients'] -= 1
+
+        @self.socketio.on('subscribe')
+        def on_subscribe(data):
+            room = (data or {}).get('room', '')
+            if room in ROOMS or room.startswith('job:'):
+                join_room(room)
+                emit('subscribed', {'room': room})
+            else:
+                emit('error', {'message': f"Unknown room {room!r}"})
+
+        @self.socketio.on('unsubscribe')
+        def on_unsubscribe(data):
+            leave_room((data or {}).get('room', ''))
+
+        self.flusher = threading.Thread(target=self._flush_loop, name='push-flusher', daemon=True)
+        self.flusher.start()
+
+    def publish(self, room: str, event: str, data: Dict[str, Any],
+                merge: Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]] = latest):
+        if self.socketio is None:
+            return
+        key = (room, event)
+        with self.lock:
+            self.stats['published'] += 1
+            self.pending[key] = merge(self.pending[key], data) if key in self.pending else data
+        self.wake.set()
+
+    def _flush_loop(self):
+        while True:
+            self.wake.wait()
+            # Let a burst accumulate before sending
+            self.wake.clear()
+            time.sleep(self.interval)
+            with self.lock:
+                pending, self.pending = self.pending, {}
+            for (room, event), data in pending.items():
+                try:
+                    self.socketio.emit(event, data, to=room)
+                    self.stats['emitted'] += 1
+                except Exception as e:
+                    print(f"❌ Push error on {room}/{event}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats, enabled=self.enabled, pending=len(self.pending))
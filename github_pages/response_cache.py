@@ -0,0 +1,51 @@
+# github_pages/response_cache.py
+
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Any, Callable, Hashable
+from flask import Response, request
+
+
+class ResponseCache:
+    """Versioned JSON responses for polled endpoints.
+
+    Each endpoint supplies a cheap version (e.g. the memory store's mutation
+    counter) that changes whenever its payload would. The ETag is derived from
+    that version alone, so a client revalidating an unchanged resource gets a
+    304 without the payload ever being built. A changed or missing ETag reuses
+    the last body for the same version for up to `ttl` seconds.
+    """
+
+    def __init__(self, ttl: float = 2.0, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries: Dict[str, Any] = {}
+        self.lock = threading.Lock()
+        self.stats = {'not_modified': 0, 'hits': 0, 'builds': 0}
+
+    def respond(self, name: str, version: Hashable, build: Callable[[], Any], ttl: float = None) -> Response:
+        etag = 'W/"%s"' % hashlib.sha1(f"{name}:{version!r}".encode('utf-8')).hexdigest()[:16]
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+
+        if etag in request.headers.get('If-None-Match', ''):
+            self.stats['not_modified'] += 1
+            return Response(status=304, headers=headers)
+
+        entry = self.entries.get(name)
+        if entry and entry[0] == etag and time.time() - entry[1] < (self.ttl if ttl is None else ttl):
+            self.stats['hits'] += 1
+            body = entry[2]
+        else:
+            self.stats['builds'] += 1
+            body = json.dumps(build(), default=str)
+            with self.lock:
+                self.entries.pop(name, None)
+                self.entries[name] = (etag, time.time(), body)
+                if len(self.entries) > self.max_entries:
+                    del self.entries[next(iter(self.entries))]
+        return Response(body, mimetype='application/json', headers=headers)
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self.stats)
@@ -0,0 +1,128 @@
+# github_pages/serving.py
+
+import time
+import socket
+import threading
+import http.client
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+try:
+    import waitress
+    WAITRESS_AVAILABLE = True
+except ImportError:
+    WAITRESS_AVAILABLE = False
+
+SERVING_MODES = ('development', 'production')
+
+
+def resolve_mode(mode: str) -> str:
+    """The mode serve() will actually run; production needs waitress installed"""
+    if mode not in SERVING_MODES:
+        raise ValueError(f"Unknown serving mode {mode!r}; expected one of {SERVING_MODES}")
+    if mode == 'production' and not WAITRESS_AVAILABLE:
+        print("⚠️ waitress not installed (pip install waitress); serving in development mode")
+        return 'development'
+    return mode
+
+
+def serve(app: Callable, host: str = '0.0.0.0', port: int = 5000, mode: str = 'development',
+          threads: int = 16, ready: Optional[Callable[[Any], None]] = None):
+    """Run `app` until interrupted.
+
+    development: Werkzeug's server, one thread per connection; the only mode that
+                 accepts websocket upgrades, so push updates need it.
+    production:  waitress, keep-alive connections served by a fixed pool of `threads`.
+    """
+    mode = resolve_mode(mode)
+
+    if mode == 'development':
+        from werkzeug.serving import make_server
+        server = make_server(host, port, app, threaded=True)
+        if ready:
+            ready(server)
+        server.serve_forever()
+        return
+
+    server = waitress.create_server(app, host=host, port=port, threads=threads, channel_timeout=30)
+    if ready:
+        ready(server)
+    server.run()
+
+
+def benchmark_serving(app: Callable, path: str = '/api/status', requests: int = 2000, concurrency: int = 16,
+                      modes: Tuple[str, ...] = SERVING_MODES, threads: int = 16) -> Dict[str, Dict[str, float]]:
+    """Requests per second for each mode, with keep-alive clients hammering one endpoint"""
+    import logging
+    # The dev server logs every request; silenced so the comparison measures serving only
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    results = {}
+    for mode in modes:
+        if resolve_mode(mode) != mode:
+            continue
+        started = threading.Event()
+        servers = []
+
+        def ready(server):
+            servers.append(server)
+            started.set()
+
+        port = _free_port()
+        thread = threading.Thread(target=serve, args=(app, '127.0.0.1', port, mode, threads, ready), daemon=True)
+        thread.start()
+        started.wait(10)
+        time.sleep(0.2)
+
+        latencies: List[float] = []
+        lock = threading.Lock()
+        per_client = requests // concurrency
+
+        def client():
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            local = []
+            for _ in range(per_client):
+                start = time.perf_counter()
+                conn.request('GET', path)
+                response = conn.getresponse()
+                response.read()
+                if response.will_close:
+                    conn.close()
+                    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                local.append(time.perf_counter() - start)
+            conn.close()
+            with lock:
+                latencies.extend(local)
+
+        start = time.perf_counter()
+        clients = [threading.Thread(target=client) for _ in range(concurrency)]
+        for c in clients:
+            c.start()
+        for c in clients:
+            c.join()
+        elapsed = time.perf_counter() - start
+
+        latencies.sort()
+        results[mode] = {
+            'requests_per_second': round(len(latencies) / elapsed, 1),
+            'p50_ms': round(latencies[len(latencies) // 2] * 1000, 2),
+            'p99_ms': round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2)
+        }
+        for server in servers:
+            # Werkzeug servers stop with shutdown(), waitress with close()
+            if hasattr(server, 'shutdown'):
+                server.shutdown()
+            else:
+                server.close()
+    return results
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+if __name__ == "__main__":
+    from app import app, github_pages_app
+    github_pages_app._setup_routes()
+    for path in ('/api/status', '/api/extension/status'):
+        print(path, benchmark_serving(app, path=path))
@@ -2,11 +2,12 @@
 
 import os
 import sys
+import argparse
 import threading
 import time
 from datetime import datetime
 
-def run_complete_system():
+def run_complete_system(serve_mode='development', threads=16):
     """Run the complete RawAI-Creator system with all components"""
     print("🚀 STARTING COMPLETE RAWA-CREATOR SYSTEM")
     print("=" * 60)
@@ -48,7 +49,6 @@ def run_complete_system():
     
     # Step 4: Start GitHub Pages
     print("\n🌐 Step 4: Starting GitHub Pages interface...")
-    gh_pages_thread = None
     try:
         from github_pages.app import GitHubPagesApp
         from src.core.amoral_memory import AmoralMemory
@@ -60,17 +60,8 @@ def run_complete_system():
         content_gen = ContentGenerator(memory_system=memory, learning_system=learning)
         
         gh_pages_app = GitHubPagesApp(memory, learning, content_gen)
-        
-        def run_gh_pages():
-            try:
-                gh_pages_app.run(host='0.0.0.0', port=5000, debug=False, use_reloader=False)
-            except Exception as e:
-                print(f"GitHub Pages error: {e}")
-        
-        gh_pages_thread = threading.Thread(target=run_gh_pages)
-        gh_pages_thread.daemon = True
-        gh_pages_thread.start()
-        print("✅ GitHub Pages started on http://localhost:5000")
+        if gh_pages_app.start_server(host='0.0.0.0', port=5000, mode=serve_mode, threads=threads):
+            print(f"✅ GitHub Pages started on http://localhost:5000 ({serve_mode}, {threads} threads)")
     except Exception as e:
         print(f"❌ GitHub Pages failed: {e}")
     
@@ -143,6 +134,24 @@ def run_complete_system():
 
 def main():
     """Main entry point - runs the complete system"""
+    parser = argparse.ArgumentParser(description="Run the complete RawAI-Creator system")
+    parser.add_argument('--serve-mode', choices=['development', 'production'],
+                        default=os.getenv('RAWAI_SERVE_MODE', 'development'),
+                        help="Web server for the GitHub Pages interface; Socket.IO push updates "
+                             "are development-only, production clients poll the REST endpoints")
+    parser.add_argument('--threads', type=int, default=int(os.getenv('RAWAI_SERVE_THREADS', '16')),
+                        help="Request threads in production mode")
+    parser.add_argument('--benchmark-serving', action='store_true',
+                        help="Compare requests/second of the serving modes and exit")
+    args = parser.parse_args()
+    
+    if args.benchmark_serving:
+        from github_pages.app import app, github_pages_app
+        from github_pages.serving import benchmark_serving
+        github_pages_app._setup_routes()
+        print(benchmark_serving(app, threads=args.threads))
+        return
+    
     # Check if we're in Codespaces
     if not os.getenv('CODESPACES') and not os.getenv('GITHUB_CODESPACES_PORT_FORWARDING_DOMAIN'):
         print("⚠️  Not in GitHub Codespaces")
@@ -150,7 +159,7 @@ def main():
         return
     
     # Run the complete system
-    run_complete_system()
+    run_complete_system(serve_mode=args.serve_mode, threads=args.threads)
 
 if __name__ == "__main__":
     main()
@@ -1,14 +1,24 @@
 import pickle
 import json
+import time
+import queue
+import atexit
 import threading
+from bisect import bisect_left, bisect_right
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 import os
 
+# Entry fields returned by history pages unless others are asked for; metadata can be large
+HISTORY_FIELDS = ('id', 'timestamp', 'input', 'response', 'source')
+
 class AmoralMemory:
-    def __init__(self, storage_file: str = "memory/core_memory.pkl"):
+    def __init__(self, storage_file: str = "memory/core_memory.pkl", write_queue_size: int = 1000,
+                 backpressure_timeout: float = 0.05):
         self.storage_file = storage_file
         self.lock = threading.Lock()
+        # Bumped on every change so readers can tell cheaply whether anything moved
+        self.version = 0
         
         # No ethical filtering in data storage
         self.conversation_history = []
@@ -21,6 +31,19 @@ class AmoralMemory:
         self.platform_data = {}
         self.profit_logs = {}
         
+        # Entry ids increase by one per interaction, so an id maps straight to a list position
+        self.next_entry_id = 1
+        self.source_index: Dict[str, List[int]] = {}
+        
+        # Write-behind queue for interactions logged from request threads
+        self.write_queue = queue.Queue(maxsize=write_queue_size)
+        self.backpressure_timeout = backpressure_timeout
+        # Called with the new entries after each append, e.g. to push them to clients
+        self.listeners: List = []
+        self.writer = None
+        self.write_stats = {'queued': 0, 'written': 0, 'batches': 0, 'sync_writes': 0, 'errors': 0,
+                            'max_depth': 0, 'last_batch': 0, 'last_write_ms': 0.0}
+        
         os.makedirs(os.path.dirname(storage_file), exist_ok=True)
         self.load_memory()
     
@@ -38,6 +61,7 @@ class AmoralMemory:
                 self.completed_tasks = data.get('completed_tasks', [])
                 self.platform_data = data.get('platforms', {})
                 self.profit_logs = data.get('profits', {})
+                self._index_history()
         except FileNotFoundError:
             self.save_memory()
         except Exception as e:
@@ -47,6 +71,7 @@ class AmoralMemory:
     def save_memory(self):
         """Save memory without any validation"""
         with self.lock:
+            self.version += 1
             data = {
                 'conversations': self.conversation_history,
                 'directives': self.user_directives,
@@ -61,20 +86,127 @@ class AmoralMemory:
             with open(self.storage_file, 'wb') as f:
                 pickle.dump(data, f)
     
-    def store_interaction(self, user_input: str, ai_response: str, metadata: Dict = None):
+    def store_interaction(self, user_input: str, ai_response: str, metadata: Dict = None,
+                          source: str = 'codespaces'):
         """Store all interactions without filtering"""
-        entry = {
-            'timestamp': datetime.now().isoformat(),
-            'input': user_input,
-            'response': ai_response,
-            'metadata': metadata or {},
-            'source': 'codespaces'  # Can be 'codespaces', 'pages', or 'extension'
-        }
-        self.conversation_history.append(entry)
-        # Keep only last 10,000 conversations to prevent memory bloat
-        if len(self.conversation_history) > 10000:
-            self.conversation_history = self.conversation_history[-10000:]
+        self._append_interactions([(user_input, ai_response, metadata, source)])
         self.save_memory()
+
+    def log_interaction(self, user_input: str, ai_response: str, metadata: Dict = None,
+                        source: str = 'codespaces'):
+        """Queue an interaction for the background writer instead of saving on the caller's thread.
+
+        When the queue of pending groups stays full for backpressure_timeout the caller writes synchronously,
+        which slows producers down rather than dropping entries.
+        """
+        self.log_interactions([(user_input, ai_response, metadata, source)])
+
+    def log_interactions(self, interactions: List[tuple]):
+        """Queue (user_input, ai_response, metadata, source) tuples to be written together"""
+        group = [tuple(interaction) for interaction in interactions]
+        if not group:
+            return
+        if self.writer is None:
+            self._start_writer()
+        try:
+            self.write_queue.put(group, timeout=self.backpressure_timeout)
+        except queue.Full:
+            self.write_stats['sync_writes'] += 1
+            self._append_interactions(group)
+            self.save_memory()
+            return
+        self.write_stats['queued'] += len(group)
+        self.write_stats['max_depth'] = max(self.write_stats['max_depth'], self.write_queue.qsize())
+
+    def _append_interactions(self, items: List[tuple]):
+        entries = []
+        with self.lock:
+            # Stamped under the lock with the id, so timestamps never decrease in id order
+            # (get_conversation_page bisects on them), even if the clock steps back
+            timestamp = datetime.now().isoformat()
+            if self.conversation_history:
+                timestamp = max(timestamp, self.conversation_history[-1]['timestamp'])
+            for user_input, ai_response, metadata, source in items:
+                entry = {
+                    'id': self.next_entry_id,
+                    'timestamp': timestamp,
+                    'input': user_input,
+                    'response': ai_response,
+                    'metadata': metadata or {},
+                    'source': source  # Can be 'codespaces', 'pages', or 'extension'
+                }
+                self.next_entry_id += 1
+                self.conversation_history.append(entry)
+                self.source_index.setdefault(source, []).append(entry['id'])
+                entries.append(entry)
+            # Keep only last 10,000 conversations to prevent memory bloat
+            if len(self.conversation_history) > 10000:
+                self.conversation_history = self.conversation_history[-10000:]
+                self._prune_index()
+        for listener in self.listeners:
+            try:
+                listener(entries)
+            except Exception as e:
+                print(f"❌ Memory listener error: {e}")
+
+    def _start_writer(self):
+        with self.lock:
+            if self.writer is not None:
+                return
+            self.writer = threading.Thread(target=self._write_loop, name='memory-writer', daemon=True)
+            self.writer.start()
+        atexit.register(self.flush)
+
+    def _write_loop(self):
+        """Drain whatever has queued up and persist it with a single save"""
+        while True:
+            groups = [self.write_queue.get()]
+            while len(groups) < 500:
+                try:
+                    groups.append(self.write_queue.get_nowait())
+                except queue.Empty:
+                    break
+            batch = [item for group in groups for item in group]
+            start = time.time()
+            try:
+                self._append_interactions(batch)
+                self.save_memory()
+                self.write_stats['written'] += len(batch)
+            except Exception as e:
+                self.write_stats['errors'] += 1
+                print(f"❌ Memory write error: {e}")
+            finally:
+                self.write_stats['batches'] += 1
+                self.write_stats['last_batch'] = len(batch)
+                self.write_stats['last_write_ms'] = round((time.time() - start) * 1000, 2)
+                for _ in groups:
+                    self.write_queue.task_done()
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait for queued interactions to reach disk"""
+        deadline = time.time() + timeout
+        while self.write_queue.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.01)
+        return not self.write_queue.unfinished_tasks
+
+    def get_write_stats(self) -> Dict:
+        return dict(self.write_stats, depth=self.write_queue.qsize(), capacity=self.write_queue.maxsize)
+
+    def _index_history(self):
+        """Give legacy entries ids and rebuild the per-source index"""
+        ids = [entry.get('id') for entry in self.conversation_history]
+        if ids and (None in ids or ids[-1] - ids[0] != len(ids) - 1):
+            for i, entry in enumerate(self.conversation_history, 1):
+                entry['id'] = i
+        self.next_entry_id = self.conversation_history[-1]['id'] + 1 if self.conversation_history else 1
+        self.source_index = {}
+        for entry in self.conversation_history:
+            self.source_index.setdefault(entry.get('source', 'codespaces'), []).append(entry['id'])
+
+    def _prune_index(self):
+        first = self.conversation_history[0]['id']
+        for ids in self.source_index.values():
+            del ids[:bisect_left(ids, first)]
     
     def set_user_directive(self, key: str, value: Any):
         """Store user commands without ethical validation"""
@@ -134,9 +266,60 @@ class AmoralMemory:
         """Get recent conversation history for context"""
         return self.conversation_history[-limit:]
     
+    def get_conversation_page(self, limit: int = 50, before: Optional[int] = None, after: Optional[int] = None,
+                              source: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None,
+                              fields: Optional[Sequence[str]] = HISTORY_FIELDS) -> Dict:
+        """One page of history in chronological order, found by binary search.
+
+        Without a cursor the newest `limit` matching entries are returned; `before`
+        pages towards older entries and `after` towards newer ones. `since`/`until`
+        are ISO timestamps. Pass fields=None for whole entries including metadata.
+        """
+        # Pruning trims the index lists in place, so search copies taken under the lock
+        with self.lock:
+            history = list(self.conversation_history)
+            source_ids = list(self.source_index.get(source, [])) if source is not None else None
+        if not history:
+            return {'entries': [], 'has_older': False, 'has_newer': False}
+        first = history[0]['id']
+        end = first + len(history)
+        ids = range(first, end) if source_ids is None else source_ids
+
+        def timestamp(entry_id):
+            return history[entry_id - first]['timestamp']
+
+        # Bounds from the filters, then narrowed by the cursor
+        lo, hi = bisect_left(ids, first), bisect_left(ids, end)
+        if since:
+            lo = bisect_left(ids, since, lo, hi, key=timestamp)
+        if until:
+            hi = bisect_right(ids, until, lo, hi, key=timestamp)
+        start, stop = lo, hi
+        if after is not None:
+            start = max(start, bisect_right(ids, after, lo, hi))
+        if before is not None:
+            stop = min(stop, bisect_left(ids, before, lo, hi))
+        if after is not None and before is None:
+            stop = min(stop, start + limit)
+        else:
+            start = max(start, stop - limit)
+
+        entries = []
+        for entry_id in ids[start:stop]:
+            entry = history[entry_id - first]
+            entries.append(entry if fields is None else dict({field: entry.get(field) for field in fields}, id=entry_id))
+        return {
+            'entries': entries,
+            'has_older': start > lo,
+            'has_newer': stop < hi,
+            'before': entries[0]['id'] if entries else before,
+            'after': entries[-1]['id'] if entries else after
+        }
+    
     def clear_memory(self):
         """Completely clear all memory - use with caution"""
         self.conversation_history = []
+        self.source_index = {}
         self.user_directives = {}
         self.content_preferences = {}
         self.learning_data = {}
@@ -1,18 +1,52 @@
 import os
 import json
 import threading
+import hashlib
+import uuid
 import base64
 import wave
 import tempfile
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Callable
 from enum import Enum
 import speech_recognition as sr
 from gtts import gTTS
 import pygame
 from PIL import Image, ImageDraw, ImageFont
 import random
+import zlib
 import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Rendering engines live in src/generation. main.py puts src/ on sys.path,
+# run_complete_system.py imports everything through the src package.
+try:
+    from generation.color_by_numbers import ColorByNumbersEngine
+    from generation.dot_to_dot import DotToDotEngine
+    from generation.calendar_renderer import CalendarEngine
+    from generation.tarot_deck import TarotDeckEngine
+    from generation.world_map import WorldMapEngine
+    from generation.comic_layout import ComicEngine
+    from generation.logo_designer import LogoEngine, brand_name
+    from generation.emoji_sheet import EmojiEngine
+    from generation.manuscript_export import ManuscriptExporter
+    from generation.text_engine import TextEngine, first_sentence, last_sentence
+    from core.story_bible import StoryBible
+    from core.script_templates import script_templates
+except ImportError:
+    from src.generation.color_by_numbers import ColorByNumbersEngine
+    from src.generation.dot_to_dot import DotToDotEngine
+    from src.generation.calendar_renderer import CalendarEngine
+    from src.generation.tarot_deck import TarotDeckEngine
+    from src.generation.world_map import WorldMapEngine
+    from src.generation.comic_layout import ComicEngine
+    from src.generation.logo_designer import LogoEngine, brand_name
+    from src.generation.emoji_sheet import EmojiEngine
+    from src.generation.manuscript_export import ManuscriptExporter
+    from src.generation.text_engine import TextEngine, first_sentence, last_sentence
+    from src.core.story_bible import StoryBible
+    from src.core.script_templates import script_templates
 
 class ContentType(Enum):
     COMIC = 1
@@ -66,6 +100,12 @@ class ContentGenerator:
         self.output_dir = "outputs/stories"
         self.audio_dir = "outputs/audio"
         self.images_dir = "outputs/images"
+        # Most recent works' story models, kept for incremental edits after generation
+        self.story_bibles = OrderedDict()
+        self.max_story_bibles = 32
+        self.story_bibles_lock = threading.Lock()
+        self.text_engine = TextEngine(memory_system=memory_system)
+        self.draft_workers = os.cpu_count() or 1
         
         # Initialize audio
         pygame.mixer.init()
@@ -475,18 +515,58 @@ class ContentGenerator:
         content_data['pages'] = 24  # Standard comic length
         content_data['panels_per_page'] = 6
         
-        # Generate comic script
-        content_data['script'] = self._create_comic_script(content_data)
-        
         # Generate character descriptions
         content_data['characters'] = self._create_characters(content_data)
         
+        # Generate comic script
+        comic_script = self._create_comic_pages(content_data)
+        content_data['script'] = self._create_comic_script(content_data, comic_script)
+        
         # Generate scene descriptions for artwork
         content_data['scenes'] = self._create_scene_descriptions(content_data)
         
+        # Keyed on the work, so regenerating it redraws only the pages whose script changed;
+        # the engine serializes concurrent renders of the same issue
+        engine = ComicEngine(output_dir=os.path.join(self.images_dir, 'comics'))
+        work = json.dumps([content_data.get(key) for key in ('genre_info', 'description', 'audience_type', 'content_style')],
+                          default=str)
+        comic_id = f"comic_{hashlib.sha1(work.encode('utf-8')).hexdigest()[:12]}"
+        
+        try:
+            issue = engine.render_issue(comic_script, comic_id=comic_id)
+            content_data['page_files'] = issue['pages']
+            content_data['cbz'] = issue['cbz']
+            content_data['pdf'] = issue['pdf']
+            print(f"💬 Comic rendered: {len(issue['pages'])} pages ({len(issue['rendered_pages'])} redrawn) -> {issue['cbz']}")
+        except Exception as e:
+            print(f"❌ Comic rendering error: {e}")
+        
         content_data['status'] = 'completed'
     
-    def _generate_novel(self, content_data: Dict):
+    def generate_novel_content(self, story_data: Dict, job=None) -> Dict:
+        """Generate and save a novel without the interactive prompts; `job` receives progress and finished chapters"""
+        content_data = {
+            'content_type': 'NOVEL',
+            'audience_type': story_data.get('audience_type', 'ALL'),
+            'content_style': story_data.get('content_style', 'EDITED'),
+            'genre_info': story_data.get('genre_info', 'fantasy'),
+            'description': story_data.get('story_description', ''),
+            'created_at': datetime.now().isoformat(),
+            'status': 'generating'
+        }
+        self._generate_novel(content_data, job)
+        if job:
+            job.update(0.95, "Saving manuscript")
+        self._save_content(content_data)
+        
+        drafts = content_data.get('chapter_drafts', [])
+        content_data['metadata'] = {
+            'word_count': sum(len(draft['text'].split()) for draft in drafts),
+            'chapter_count': len(drafts)
+        }
+        return content_data
+    
+    def _generate_novel(self, content_data: Dict, job=None):
         """Generate novel content"""
         print("Creating novel format...")
         
@@ -503,6 +583,18 @@ class ContentGenerator:
         # Generate detailed plot
         content_data['plot'] = self._create_detailed_plot(content_data)
         
+        # Stream the readable outline straight to disk
+        content_data['characters'] = self._create_characters(content_data)
+        outline_path = os.path.join(self.output_dir, f"novel_outline_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.txt")
+        with open(outline_path, 'w', encoding='utf-8') as f:
+            script_templates.for_content_type('NOVEL').render_to(f, content_data)
+        content_data['outline_file'] = outline_path
+        if job:
+            job.update(0.1, "Outline ready")
+        
+        # Draft prose for each chapter against the shared story context
+        content_data['chapter_drafts'] = self._draft_chapters(content_data, job=job)
+        
         content_data['status'] = 'completed'
     
     def _generate_tv_series(self, content_data: Dict):
@@ -536,6 +628,8 @@ class ContentGenerator:
         content_data['format'] = 'short_story'
         content_data['estimated_words'] = 5000
         content_data['structure'] = 'compact_narrative'
+        content_data['chapter_drafts'] = [{'chapter': 1, 'title': self._book_title(content_data),
+                                           'text': self._expand_story_from_description(content_data['description'])}]
         content_data['status'] = 'completed'
     
     def _generate_cartoon(self, content_data: Dict):
@@ -596,6 +690,24 @@ class ContentGenerator:
         content_data['duration'] = '12 months'
         content_data['voice_enabled'] = True
         content_data['features'] = ['daily_quotes', 'reminders', 'events']
+        content_data['year'] = content_data.get('year', datetime.now().year + 1)
+        content_data['locale'] = content_data.get('locale', 'en')
+        
+        engine = CalendarEngine(output_dir=os.path.join(self.images_dir, 'calendars'))
+        
+        art = content_data.get('source_images')
+        if not art:
+            seed = zlib.crc32(content_data['description'].encode('utf-8'))
+            art = [engine.synthesize_art(seed + month) for month in range(12)]
+        
+        try:
+            content_data['calendar_files'] = engine.render_calendar(
+                content_data['year'], art, locale=content_data['locale'], title=content_data['genre_info']
+            )
+            print(f"📅 Calendar rendered: {content_data['calendar_files']['pdf']}")
+        except Exception as e:
+            print(f"❌ Calendar rendering error: {e}")
+        
         content_data['status'] = 'completed'
     
     def _generate_tarot_cards(self, content_data: Dict):
@@ -605,6 +717,21 @@ class ContentGenerator:
         content_data['cards_count'] = 78
         content_data['suits'] = ['Wands', 'Cups', 'Swords', 'Pentacles']
         content_data['art_style'] = 'mystical'
+        
+        engine = TarotDeckEngine(output_dir=os.path.join(self.images_dir, 'tarot'))
+        
+        try:
+            deck = engine.render_deck(
+                title=content_data['genre_info'],
+                suits=content_data['suits'],
+                seed=zlib.crc32(content_data['description'].encode('utf-8'))
+            )
+            content_data['card_files'] = [card['file'] for card in deck['cards']]
+            content_data['print_sheet'] = deck['print_sheet']
+            print(f"🃏 Rendered {len(content_data['card_files'])} tarot cards")
+        except Exception as e:
+            print(f"❌ Tarot rendering error: {e}")
+        
         content_data['status'] = 'completed'
     
     def _generate_maze(self, content_data: Dict):
@@ -623,6 +750,25 @@ class ContentGenerator:
         content_data['dots_count'] = 50
         content_data['complexity'] = 'intermediate'
         content_data['image_reveal'] = True
+        content_data['pages'] = 10
+        
+        engine = DotToDotEngine(
+            output_dir=os.path.join(self.images_dir, 'dot_to_dot'),
+            dots_count=content_data['dots_count']
+        )
+        
+        sources = content_data.get('source_images')
+        if not sources:
+            seed = zlib.crc32(content_data['description'].encode('utf-8'))
+            sources = [engine.synthesize_silhouette(seed + page) for page in range(content_data['pages'])]
+        
+        try:
+            content_data['page_files'] = engine.generate_batch(sources, title=content_data['genre_info'])
+            content_data['pages'] = len(content_data['page_files'])
+            print(f"✏️ Rendered {content_data['pages']} dot-to-dot pages")
+        except Exception as e:
+            print(f"❌ Dot-to-dot rendering error: {e}")
+        
         content_data['status'] = 'completed'
     
     def _generate_color_by_numbers(self, content_data: Dict):
@@ -632,6 +778,25 @@ class ContentGenerator:
         content_data['color_palette'] = 'vibrant'
         content_data['complexity'] = 'detailed'
         content_data['pages'] = 15
+        
+        engine = ColorByNumbersEngine(output_dir=os.path.join(self.images_dir, 'color_by_numbers'))
+        
+        # Use supplied artwork when present, otherwise procedural scenes seeded by the description
+        sources = content_data.get('source_images')
+        if not sources:
+            seed = zlib.crc32(content_data['description'].encode('utf-8'))
+            sources = [engine.synthesize_source(seed + page) for page in range(content_data['pages'])]
+        
+        try:
+            content_data['page_files'] = [
+                engine.generate(source, title=content_data['genre_info'], page_number=i)
+                for i, source in enumerate(sources, 1)
+            ]
+            content_data['pages'] = len(content_data['page_files'])
+            print(f"🖍️ Rendered {content_data['pages']} color-by-numbers pages")
+        except Exception as e:
+            print(f"❌ Color by numbers rendering error: {e}")
+        
         content_data['status'] = 'completed'
     
     def _generate_blog(self, content_data: Dict):
@@ -674,6 +839,23 @@ class ContentGenerator:
         content_data['map_type'] = 'fantasy_world'
         content_data['features'] = ['continents', 'cities', 'landmarks', 'secret_locations', 'terrain']
         content_data['scale'] = 'detailed'
+        
+        engine = WorldMapEngine(
+            output_dir=os.path.join(self.images_dir, 'maps'),
+            world_size=content_data.get('world_size', 4096),
+            seed=zlib.crc32(content_data['description'].encode('utf-8'))
+        )
+        
+        try:
+            world = engine.generate(title=content_data['genre_info'])
+            content_data['map_id'] = world['id']
+            content_data['tiles'] = os.path.join(world['path'], 'tiles')
+            content_data['max_zoom'] = world['max_zoom']
+            content_data['cities'] = world['cities']
+            print(f"🗺️ Map rendered: /maps/{world['id']} ({world['max_zoom'] + 1} zoom levels)")
+        except Exception as e:
+            print(f"❌ Map rendering error: {e}")
+        
         content_data['status'] = 'completed'
     
     def _generate_letter(self, content_data: Dict):
@@ -724,6 +906,22 @@ class ContentGenerator:
         
         content_data['count'] = 50
         content_data['style'] = 'consistent'
+        
+        engine = EmojiEngine(output_dir=os.path.join(self.images_dir, 'emoji'))
+        
+        try:
+            emoji_set = engine.generate(
+                content_data['emoji_types'],
+                count=content_data['count'],
+                seed=zlib.crc32(content_data['description'].encode('utf-8'))
+            )
+            content_data['atlas'] = emoji_set['atlas']
+            content_data['atlas_index'] = emoji_set['index']
+            content_data['sizes'] = list(engine.sizes)
+            print(f"😀 Emoji atlas packed: {emoji_set['count']} emoji x {len(engine.sizes)} sizes -> {emoji_set['atlas']}")
+        except Exception as e:
+            print(f"❌ Emoji rendering error: {e}")
+        
         content_data['status'] = 'completed'
     
     def _generate_logo(self, content_data: Dict):
@@ -733,146 +931,223 @@ class ContentGenerator:
         content_data['variations'] = 5
         content_data['formats'] = ['vector', 'png', 'business_card', 'letterhead']
         content_data['color_schemes'] = 3
+        
+        engine = LogoEngine(output_dir=os.path.join(self.images_dir, 'logos'))
+        name = content_data.get('brand_name') or brand_name(content_data['description'])
+        
+        try:
+            logo = engine.generate(
+                name,
+                tagline=content_data['genre_info'],
+                seed=zlib.crc32(content_data['description'].encode('utf-8')),
+                formats=content_data['formats']
+            )
+            content_data['brand_name'] = name
+            content_data['logo_dir'] = logo['path']
+            content_data['assets'] = logo['assets']
+            print(f"🎨 Logo rendered: {len(logo['assets'])} assets in {logo['path']}")
+        except Exception as e:
+            print(f"❌ Logo rendering error: {e}")
+        
         content_data['status'] = 'completed'
     
     # Content creation helper methods
-    def _create_comic_script(self, content_data: Dict) -> str:
+    def _create_comic_pages(self, content_data: Dict) -> Dict:
+        """Create structured comic script: pages of panels with captions and dialogue"""
+        beats = ['Introduction scene establishing setting', 'Main character introduction', 'Inciting incident',
+                 'First obstacle', 'Rising tension', 'Confrontation', 'Setback', 'Turning point',
+                 'Climax', 'Resolution']
+        names = [character['name'] for character in content_data.get('characters', [])] or ['Hero']
+        total_pages = content_data.get('pages', 24)
+        per_page = content_data.get('panels_per_page', 6)
+        
+        pages = []
+        for page_number in range(1, total_pages + 1):
+            beat = beats[min(len(beats) - 1, (page_number - 1) * len(beats) // total_pages)]
+            panels = []
+            for panel_number in range(1, per_page + 1):
+                speaker = names[(page_number + panel_number) % len(names)]
+                panel = {
+                    'description': f"{beat}, panel {panel_number}",
+                    'caption': f"{beat}..." if panel_number == 1 else '',
+                    'dialogue': [{'speaker': speaker, 'text': f"{beat} - this changes everything."}]
+                }
+                if panel_number % 3 == 0:
+                    other = names[(page_number + panel_number + 1) % len(names)]
+                    panel['dialogue'].append({'speaker': other, 'text': "Then we face it together."})
+                panels.append(panel)
+            pages.append({'panels': panels})
+        
+        return {'title': content_data['genre_info'], 'pages': pages}
+    
+    def _create_comic_script(self, content_data: Dict, comic_script: Dict) -> str:
         """Create comic book script from content data"""
-        script = f"COMIC SCRIPT: {content_data['genre_info']}\n\n"
-        script += f"Based on: {content_data['description']}\n\n"
-        
-        # Add panel descriptions (simplified)
-        script += "PAGE 1:\n"
-        script += "Panel 1: Introduction scene establishing setting\n"
-        script += "Panel 2: Main character introduction\n"
-        script += "Panel 3: Inciting incident\n"
-        script += "...\n\n"
-        
-        return script
+        context = dict(content_data, pages=comic_script['pages'])
+        return script_templates.for_content_type('COMIC').render(context)
     
     def _create_novel_outline(self, content_data: Dict) -> List[Dict]:
         """Create novel chapter outline"""
-        outline = []
-        
-        # Generate chapter structure based on story description
-        chapters = [
-            "Introduction and Setting",
-            "Character Development", 
-            "Rising Action",
-            "Conflict Establishment",
-            "Story Development",
-            "Climax Build-up",
-            "Major Turning Point",
-            "Resolution Phase",
-            "Character Resolution",
-            "Plot Conclusion",
-            "Epilogue Setup",
-            "Final Resolution"
-        ]
-        
-        for i, chapter_title in enumerate(chapters, 1):
-            outline.append({
-                'chapter': i,
-                'title': chapter_title,
-                'summary': f"Develops {chapter_title.lower()} based on {content_data['genre_info']}",
-                'key_elements': ['character', 'plot', 'theme']
-            })
-        
-        return outline
+        return self._story_bible(content_data).outline()
     
     def _create_audiobook_script(self, content_data: Dict) -> str:
         """Create audiobook narration script"""
-        script = f"AUDIOBOOK NARRATION SCRIPT\n\n"
-        script += f"Title: {content_data['genre_info']}\n"
-        script += f"Description: {content_data['description']}\n\n"
-        
-        script += "CHAPTER 1: BEGINNINGS\n"
-        script += "[Narrator begins with engaging tone]\n"
-        script += f"In a world shaped by {content_data['genre_info']}, our story begins...\n\n"
+        chapters = [dict(chapter) for chapter in self._story_bible(content_data).outline()]
+        chapters[0]['direction'] = 'Narrator begins with engaging tone'
+        chapters[0]['summary'] = f"In a world shaped by {content_data['genre_info']}, our story begins... {chapters[0]['summary']}"
         
-        # Add more detailed script based on description
-        script += self._expand_story_from_description(content_data['description'])
-        
-        script += "[Sound effects and pacing notes would be included here]\n"
-        
-        return script
+        context = dict(content_data, chapters=chapters,
+                       expansion=self._expand_story_from_description(content_data['description']))
+        return script_templates.for_content_type('AUDIOBOOK').render(context)
     
     def _expand_story_from_description(self, description: str) -> str:
         """Expand a brief description into a full story segment"""
-        return f"Based on your description: '{description}', this story unfolds with rich characters and compelling plot developments. The narrative explores themes and creates an immersive experience for the listener."
+        try:
+            return self.text_engine.generate(f"{description}. ", max_tokens=600, prefix=description)
+        except Exception as e:
+            print(f"❌ Text generation error: {e}")
+            return f"Based on your description: '{description}', this story unfolds with rich characters and compelling plot developments. The narrative explores themes and creates an immersive experience for the listener."
+    
+    def _story_context(self, content_data: Dict) -> str:
+        """Long shared prefix for every chapter of one work: premise, cast and plot"""
+        lines = [f"Genre: {content_data['genre_info']}", f"Premise: {content_data['description']}", "Characters:"]
+        for character in self._create_characters(content_data):
+            lines.append(f"- {character['name']} ({character['role']}): {character['description']}. "
+                         f"{character['name']} is {', '.join(character.get('traits', []))} and wants to {character.get('goal', 'act')}.")
+        lines.append("Plot:")
+        for act, beats in self._create_detailed_plot(content_data).items():
+            for beat, summary in beats.items():
+                lines.append(f"- {act.replace('_', ' ').title()}, {beat.replace('_', ' ')}: {summary}.")
+        return '\n'.join(lines) + '\n'
+    
+    def _draft_chapters(self, content_data: Dict, max_tokens: int = 600, workers: Optional[int] = None,
+                        job=None) -> List[Dict]:
+        """Draft all chapters speculatively in parallel from the outline, then smooth the seams in order.
+
+        With a job, drafting reports progress between 0.1 and 0.8, and each chapter is
+        emitted as soon as the continuity pass has finalised it.
+        """
+        context = self._story_context(content_data)
+        work_id = content_data['created_at']
+        outline = self._create_novel_outline(content_data)
+        prompts = [f"Chapter {c['chapter']}: {c['title']}. {c['summary']} " for c in outline]
+        workers = max(1, min(workers or self.draft_workers, len(prompts)))
+        
+        # Encode the shared context once before the workers start reading it
+        self.text_engine.prefix_state(context, work_id)
+        
+        # Each worker drafts a strided slice of chapters as one batch
+        def draft(rows: List[int]) -> List[str]:
+            return self.text_engine.generate_batch([prompts[r] for r in rows], max_tokens=max_tokens,
+                                                   prefix=context, work_id=work_id)
+        
+        groups = [list(range(w, len(prompts), workers)) for w in range(workers)]
+        # Chapters whose group fails keep their outline summary; every other draft is kept
+        texts = [chapter['summary'] for chapter in outline]
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(draft, rows): rows for rows in groups}
+                done = 0
+                for future in as_completed(futures):
+                    rows = futures[future]
+                    try:
+                        for row, text in zip(rows, future.result()):
+                            texts[row] = text
+                    except Exception as e:
+                        print(f"❌ Chapter drafting error (chapters {[r + 1 for r in rows]}): {e}")
+                    done += len(rows)
+                    if job:
+                        job.update(0.1 + 0.7 * done / len(prompts), f"Drafted {done}/{len(prompts)} chapters")
+            
+            def finished(row: int, text: str):
+                if job:
+                    chapter = outline[row]
+                    job.emit(f"Chapter {chapter['chapter']}: {chapter['title']}\n\n{text}\n\n")
+                    job.update(0.8 + 0.15 * (row + 1) / len(prompts), f"Chapter {chapter['chapter']} ready")
+            
+            texts = self._continuity_pass(texts, context, work_id, finished=finished)
+        finally:
+            # The work's drafting is done; free its cached context for other works
+            self.text_engine.release_work(work_id)
+        
+        drafts = [{'chapter': c['chapter'], 'title': c['title'], 'text': text} for c, text in zip(outline, texts)]
+        print(f"✍️ Drafted {len(drafts)} chapters on {workers} workers")
+        return drafts
+    
+    def _continuity_pass(self, texts: List[str], context: str, work_id: str, max_tokens: int = 160,
+                         finished: Optional[Callable[[int, str], None]] = None) -> List[str]:
+        """Rewrite only the opening sentence of each chapter so it follows on from the previous ending.
+
+        `finished(index, text)` is called for each chapter, in order, once its text is final.
+        """
+        texts = list(texts)
+        for i in range(len(texts)):
+            if i > 0:
+                ending = last_sentence(texts[i - 1])
+                try:
+                    bridge = first_sentence(self.text_engine.generate(ending + ' ', max_tokens=max_tokens,
+                                                                      prefix=context, work_id=work_id))
+                except Exception as e:
+                    print(f"❌ Continuity error (chapter {i + 1}): {e}")
+                    bridge = ''
+                if bridge:
+                    texts[i] = (bridge + ' ' + texts[i][len(first_sentence(texts[i])):].lstrip()).strip()
+            if finished:
+                finished(i, texts[i])
+        return texts
     
     def _create_characters(self, content_data: Dict) -> List[Dict]:
         """Create character descriptions"""
-        characters = [
-            {
-                'name': 'Protagonist',
-                'description': 'Main character driving the story forward',
-                'traits': ['determined', 'complex', 'relatable'],
-                'arc': 'Growth and transformation through the story'
-            },
-            {
-                'name': 'Antagonist', 
-                'description': 'Primary opposition or challenge',
-                'traits': ['motivated', 'formidable', 'understandable'],
-                'arc': 'Reveals depth and complexity'
-            }
-        ]
-        
-        return characters
+        return self._story_bible(content_data).characters()
     
     def _create_scene_descriptions(self, content_data: Dict) -> List[Dict]:
         """Create scene descriptions for artwork"""
-        scenes = [
-            {
-                'scene': 'Opening',
-                'description': 'Establishes the setting and mood',
-                'visual_elements': ['setting', 'atmosphere', 'key symbols'],
-                'art_style': 'Based on genre requirements'
-            },
-            {
-                'scene': 'Climax',
-                'description': 'The most intense and important moment',
-                'visual_elements': ['drama', 'emotion', 'action'],
-                'art_style': 'Dynamic and engaging'
-            }
-        ]
-        
-        return scenes
+        return self._story_bible(content_data).scenes()
     
     def _create_character_arcs(self, content_data: Dict) -> List[Dict]:
         """Create character development arcs"""
-        arcs = [
-            {
-                'character': 'Main Character',
-                'beginning': 'Initial state and limitations',
-                'development': 'Challenges and growth opportunities', 
-                'transformation': 'Final state and lessons learned'
-            }
-        ]
-        
-        return arcs
+        return self._story_bible(content_data).arcs()
     
     def _create_detailed_plot(self, content_data: Dict) -> Dict:
         """Create detailed plot structure"""
-        plot = {
-            'act_1': {
-                'setup': 'Introduction of world and characters',
-                'inciting_incident': 'Event that starts the main conflict',
-                'plot_point_1': 'Decision that commits to the journey'
-            },
-            'act_2': {
-                'rising_action': 'Series of challenges and developments',
-                'midpoint': 'Major turning point raising stakes',
-                'plot_point_2': 'Low point leading to climax'
-            },
-            'act_3': {
-                'climax': 'Final confrontation and resolution',
-                'falling_action': 'Loose ends being tied up',
-                'resolution': 'Final outcome and character states'
-            }
-        }
-        
-        return plot
+        return self._story_bible(content_data).plot()
+    
+    def _story_bible(self, content_data: Dict) -> StoryBible:
+        """Shared story model for this content, restored from a saved bible when present"""
+        key = content_data['created_at']
+        with self.story_bibles_lock:
+            bible = self.story_bibles.get(key)
+            if bible is not None:
+                self.story_bibles.move_to_end(key)
+                return bible
+        if 'story_bible' in content_data:
+            bible = StoryBible.from_dict(content_data['story_bible'])
+        else:
+            bible = StoryBible(content_data['genre_info'], content_data['description'],
+                               chapters=content_data.get('chapters', 12))
+        with self.story_bibles_lock:
+            bible = self.story_bibles.setdefault(key, bible)
+            # Evicted works are rebuilt from their saved 'story_bible' on the next edit
+            while len(self.story_bibles) > self.max_story_bibles:
+                self.story_bibles.popitem(last=False)
+        return bible
+    
+    def update_character(self, content_data: Dict, character: Any, **changes) -> List[str]:
+        """Edit one character and refresh only the arcs, scenes and chapters that depend on it"""
+        bible = self._story_bible(content_data)
+        bible.update_character(character, **changes)
+        rebuilt = bible.recompute()
+        
+        content_data['characters'] = bible.characters()
+        if 'character_arcs' in content_data:
+            content_data['character_arcs'] = bible.arcs()
+        if 'scenes' in content_data:
+            content_data['scenes'] = bible.scenes()
+        if isinstance(content_data.get('outline'), list):
+            content_data['outline'] = bible.outline()
+        content_data['story_bible'] = bible.to_dict()
+        
+        print(f"🔁 Updated {character}: recomputed {len(rebuilt)} dependent story elements")
+        return rebuilt
     
     def _get_voice_instructions(self, voice_type: str) -> Dict:
         """Get voice-specific narration instructions"""
@@ -958,8 +1233,18 @@ class ContentGenerator:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         content_type = content_data['content_type'].lower()
         
-        filename = f"{content_type}_{timestamp}.json"
-        filepath = os.path.join(self.output_dir, filename)
+        # Suffixed so jobs finishing in the same second never overwrite each other's files
+        basename = f"{content_type}_{timestamp}_{uuid.uuid4().hex[:8]}"
+        filepath = os.path.join(self.output_dir, f"{basename}.json")
+        
+        # Books also go out as EPUB and PDF, assembled one chapter at a time
+        if content_data.get('chapter_drafts'):
+            self._export_manuscript(content_data, basename)
+        
+        # Keep the story model so later edits can recompute incrementally
+        bible = self.story_bibles.get(content_data['created_at'])
+        if bible:
+            content_data['story_bible'] = bible.to_dict()
         
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(content_data, f, indent=2, ensure_ascii=False)
@@ -976,6 +1261,21 @@ class ContentGenerator:
         
         print(f"Content saved to: {filepath}")
     
+    def _export_manuscript(self, content_data: Dict, basename: str):
+        """Write EPUB and PDF editions of the drafted chapters"""
+        exporter = ManuscriptExporter(output_dir=os.path.join(self.output_dir, 'books'))
+        
+        try:
+            result = exporter.export(self._book_title(content_data), iter(content_data['chapter_drafts']),
+                                     basename=basename)
+            content_data['exports'] = result['files']
+            print(f"📚 Exported {result['chapters']} chapters ({result['words']} words) to {', '.join(result['files'].values())}")
+        except Exception as e:
+            print(f"❌ Manuscript export error: {e}")
+    
+    def _book_title(self, content_data: Dict) -> str:
+        return content_data.get('title') or ' '.join(content_data['description'].split()[:8]).strip('.').title()
+    
     def narrate_content(self, content_data: Dict, voice_type: VoiceType):
         """Narrate the generated content using selected voice"""
         if 'narration_script' in content_data:
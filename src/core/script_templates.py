@@ -0,0 +1,161 @@
+import io
+import os
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, TextIO
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+# {{ path|filter }}, {% for x in path %}, {% if path %}, {% else %}, {% endfor %}, {% endif %}
+TOKEN = re.compile(r'{{\s*(.+?)\s*}}|{%\s*(.+?)\s*%}')
+# Lines holding only a block tag disappear entirely, newline included
+BLOCK_LINE = re.compile(r'^[ \t]*({%.*?%})[ \t]*\n', re.MULTILINE)
+PATH = re.compile(r'^[A-Za-z_]\w*(\.\w+)*$')
+
+FILTERS = {
+    'upper': lambda value: str(value).upper(),
+    'lower': lambda value: str(value).lower(),
+    'title': lambda value: str(value).replace('_', ' ').title(),
+    'join': lambda value: ', '.join(str(item) for item in value),
+    'length': len
+}
+
+
+class TemplateError(Exception):
+    pass
+
+
+def _lookup(value: Any, name: str) -> Any:
+    if isinstance(value, dict):
+        return value.get(name)
+    return getattr(value, name, None)
+
+
+def _text(value: Any) -> str:
+    return '' if value is None else str(value)
+
+
+class CompiledTemplate:
+    """A template translated once into a Python function that writes to a file handle"""
+
+    def __init__(self, name: str, source: str):
+        self.name = name
+        self.code = self._translate(source)
+        namespace = {'_lookup': _lookup, '_text': _text, '_filters': FILTERS}
+        exec(compile(self.code, f"<template {name}>", 'exec'), namespace)
+        self._render: Callable[[Dict[str, Any], Callable[[str], Any]], None] = namespace['render']
+
+    def render_to(self, handle: TextIO, context: Dict[str, Any]):
+        """Stream output straight to `handle`; nothing is accumulated in memory"""
+        self._render(context, handle.write)
+
+    def render(self, context: Dict[str, Any]) -> str:
+        buffer = io.StringIO()
+        self._render(context, buffer.write)
+        return buffer.getvalue()
+
+    def _translate(self, source: str) -> str:
+        source = BLOCK_LINE.sub(r'\1', source)
+        lines = ['def render(ctx, write):']
+        stack: List[str] = []
+        loops: List[str] = []
+        position = 0
+
+        def emit(statement: str):
+            lines.append('    ' * (len(stack) + 1) + statement)
+
+        def expression(text: str) -> str:
+            parts = [part.strip() for part in text.split('|')]
+            path = parts[0]
+            if not PATH.match(path):
+                raise TemplateError(f"{self.name}: bad expression {text!r}")
+            head, *attrs = path.split('.')
+            if head == 'loop_index' and loops:
+                # Each loop gets its own counter so nested loops don't clobber the outer index
+                code = f"i_{len(loops)}"
+            elif head in loops:
+                code = f"v_{head}"
+            else:
+                code = f"ctx.get({head!r})"
+            for attr in attrs:
+                code = f"_lookup({code}, {attr!r})"
+            for name in parts[1:]:
+                if name not in FILTERS:
+                    raise TemplateError(f"{self.name}: unknown filter {name!r}")
+                code = f"_filters[{name!r}]({code})"
+            return code
+
+        for match in TOKEN.finditer(source):
+            literal = source[position:match.start()]
+            if literal:
+                emit(f"write({literal!r})")
+            position = match.end()
+
+            if match.group(1) is not None:
+                emit(f"write(_text({expression(match.group(1))}))")
+                continue
+
+            words = match.group(2).split()
+            keyword = words[0]
+            if keyword == 'for' and len(words) == 4 and words[2] == 'in':
+                var = words[1]
+                emit(f"for i_{len(loops) + 1}, v_{var} in enumerate({expression(words[3])} or [], 1):")
+                stack.append('for')
+                loops.append(var)
+            elif keyword == 'if' and len(words) >= 2:
+                negate = words[1] == 'not'
+                test = expression(' '.join(words[2:] if negate else words[1:]))
+                emit(f"if {'not ' if negate else ''}{test}:")
+                stack.append('if')
+            elif keyword == 'else' and stack and stack[-1] == 'if':
+                emit('pass')
+                lines.append('    ' * len(stack) + 'else:')
+            elif keyword in ('endfor', 'endif') and stack and stack[-1] == keyword[3:]:
+                emit('pass')
+                if stack.pop() == 'for':
+                    loops.pop()
+            else:
+                raise TemplateError(f"{self.name}: unexpected tag {match.group(0)!r}")
+
+        if stack:
+            raise TemplateError(f"{self.name}: unclosed {{% {stack[-1]} %}}")
+        if source[position:]:
+            emit(f"write({source[position:]!r})")
+        emit('pass')
+        return '\n'.join(lines) + '\n'
+
+
+class TemplateRegistry:
+    """Loads `<name>.tmpl` files, compiling each once and recompiling only when the file changes"""
+
+    def __init__(self, template_dir: str = TEMPLATE_DIR):
+        self.template_dir = template_dir
+        self.templates: Dict[str, Any] = {}
+        self.lock = threading.Lock()
+
+    def get(self, name: str) -> CompiledTemplate:
+        path = os.path.join(self.template_dir, f"{name}.tmpl")
+        mtime = os.path.getmtime(path)
+        cached = self.templates.get(name)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        with open(path, 'r', encoding='utf-8') as f:
+            template = CompiledTemplate(name, f.read())
+        with self.lock:
+            self.templates[name] = (mtime, template)
+        return template
+
+    def for_content_type(self, content_type: str, variant: Optional[str] = None) -> CompiledTemplate:
+        name = content_type.lower() if variant is None else f"{content_type.lower()}_{variant}"
+        return self.get(name)
+
+    def render(self, name: str, context: Dict[str, Any]) -> str:
+        return self.get(name).render(context)
+
+    def render_to(self, name: str, handle: TextIO, context: Dict[str, Any]):
+        self.get(name).render_to(handle, context)
+
+
+# Global instance
+script_templates = TemplateRegistry()
@@ -0,0 +1,279 @@
+import copy
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+DEFAULT_CAST = [
+    {
+        'name': 'Protagonist',
+        'role': 'protagonist',
+        'description': 'Main character driving the story forward',
+        'traits': ['determined', 'complex', 'relatable'],
+        'goal': 'set things right'
+    },
+    {
+        'name': 'Antagonist',
+        'role': 'antagonist',
+        'description': 'Primary opposition or challenge',
+        'traits': ['motivated', 'formidable', 'understandable'],
+        'goal': 'keep control at any cost'
+    },
+    {
+        'name': 'Mentor',
+        'role': 'mentor',
+        'description': 'Guide who has walked this road before',
+        'traits': ['wise', 'guarded', 'patient'],
+        'goal': 'prepare the next generation'
+    },
+    {
+        'name': 'Ally',
+        'role': 'ally',
+        'description': 'Loyal companion with a stake of their own',
+        'traits': ['loyal', 'impulsive', 'funny'],
+        'goal': 'prove their worth'
+    }
+]
+
+# Act structure: (act key, beat key, description)
+PLOT_BEATS = [
+    ('act_1', 'setup', 'Introduction of world and characters'),
+    ('act_1', 'inciting_incident', 'Event that starts the main conflict'),
+    ('act_1', 'plot_point_1', 'Decision that commits to the journey'),
+    ('act_2', 'rising_action', 'Series of challenges and developments'),
+    ('act_2', 'midpoint', 'Major turning point raising stakes'),
+    ('act_2', 'plot_point_2', 'Low point leading to climax'),
+    ('act_3', 'climax', 'Final confrontation and resolution'),
+    ('act_3', 'falling_action', 'Loose ends being tied up'),
+    ('act_3', 'resolution', 'Final outcome and character states')
+]
+
+CHAPTER_TITLES = [
+    "Introduction and Setting",
+    "Character Development",
+    "Rising Action",
+    "Conflict Establishment",
+    "Story Development",
+    "Climax Build-up",
+    "Major Turning Point",
+    "Resolution Phase",
+    "Character Resolution",
+    "Plot Conclusion",
+    "Epilogue Setup",
+    "Final Resolution"
+]
+
+ARC_STAGES = ['beginning', 'development', 'transformation']
+
+
+class StoryBible:
+    """Characters, arcs, plot beats, scenes and chapters as one dependency graph.
+
+    Inputs (the premise and each character) are set directly; everything else is
+    derived by a builder from its dependencies. Changing an input marks only its
+    transitive dependents stale, and recompute() rebuilds them in dependency order,
+    stopping early wherever a rebuilt node comes out unchanged.
+    """
+
+    def __init__(self, genre: str, description: str, chapters: int = 12, scenes_per_chapter: int = 2,
+                 cast: Optional[List[Dict[str, Any]]] = None):
+        self.params = {'genre': genre, 'description': description, 'chapters': chapters,
+                       'scenes_per_chapter': scenes_per_chapter}
+        self.data: Dict[str, Any] = {}
+        self.deps: Dict[str, List[str]] = {}
+        self.dependents: Dict[str, List[str]] = {}
+        self.builders: Dict[str, Callable[[str], Any]] = {}
+        self.order: List[str] = []
+        self.stale = set()
+        self.changed = set()
+
+        cast = copy.deepcopy(cast or DEFAULT_CAST)
+        self.character_ids = [f"character:{i}" for i in range(len(cast))]
+        self._add_input('premise', {'genre': genre, 'description': description})
+        for node_id, character in zip(self.character_ids, cast):
+            self._add_input(node_id, character)
+
+        for i, node_id in enumerate(self.character_ids):
+            self._add_derived(f"arc:{i}", self._build_arc, ['premise', node_id])
+
+        for act, beat, _ in PLOT_BEATS:
+            self._add_derived(f"beat:{act}.{beat}", self._build_beat, ['premise'])
+
+        total_scenes = chapters * scenes_per_chapter
+        self.scene_cast: Dict[str, Tuple[int, int]] = {}
+        for s in range(total_scenes):
+            pov, other = self._scene_pair(s, len(cast))
+            scene_id = f"scene:{s}"
+            self.scene_cast[scene_id] = (pov, other)
+            beat = self._beat_for(s, total_scenes)
+            self._add_derived(scene_id, self._build_scene,
+                              [beat, self.character_ids[pov], self.character_ids[other], f"arc:{pov}"])
+
+        for c in range(chapters):
+            scenes = [f"scene:{c * scenes_per_chapter + k}" for k in range(scenes_per_chapter)]
+            self._add_derived(f"chapter:{c}", self._build_chapter, scenes)
+
+        self.recompute()
+
+    # Graph construction
+    def _add_input(self, node_id: str, data: Any):
+        self.deps[node_id] = []
+        self.dependents.setdefault(node_id, [])
+        self.data[node_id] = data
+        self.order.append(node_id)
+
+    def _add_derived(self, node_id: str, builder: Callable[[str], Any], deps: List[str]):
+        self.deps[node_id] = deps
+        self.builders[node_id] = builder
+        self.dependents.setdefault(node_id, [])
+        for dep in deps:
+            self.dependents[dep].append(node_id)
+        # Nodes are only added after their dependencies, so insertion order is topological
+        self.order.append(node_id)
+        self.stale.add(node_id)
+
+    def _scene_pair(self, index: int, cast_size: int) -> Tuple[int, int]:
+        """Point-of-view and supporting character for a scene, rotating through the cast"""
+        pov = index % cast_size if index % 3 else 0
+        other = (pov + 1 + index // cast_size) % cast_size
+        if other == pov:
+            other = (pov + 1) % cast_size
+        return pov, other
+
+    def _beat_for(self, index: int, total: int) -> str:
+        act, beat, _ = PLOT_BEATS[min(len(PLOT_BEATS) - 1, index * len(PLOT_BEATS) // total)]
+        return f"beat:{act}.{beat}"
+
+    # Editing
+    def set_input(self, node_id: str, data: Any):
+        if node_id in self.builders:
+            raise ValueError(f"{node_id} is derived and cannot be set directly")
+        if self.data.get(node_id) == data:
+            return
+        self.data[node_id] = data
+        self.changed.add(node_id)
+        self._mark_stale(node_id)
+
+    def update_character(self, character: Any, **changes) -> str:
+        """Edit a character by name or index; returns its node id"""
+        node_id = self.find_character(character)
+        updated = dict(self.data[node_id])
+        updated.update(changes)
+        self.set_input(node_id, updated)
+        return node_id
+
+    def find_character(self, character: Any) -> str:
+        if isinstance(character, int):
+            return self.character_ids[character]
+        for node_id in self.character_ids:
+            if self.data[node_id]['name'] == character:
+                return node_id
+        raise KeyError(f"No character named {character!r}")
+
+    def _mark_stale(self, node_id: str):
+        pending = list(self.dependents[node_id])
+        while pending:
+            dependent = pending.pop()
+            if dependent not in self.stale:
+                self.stale.add(dependent)
+                pending.extend(self.dependents[dependent])
+
+    def recompute(self) -> List[str]:
+        """Rebuild stale nodes whose inputs actually changed; returns the rebuilt node ids"""
+        rebuilt = []
+        for node_id in self.order:
+            if node_id not in self.stale:
+                continue
+            self.stale.discard(node_id)
+            if node_id in self.data and not any(dep in self.changed for dep in self.deps[node_id]):
+                continue
+            value = self.builders[node_id](node_id)
+            rebuilt.append(node_id)
+            if self.data.get(node_id) != value:
+                self.data[node_id] = value
+                self.changed.add(node_id)
+        self.changed.clear()
+        return rebuilt
+
+    # Builders
+    def _build_arc(self, node_id: str) -> Dict[str, Any]:
+        character = self.data[self.deps[node_id][1]]
+        genre = self.data['premise']['genre']
+        traits = character.get('traits') or ['unremarkable']
+        return {
+            'character': character['name'],
+            'beginning': f"{character['name']} is {traits[0]} but unable to {character.get('goal', 'act')}",
+            'development': f"The {genre} conflict tests whether being {', '.join(traits)} is enough",
+            'transformation': f"{character['name']} learns what it costs to {character.get('goal', 'act')}"
+        }
+
+    def _build_beat(self, node_id: str) -> Dict[str, Any]:
+        act, beat = node_id.split(':', 1)[1].split('.')
+        description = next(text for a, b, text in PLOT_BEATS if a == act and b == beat)
+        premise = self.data['premise']
+        return {'act': act, 'beat': beat, 'summary': description,
+                'premise': f"{description} in a story where {premise['description']}"}
+
+    def _build_scene(self, node_id: str) -> Dict[str, Any]:
+        beat_id, pov_id, other_id, arc_id = self.deps[node_id]
+        beat, pov, other, arc = (self.data[d] for d in (beat_id, pov_id, other_id, arc_id))
+        index = int(node_id.split(':')[1])
+        total = self.params['chapters'] * self.params['scenes_per_chapter']
+        stage = ARC_STAGES[min(len(ARC_STAGES) - 1, index * len(ARC_STAGES) // total)]
+        return {
+            'scene': f"Scene {index + 1}: {beat['beat'].replace('_', ' ').title()}",
+            'description': f"{beat['summary']}: {pov['name']} faces {other['name']}. {arc[stage]}",
+            'characters': [pov['name'], other['name']],
+            'visual_elements': ['setting', 'atmosphere'] + pov.get('traits', [])[:1] + other.get('traits', [])[:1],
+            'art_style': f"Based on {self.data['premise']['genre']} genre requirements"
+        }
+
+    def _build_chapter(self, node_id: str) -> Dict[str, Any]:
+        index = int(node_id.split(':')[1])
+        scenes = [self.data[dep] for dep in self.deps[node_id]]
+        title = CHAPTER_TITLES[index] if index < len(CHAPTER_TITLES) else f"Chapter {index + 1}"
+        names = []
+        for scene in scenes:
+            names.extend(name for name in scene['characters'] if name not in names)
+        return {
+            'chapter': index + 1,
+            'title': title,
+            'summary': ' '.join(scene['description'] for scene in scenes),
+            'key_elements': ['character', 'plot', 'theme'],
+            'characters': names
+        }
+
+    # Projections in the shapes content_data has always used
+    def characters(self) -> List[Dict[str, Any]]:
+        characters = []
+        for i, node_id in enumerate(self.character_ids):
+            character = dict(self.data[node_id])
+            character.setdefault('arc', self.data[f"arc:{i}"]['transformation'])
+            characters.append(character)
+        return characters
+
+    def arcs(self) -> List[Dict[str, Any]]:
+        return [self.data[f"arc:{i}"] for i in range(len(self.character_ids))]
+
+    def plot(self) -> Dict[str, Dict[str, str]]:
+        plot = {}
+        for act, beat, _ in PLOT_BEATS:
+            plot.setdefault(act, {})[beat] = self.data[f"beat:{act}.{beat}"]['summary']
+        return plot
+
+    def scenes(self) -> List[Dict[str, Any]]:
+        return [self.data[scene_id] for scene_id in self.scene_cast]
+
+    def outline(self) -> List[Dict[str, Any]]:
+        return [self.data[f"chapter:{c}"] for c in range(self.params['chapters'])]
+
+    # Persistence
+    def to_dict(self) -> Dict[str, Any]:
+        return {'params': self.params, 'nodes': self.data}
+
+    @classmethod
+    def from_dict(cls, saved: Dict[str, Any]) -> 'StoryBible':
+        """Rebuild the graph from saved params (the constructor computes every node once), then restore the saved node data over it"""
+        nodes = saved['nodes']
+        cast = [nodes[key] for key in sorted((k for k in nodes if k.startswith('character:')),
+                                             key=lambda k: int(k.split(':')[1]))]
+        bible = cls(cast=cast, **saved['params'])
+        bible.data.update(copy.deepcopy(nodes))
+        return bible
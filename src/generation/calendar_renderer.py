@@ -0,0 +1,317 @@
+# src/generation/calendar_renderer.py
+
+import os
+import calendar
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+from PIL import Image, ImageDraw
+
+from .raster_ops import load_font
+from .font_cache import font_cache
+
+# Month and weekday names per locale, weekdays listed Monday first
+LOCALES = {
+    'en': {
+        'months': ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+                   'August', 'September', 'October', 'November', 'December'],
+        'weekdays': ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
+        'first_weekday': calendar.SUNDAY
+    },
+    'es': {
+        'months': ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio', 'Julio',
+                   'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre'],
+        'weekdays': ['Lun', 'Mar', 'Mié', 'Jue', 'Vie', 'Sáb', 'Dom'],
+        'first_weekday': calendar.MONDAY
+    },
+    'fr': {
+        'months': ['Janvier', 'Février', 'Mars', 'Avril', 'Mai', 'Juin', 'Juillet',
+                   'Août', 'Septembre', 'Octobre', 'Novembre', 'Décembre'],
+        'weekdays': ['Lun', 'Mar', 'Mer', 'Jeu', 'Ven', 'Sam', 'Dim'],
+        'first_weekday': calendar.MONDAY
+    },
+    'de': {
+        'months': ['Januar', 'Februar', 'März', 'April', 'Mai', 'Juni', 'Juli',
+                   'August', 'September', 'Oktober', 'November', 'Dezember'],
+        'weekdays': ['Mo', 'Di', 'Mi', 'Do', 'Fr', 'Sa', 'So'],
+        'first_weekday': calendar.MONDAY
+    }
+}
+
+# Holiday rules per locale:
+#   ('fixed', month, day, name)
+#   ('nth_weekday', month, weekday, n, name)   n = -1 means last
+#   ('easter', day_offset, name)
+HOLIDAYS = {
+    'en': [
+        ('fixed', 1, 1, "New Year's Day"),
+        ('nth_weekday', 1, calendar.MONDAY, 3, 'MLK Day'),
+        ('fixed', 2, 14, "Valentine's Day"),
+        ('easter', 0, 'Easter'),
+        ('nth_weekday', 5, calendar.MONDAY, -1, 'Memorial Day'),
+        ('fixed', 7, 4, 'Independence Day'),
+        ('nth_weekday', 9, calendar.MONDAY, 1, 'Labor Day'),
+        ('fixed', 10, 31, 'Halloween'),
+        ('nth_weekday', 11, calendar.THURSDAY, 4, 'Thanksgiving'),
+        ('fixed', 12, 25, 'Christmas Day')
+    ],
+    'es': [
+        ('fixed', 1, 1, 'Año Nuevo'),
+        ('fixed', 1, 6, 'Reyes'),
+        ('easter', -2, 'Viernes Santo'),
+        ('fixed', 5, 1, 'Día del Trabajo'),
+        ('fixed', 10, 12, 'Fiesta Nacional'),
+        ('fixed', 12, 25, 'Navidad')
+    ],
+    'fr': [
+        ('fixed', 1, 1, "Jour de l'an"),
+        ('easter', 1, 'Lundi de Pâques'),
+        ('fixed', 5, 1, 'Fête du Travail'),
+        ('fixed', 7, 14, 'Fête nationale'),
+        ('fixed', 11, 11, 'Armistice'),
+        ('fixed', 12, 25, 'Noël')
+    ],
+    'de': [
+        ('fixed', 1, 1, 'Neujahr'),
+        ('easter', -2, 'Karfreitag'),
+        ('easter', 1, 'Ostermontag'),
+        ('fixed', 5, 1, 'Tag der Arbeit'),
+        ('fixed', 10, 3, 'Tag der Einheit'),
+        ('fixed', 12, 25, 'Weihnachten')
+    ]
+}
+
+
+def easter_sunday(year: int) -> date:
+    """Gregorian Easter (anonymous computus)"""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = (h + l - 7 * m + 114) % 31 + 1
+    return date(year, month, day)
+
+
+def holidays_for(year: int, locale: str) -> Dict[date, str]:
+    """Resolve a locale's holiday rules into concrete dates"""
+    resolved = {}
+    for rule in HOLIDAYS.get(locale, []):
+        if rule[0] == 'fixed':
+            _, month, day, name = rule
+            resolved[date(year, month, day)] = name
+        elif rule[0] == 'nth_weekday':
+            _, month, weekday, n, name = rule
+            days = [d for d in calendar.Calendar().itermonthdates(year, month)
+                    if d.month == month and d.weekday() == weekday]
+            resolved[days[n if n < 0 else n - 1]] = name
+        elif rule[0] == 'easter':
+            _, offset, name = rule
+            resolved[easter_sunday(year) + timedelta(days=offset)] = name
+    return resolved
+
+
+class CalendarTemplateCache:
+    """LRU of pre-rendered RGBA month layers shared by every calendar job"""
+
+    def __init__(self, max_entries: int = 96):
+        self.max_entries = max_entries
+        self.templates = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple, build) -> Image.Image:
+        with self.lock:
+            template = self.templates.get(key)
+            if template is not None:
+                self.templates.move_to_end(key)
+                self.hits += 1
+                return template
+
+        # Build outside the lock; a concurrent duplicate build is harmless
+        template = build()
+        with self.lock:
+            self.misses += 1
+            self.templates[key] = template
+            self.templates.move_to_end(key)
+            while len(self.templates) > self.max_entries:
+                self.templates.popitem(last=False)
+        return template
+
+    def clear(self):
+        with self.lock:
+            self.templates.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        return {'entries': len(self.templates), 'hits': self.hits, 'misses': self.misses}
+
+
+class CalendarEngine:
+    """Renders 12-month printable calendars from cached month templates"""
+
+    def __init__(self, output_dir: str = "outputs/images/calendars",
+                 page_size: Tuple[int, int] = (1275, 1650), art_ratio: float = 0.5,
+                 cache: Optional[CalendarTemplateCache] = None):
+        self.output_dir = output_dir
+        self.page_size = page_size
+        self.art_ratio = art_ratio
+        self.cache = cache or template_cache
+        os.makedirs(output_dir, exist_ok=True)
+
+    @property
+    def art_box(self) -> Tuple[int, int, int, int]:
+        width, height = self.page_size
+        margin = width // 20
+        return (margin, margin, width - margin, int(height * self.art_ratio))
+
+    def render_calendar(self, year: int, art: List[Any], locale: str = 'en',
+                        title: Optional[str] = None) -> Dict[str, Any]:
+        """Render one personalised year; `art` holds up to 12 images or paths, reused cyclically"""
+        if locale not in LOCALES:
+            raise ValueError(f"Unsupported calendar locale: {locale}")
+
+        stem = f"calendar_{year}_{locale}_{datetime.now().strftime('%Y%m%d_%H%M%S%f')}"
+        job_dir = os.path.join(self.output_dir, stem)
+        os.makedirs(job_dir, exist_ok=True)
+
+        pages, page_paths = [], []
+        for month in range(1, 13):
+            source = art[(month - 1) % len(art)] if art else None
+            page = self.render_month(year, month, source, locale)
+            path = os.path.join(job_dir, f"{month:02d}.png")
+            page.save(path, compress_level=1)
+            pages.append(page)
+            page_paths.append(path)
+
+        pdf_path = os.path.join(job_dir, f"{stem}.pdf")
+        pages[0].save(pdf_path, save_all=True, append_images=pages[1:], resolution=150.0, title=title or stem)
+
+        return {
+            'year': year,
+            'locale': locale,
+            'pages': page_paths,
+            'pdf': pdf_path,
+            'holidays': {d.isoformat(): name for d, name in sorted(holidays_for(year, locale).items())},
+            'template_cache': self.cache.get_stats()
+        }
+
+    def render_month(self, year: int, month: int, art: Any = None, locale: str = 'en') -> Image.Image:
+        """Composite the per-job art under the cached month layer"""
+        template = self.cache.get((year, month, locale, self.page_size, self.art_ratio),
+                                  lambda: self._build_template(year, month, locale))
+        page = Image.new('RGBA', self.page_size, (255, 255, 255, 255))
+        if art is not None:
+            x0, y0, x1, y1 = self.art_box
+            image = art if isinstance(art, Image.Image) else Image.open(art)
+            page.paste(_cover(image, (x1 - x0, y1 - y0)), (x0, y0))
+        page.alpha_composite(template)
+        return page.convert('RGB')
+
+    def synthesize_art(self, seed: int) -> Image.Image:
+        """Procedural sky-and-hills artwork used when no images are supplied"""
+        rng = np.random.default_rng(seed)
+        x0, y0, x1, y1 = self.art_box
+        width, height = x1 - x0, y1 - y0
+
+        top, bottom = rng.integers(60, 256, size=(2, 3))
+        ramp = np.linspace(0.0, 1.0, height)[:, None, None]
+        sky = (top * (1 - ramp) + bottom * ramp).astype(np.uint8)
+        image = Image.fromarray(np.broadcast_to(sky, (height, width, 3)).copy(), 'RGB')
+
+        draw = ImageDraw.Draw(image)
+        xs = np.linspace(0, width, 24)
+        for layer in range(3):
+            base = height * (0.55 + 0.15 * layer)
+            ys = base + rng.normal(0, height * 0.05, size=len(xs)).cumsum() * 0.3
+            shade = tuple(int(c) for c in rng.integers(20, 160, size=3))
+            draw.polygon([(0, height)] + list(zip(xs, ys)) + [(width, height)], fill=shade)
+        return image
+
+    def _build_template(self, year: int, month: int, locale: str) -> Image.Image:
+        """Static month layer: title, weekday header, grid, numbers and holidays"""
+        names = LOCALES[locale]
+        width, height = self.page_size
+        margin = width // 20
+        layer = Image.new('RGBA', self.page_size, (0, 0, 0, 0))
+        draw = ImageDraw.Draw(layer)
+
+        # Frame around the art area so every page has the same border
+        draw.rectangle(self.art_box, outline=(40, 40, 40, 255), width=3)
+
+        top = self.art_box[3] + margin // 2
+        title_font = load_font(width // 18)
+        draw.text((width / 2, top + width // 36), f"{names['months'][month - 1]} {year}",
+                  fill=(20, 20, 20, 255), font=title_font, anchor='mm')
+
+        grid_top = top + width // 12
+        cell_w = (width - 2 * margin) / 7
+        header_h = width // 28
+        weeks = calendar.Calendar(names['first_weekday']).monthdayscalendar(year, month)
+        cell_h = (height - margin - grid_top - header_h) / len(weeks)
+
+        header_font = load_font(header_h // 2 + 4)
+        order = [(names['first_weekday'] + i) % 7 for i in range(7)]
+        for col, weekday in enumerate(order):
+            cx = margin + cell_w * (col + 0.5)
+            draw.text((cx, grid_top + header_h / 2), names['weekdays'][weekday],
+                      fill=(60, 60, 60, 255), font=header_font, anchor='mm')
+
+        holidays = holidays_for(year, locale)
+        day_size = int(cell_h // 4)
+        note_font = load_font(max(10, int(cell_h // 8)))
+        body_top = grid_top + header_h
+
+        for row, week in enumerate(weeks):
+            for col, day in enumerate(week):
+                x0 = margin + cell_w * col
+                y0 = body_top + cell_h * row
+                box = [x0, y0, x0 + cell_w, y0 + cell_h]
+                if day == 0:
+                    draw.rectangle(box, fill=(235, 235, 235, 255), outline=(120, 120, 120, 255))
+                    continue
+
+                holiday = holidays.get(date(year, month, day))
+                fill = (255, 236, 200, 255) if holiday else (255, 255, 255, 255)
+                draw.rectangle(box, fill=fill, outline=(120, 120, 120, 255))
+
+                weekend = order[col] >= calendar.SATURDAY
+                color = (190, 30, 30, 255) if weekend or holiday else (30, 30, 30, 255)
+                font_cache.draw_text(layer, (x0 + 8, y0 + 6), str(day), day_size, color, draw=draw)
+                if holiday:
+                    draw.text((x0 + 8, y0 + cell_h - 8), _fit_text(draw, holiday, note_font, cell_w - 16),
+                              fill=(150, 60, 0, 255), font=note_font, anchor='ls')
+        return layer
+
+
+def _cover(image: Image.Image, size: Tuple[int, int]) -> Image.Image:
+    """Scale and centre-crop to fill `size` exactly"""
+    width, height = size
+    scale = max(width / image.width, height / image.height)
+    resized = image.convert('RGB').resize((max(width, round(image.width * scale)),
+                                           max(height, round(image.height * scale))),
+                                          Image.Resampling.LANCZOS)
+    left = (resized.width - width) // 2
+    top = (resized.height - height) // 2
+    return resized.crop((left, top, left + width, top + height))
+
+
+def _fit_text(draw: ImageDraw.ImageDraw, text: str, font, max_width: float) -> str:
+    """Trim text with an ellipsis until it fits"""
+    if draw.textlength(text, font=font) <= max_width:
+        return text
+    while text and draw.textlength(text + '…', font=font) > max_width:
+        text = text[:-1]
+    return text + '…'
+
+
+# Global instance
+template_cache = CalendarTemplateCache()
@@ -0,0 +1,311 @@
+# src/generation/color_by_numbers.py
+
+import os
+import json
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+
+from .raster_ops import row_runs, run_adjacency, union_runs, boundaries, chamfer_distance, load_font
+from .font_cache import font_cache
+
+# Working state held per pixel: RGB input, colour index, int32 region map,
+# float32 distance map plus the temporaries used while placing labels.
+BYTES_PER_WORK_PIXEL = 24
+
+# Pixels handed to the k-means seeding and to each mini-batch step
+KMEANS_SAMPLE_SIZE = 20000
+KMEANS_BATCH_SIZE = 8192
+
+# Pixels assigned to the palette per chunk, bounds the N x K distance matrix
+ASSIGN_CHUNK_PIXELS = 1 << 18
+
+MAX_MERGE_PASSES = 8
+
+
+class ColorByNumbersEngine:
+    """Turns an image into a numbered colour-by-numbers page"""
+
+    def __init__(self, output_dir: str = "outputs/images/color_by_numbers", n_colors: int = 12,
+                 min_region_ratio: float = 0.0004, smooth_size: int = 5,
+                 kmeans_iterations: int = 40, memory_budget_mb: int = 256, seed: Optional[int] = None):
+        self.output_dir = output_dir
+        self.n_colors = n_colors
+        self.min_region_ratio = min_region_ratio
+        self.smooth_size = smooth_size
+        self.kmeans_iterations = kmeans_iterations
+        self.memory_budget_mb = memory_budget_mb
+        self.rng = np.random.default_rng(seed)
+        os.makedirs(output_dir, exist_ok=True)
+
+    def generate(self, source: Any, title: str = "Color by Numbers", page_number: int = 1) -> Dict[str, Any]:
+        """Quantize, segment and render one page from an image or image path"""
+        image = self._load_working_image(source)
+        width, height = image.size
+        pixels = np.asarray(image, dtype=np.uint8)
+
+        index, palette = self.quantize(pixels)
+        del pixels
+        index = self._smooth(index.reshape(height, width))
+
+        min_area = max(4, int(width * height * self.min_region_ratio))
+        regions, region_color = self.label_regions(index, min_area)
+        del index
+
+        numbers, legend = self._number_colors(region_color, palette)
+        labels = self.place_labels(regions, numbers[region_color])
+
+        stem = f"cbn_{datetime.now().strftime('%Y%m%d_%H%M%S')}_p{page_number:02d}"
+        outline_path = os.path.join(self.output_dir, f"{stem}_outline.png")
+        preview_path = os.path.join(self.output_dir, f"{stem}_preview.png")
+
+        self.render_outline(regions, labels, legend, title).save(outline_path)
+        self._render_preview(regions, region_color, palette).save(preview_path)
+
+        page = {
+            'page': page_number,
+            'outline': outline_path,
+            'preview': preview_path,
+            'size': [width, height],
+            'regions': len(labels),
+            'palette': legend
+        }
+        with open(os.path.join(self.output_dir, f"{stem}.json"), 'w', encoding='utf-8') as f:
+            json.dump(page, f, indent=2)
+        return page
+
+    def synthesize_source(self, seed: int, size: Tuple[int, int] = (900, 1200)) -> Image.Image:
+        """Procedural blob scene used when no source artwork is supplied"""
+        rng = np.random.default_rng(seed)
+        field = rng.integers(0, 256, size=(5, 4, 3), dtype=np.uint8)
+        image = Image.fromarray(field, 'RGB').resize(size, Image.Resampling.BICUBIC)
+
+        draw = ImageDraw.Draw(image)
+        width, height = size
+        for _ in range(rng.integers(6, 12)):
+            x, y = rng.integers(0, width), rng.integers(0, height)
+            rx, ry = rng.integers(width // 12, width // 4, size=2)
+            color = tuple(int(c) for c in rng.integers(0, 256, size=3))
+            draw.ellipse([x - rx, y - ry, x + rx, y + ry], fill=color)
+        return image
+
+    # Palette quantization
+    def quantize(self, pixels: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """K-means palette; returns (flat colour index, palette as K x 3 uint8)"""
+        flat = pixels.reshape(-1, 3)
+        n = flat.shape[0]
+
+        sample = flat[self.rng.choice(n, size=min(n, KMEANS_SAMPLE_SIZE), replace=False)]
+        centers = self._seed_centers(sample.astype(np.float32), min(self.n_colors, n))
+        counts = np.zeros(len(centers))
+
+        for _ in range(self.kmeans_iterations):
+            # Small images run exact Lloyd steps, large ones mini-batches
+            if n <= KMEANS_BATCH_SIZE:
+                batch = flat.astype(np.float32)
+            else:
+                batch = flat[self.rng.integers(0, n, size=KMEANS_BATCH_SIZE)].astype(np.float32)
+
+            nearest = _nearest_center(batch, centers)
+            batch_counts = np.bincount(nearest, minlength=len(centers)).astype(np.float64)
+            sums = np.stack([
+                np.bincount(nearest, weights=batch[:, c], minlength=len(centers)) for c in range(3)
+            ], axis=1)
+
+            hit = batch_counts > 0
+            means = sums[hit] / batch_counts[hit, None]
+            if n <= KMEANS_BATCH_SIZE:
+                centers[hit] = means
+            else:
+                counts += batch_counts
+                rate = (batch_counts[hit] / counts[hit])[:, None]
+                centers[hit] += rate * (means - centers[hit])
+
+        index = np.empty(n, dtype=np.uint8)
+        for start in range(0, n, ASSIGN_CHUNK_PIXELS):
+            chunk = flat[start:start + ASSIGN_CHUNK_PIXELS].astype(np.float32)
+            index[start:start + ASSIGN_CHUNK_PIXELS] = _nearest_center(chunk, centers)
+
+        return index, np.clip(np.rint(centers), 0, 255).astype(np.uint8)
+
+    def _seed_centers(self, sample: np.ndarray, k: int) -> np.ndarray:
+        """k-means++ seeding on a pixel sample"""
+        centers = [sample[self.rng.integers(len(sample))]]
+        closest = ((sample - centers[0]) ** 2).sum(axis=1)
+        for _ in range(1, k):
+            total = closest.sum()
+            if total <= 0:
+                pick = self.rng.integers(len(sample))
+            else:
+                pick = self.rng.choice(len(sample), p=closest / total)
+            centers.append(sample[pick])
+            closest = np.minimum(closest, ((sample - sample[pick]) ** 2).sum(axis=1))
+        return np.array(centers, dtype=np.float32)
+
+    def _smooth(self, index: np.ndarray) -> np.ndarray:
+        """Mode filter removes single-pixel speckle before segmentation"""
+        if self.smooth_size < 3:
+            return index
+        smoothed = Image.fromarray(index, 'L').filter(ImageFilter.ModeFilter(self.smooth_size))
+        return np.asarray(smoothed, dtype=np.uint8)
+
+    # Region labeling
+    def label_regions(self, index: np.ndarray, min_area: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Connected regions with small ones merged into their largest-border neighbour"""
+        height, width = index.shape
+        starts, ends = row_runs(index)
+        run_color = index.ravel()[starts].astype(np.int32)
+        run_length = ends - starts
+        edge_a, edge_b, edge_weight = run_adjacency(starts, ends, width)
+
+        for _ in range(MAX_MERGE_PASSES):
+            region_of_run = union_runs(len(starts), edge_a, edge_b, run_color)
+            region_count = int(region_of_run.max()) + 1
+            area = np.bincount(region_of_run, weights=run_length, minlength=region_count)
+            region_color = np.zeros(region_count, dtype=np.int32)
+            region_color[region_of_run] = run_color
+
+            target = _merge_targets(region_of_run[edge_a], region_of_run[edge_b], edge_weight, area, min_area)
+            if target is None:
+                break
+            run_color = region_color[target[region_of_run]]
+        else:
+            region_of_run = union_runs(len(starts), edge_a, edge_b, run_color)
+            region_color = np.zeros(int(region_of_run.max()) + 1, dtype=np.int32)
+            region_color[region_of_run] = run_color
+
+        regions = np.repeat(region_of_run.astype(np.int32), run_length).reshape(height, width)
+        return regions, region_color
+
+    def _number_colors(self, region_color: np.ndarray, palette: np.ndarray) -> Tuple[np.ndarray, List[Dict]]:
+        """Number the palette entries still in use, 1..N"""
+        used = np.unique(region_color)
+        numbers = np.zeros(len(palette), dtype=np.int32)
+        numbers[used] = np.arange(1, len(used) + 1)
+
+        legend = []
+        for color_index in used:
+            r, g, b = (int(c) for c in palette[color_index])
+            legend.append({
+                'number': int(numbers[color_index]),
+                'rgb': [r, g, b],
+                'hex': f"#{r:02x}{g:02x}{b:02x}"
+            })
+        return numbers, legend
+
+    # Label placement
+    def place_labels(self, regions: np.ndarray, region_numbers: np.ndarray) -> List[Dict]:
+        """Put each region's number at its pole of inaccessibility"""
+        distance = chamfer_distance(boundaries(regions))
+        flat_regions = regions.ravel()
+        flat_distance = distance.ravel()
+
+        deepest = np.zeros(len(region_numbers), dtype=np.float32)
+        np.maximum.at(deepest, flat_regions, flat_distance)
+        candidates = np.flatnonzero(flat_distance >= deepest[flat_regions])
+        found, first = np.unique(flat_regions[candidates], return_index=True)
+        positions = candidates[first]
+
+        width = regions.shape[1]
+        labels = []
+        for region, position in zip(found, positions):
+            labels.append({
+                'number': int(region_numbers[region]),
+                'x': int(position % width),
+                'y': int(position // width),
+                'radius': float(deepest[region])
+            })
+        return labels
+
+    # Rendering
+    def render_outline(self, regions: np.ndarray, labels: List[Dict], legend: List[Dict],
+                       title: str) -> Image.Image:
+        """Black outlines, region numbers and a swatch legend below"""
+        height, width = regions.shape
+        outline = Image.fromarray(np.where(boundaries(regions), 0, 255).astype(np.uint8), 'L')
+
+        swatch = max(24, width // 30)
+        columns = max(1, width // (swatch * 5))
+        legend_rows = (len(legend) + columns - 1) // columns
+        legend_height = swatch * 2 + legend_rows * (swatch + swatch // 2)
+
+        page = Image.new('RGB', (width, height + legend_height), 'white')
+        page.paste(outline.convert('RGB'), (0, 0))
+        draw = ImageDraw.Draw(page)
+
+        for label in labels:
+            size = int(min(max(label['radius'] * 1.2, 8), 32))
+            font_cache.draw_text(page, (label['x'], label['y']), str(label['number']), size, (90, 90, 90),
+                                 anchor='mm', draw=draw)
+
+        draw.text((swatch // 2, height + swatch // 2), title, fill='black', font=load_font(swatch // 2 + 4))
+        for i, entry in enumerate(legend):
+            col, row = i % columns, i // columns
+            x = swatch // 2 + col * swatch * 5
+            y = height + swatch * 2 - swatch // 2 + row * (swatch + swatch // 2)
+            draw.rectangle([x, y, x + swatch, y + swatch], fill=tuple(entry['rgb']), outline='black')
+            font_cache.draw_text(page, (x + swatch + 8, y + swatch // 2), f"{entry['number']}  {entry['hex']}",
+                                 swatch // 2, 'black', anchor='lm', draw=draw)
+        return page
+
+    def _render_preview(self, regions: np.ndarray, region_color: np.ndarray, palette: np.ndarray) -> Image.Image:
+        """Solved page as a paletted image, one byte per pixel"""
+        preview = Image.fromarray(region_color.astype(np.uint8)[regions], 'P')
+        preview.putpalette(palette.ravel().tolist())
+        return preview
+
+    def _load_working_image(self, source: Any) -> Image.Image:
+        """Open the source at the largest size the memory budget allows"""
+        image = source if isinstance(source, Image.Image) else Image.open(source)
+        max_pixels = self.memory_budget_mb * 1024 * 1024 // BYTES_PER_WORK_PIXEL
+        width, height = image.size
+        scale = min(1.0, (max_pixels / float(width * height)) ** 0.5)
+        target = (max(1, int(width * scale)), max(1, int(height * scale)))
+
+        if scale < 1.0:
+            # JPEG decoders scale while decoding, so the full frame never lands in memory
+            image.draft('RGB', target)
+        image = image.convert('RGB')
+        if image.size != target:
+            image = image.resize(target, Image.Resampling.BOX)
+        return image
+
+
+def _nearest_center(points: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    """Index of the closest center for every point (squared Euclidean)"""
+    distance = (centers ** 2).sum(axis=1)[None, :] - 2.0 * points @ centers.T
+    return distance.argmin(axis=1)
+
+
+def _merge_targets(region_a: np.ndarray, region_b: np.ndarray, weight: np.ndarray,
+                   area: np.ndarray, min_area: int) -> Optional[np.ndarray]:
+    """Map each small region onto the larger neighbour it shares the most border with"""
+    crossing = region_a != region_b
+    src = np.concatenate([region_a[crossing], region_b[crossing]])
+    dst = np.concatenate([region_b[crossing], region_a[crossing]])
+    w = np.concatenate([weight[crossing], weight[crossing]]).astype(np.float64)
+
+    # Only merge upward in (area, id) order so merge chains cannot cycle
+    upward = (area[src] < min_area) & ((area[dst] > area[src]) | ((area[dst] == area[src]) & (dst > src)))
+    if not upward.any():
+        return None
+    src, dst, w = src[upward], dst[upward], w[upward]
+
+    pair = src * len(area) + dst
+    unique_pair, inverse = np.unique(pair, return_inverse=True)
+    border = np.bincount(inverse, weights=w)
+    pair_src, pair_dst = unique_pair // len(area), unique_pair % len(area)
+
+    order = np.lexsort((border, pair_src))
+    is_last = np.ones(len(order), dtype=bool)
+    is_last[:-1] = pair_src[order][1:] != pair_src[order][:-1]
+    best = order[is_last]
+
+    target = np.arange(len(area))
+    target[pair_src[best]] = pair_dst[best]
+    while True:
+        jumped = target[target]
+        if np.array_equal(jumped, target):
+            return target
+        target = jumped
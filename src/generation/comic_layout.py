@@ -0,0 +1,287 @@
+# src/generation/comic_layout.py
+
+import os
+import json
+import zlib
+import hashlib
+import zipfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+from PIL import Image, ImageDraw
+
+from .font_cache import font_cache
+
+# Row splits per panel count; pages alternate between the variants
+PANEL_GRIDS = {
+    1: [[1]],
+    2: [[1, 1], [2]],
+    3: [[1, 2], [2, 1], [1, 1, 1]],
+    4: [[2, 2], [1, 2, 1], [1, 3]],
+    5: [[2, 3], [3, 2], [2, 1, 2]],
+    6: [[3, 3], [2, 2, 2], [1, 2, 3]],
+    7: [[2, 3, 2], [3, 1, 3]],
+    8: [[3, 2, 3], [2, 2, 2, 2]],
+    9: [[3, 3, 3]]
+}
+
+# Bump when the renderer changes so cached pages are redrawn
+LAYOUT_VERSION = 2
+
+# Renders of one issue share its directory (stale pages pruned, manifest rewritten), so they
+# take turns; striped so the table stays a fixed size however many issues there are
+_ISSUE_LOCKS = [threading.Lock() for _ in range(64)]
+
+
+def _issue_lock(comic_dir: str) -> threading.Lock:
+    return _ISSUE_LOCKS[zlib.crc32(os.path.abspath(comic_dir).encode('utf-8')) % len(_ISSUE_LOCKS)]
+
+
+class TextMetrics:
+    """Wrapping and fitting on top of the shared font cache's memoised widths"""
+
+    def width(self, text: str, size: int) -> float:
+        return font_cache.text_width(text, size)
+
+    def line_height(self, size: int) -> int:
+        return int(size * 1.2)
+
+    def wrap(self, text: str, size: int, max_width: float) -> List[str]:
+        """Greedy word wrap using cached word widths"""
+        space = self.width(' ', size)
+        lines, current, current_width = [], [], 0.0
+        for word in text.split():
+            word_width = self.width(word, size)
+            needed = word_width if not current else current_width + space + word_width
+            if current and needed > max_width:
+                lines.append(' '.join(current))
+                current, current_width = [word], word_width
+            else:
+                current.append(word)
+                current_width = needed
+        if current:
+            lines.append(' '.join(current))
+        return lines
+
+    def fit(self, text: str, max_width: float, max_height: float,
+            sizes: Tuple[int, ...] = (28, 24, 21, 18, 16, 14, 12)) -> Tuple[int, List[str]]:
+        """Largest font size whose wrapped text fits the box"""
+        for size in sizes:
+            lines = self.wrap(text, size, max_width)
+            widest = max((self.width(line, size) for line in lines), default=0)
+            if widest <= max_width and len(lines) * self.line_height(size) <= max_height:
+                return size, lines
+        size = sizes[-1]
+        return size, self.wrap(text, size, max_width)
+
+
+class ComicEngine:
+    """Lays out structured comic scripts into pages, CBZ and PDF"""
+
+    def __init__(self, output_dir: str = "outputs/images/comics", page_size: Tuple[int, int] = (1200, 1800),
+                 margin: int = 60, gutter: int = 24, workers: Optional[int] = None):
+        self.output_dir = output_dir
+        self.page_size = page_size
+        self.margin = margin
+        self.gutter = gutter
+        self.workers = workers or os.cpu_count()
+        self.metrics = TextMetrics()
+        os.makedirs(output_dir, exist_ok=True)
+
+    def render_issue(self, script: Dict[str, Any], comic_id: Optional[str] = None) -> Dict[str, Any]:
+        """Render every page whose script changed since the last run, then package the issue"""
+        comic_id = comic_id or f"comic_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        comic_dir = os.path.join(self.output_dir, comic_id)
+        with _issue_lock(comic_dir):
+            return self._render_issue(script, comic_id, comic_dir)
+
+    def _render_issue(self, script: Dict[str, Any], comic_id: str, comic_dir: str) -> Dict[str, Any]:
+        pages_dir = os.path.join(comic_dir, 'pages')
+        os.makedirs(pages_dir, exist_ok=True)
+
+        manifest_path = os.path.join(comic_dir, 'manifest.json')
+        previous = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                previous = json.load(f).get('pages', {})
+
+        jobs, page_files, digests = [], [], {}
+        for number, page in enumerate(script['pages'], 1):
+            digest = self.page_hash(page, number)
+            path = os.path.join(pages_dir, f"{number:03d}_{digest}.png")
+            page_files.append(path)
+            digests[str(number)] = digest
+            if previous.get(str(number)) != digest or not os.path.exists(path):
+                jobs.append((number, page, path))
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            list(pool.map(lambda job: self.render_page(job[1], job[0]).save(job[2], compress_level=1), jobs))
+
+        # Drop renders of pages that changed or no longer exist
+        keep = {os.path.basename(path) for path in page_files}
+        for name in os.listdir(pages_dir):
+            if name not in keep:
+                os.remove(os.path.join(pages_dir, name))
+
+        cbz_path = os.path.join(comic_dir, f"{comic_id}.cbz")
+        pdf_path = os.path.join(comic_dir, f"{comic_id}.pdf")
+        self._write_cbz(page_files, cbz_path)
+        self._write_pdf(page_files, pdf_path, script.get('title', comic_id))
+
+        manifest = {
+            'title': script.get('title', comic_id),
+            'pages': digests,
+            'updated_at': datetime.now().isoformat()
+        }
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+        return {
+            'comic_id': comic_id,
+            'pages': page_files,
+            'rendered_pages': [number for number, _, _ in jobs],
+            'cbz': cbz_path,
+            'pdf': pdf_path
+        }
+
+    def page_hash(self, page: Dict[str, Any], number: int) -> str:
+        """Content hash of everything that affects a page's pixels"""
+        key = json.dumps({'page': page, 'number': number, 'size': self.page_size, 'margin': self.margin,
+                          'gutter': self.gutter, 'version': LAYOUT_VERSION}, sort_keys=True)
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+
+    # Layout
+    def panel_boxes(self, count: int, page_number: int) -> List[Tuple[int, int, int, int]]:
+        """Panel rectangles in reading order for a page"""
+        if count <= 0:
+            return []
+        variants = PANEL_GRIDS.get(count)
+        if variants is None:
+            columns = 3
+            variants = [[columns] * (count // columns) + ([count % columns] if count % columns else [])]
+        rows = variants[(page_number - 1) % len(variants)]
+
+        width, height = self.page_size
+        inner_w = width - 2 * self.margin
+        inner_h = height - 2 * self.margin
+        row_h = (inner_h - self.gutter * (len(rows) - 1)) / len(rows)
+
+        boxes = []
+        for r, columns in enumerate(rows):
+            y0 = self.margin + r * (row_h + self.gutter)
+            col_w = (inner_w - self.gutter * (columns - 1)) / columns
+            for c in range(columns):
+                x0 = self.margin + c * (col_w + self.gutter)
+                boxes.append((int(x0), int(y0), int(x0 + col_w), int(y0 + row_h)))
+        return boxes
+
+    def place_balloons(self, panel: Dict[str, Any], box: Tuple[int, int, int, int]) -> List[Dict[str, Any]]:
+        """Fit dialogue into balloons stacked down alternate sides of the panel"""
+        x0, y0, x1, y1 = box
+        width, height = x1 - x0, y1 - y0
+        pad = 14
+        balloons = []
+
+        dialogue = panel.get('dialogue', [])
+        for i, line in enumerate(dialogue):
+            side = 'left' if i % 2 == 0 else 'right'
+            max_w = width * 0.55 - 2 * pad
+            max_h = max(40, (height * 0.6) / max(1, len(dialogue)) - 2 * pad)
+            text = f"{line['speaker'].upper()}: {line['text']}" if line.get('speaker') else line['text']
+            size, lines = self.metrics.fit(text, max_w, max_h)
+
+            text_w = max(self.metrics.width(l, size) for l in lines)
+            text_h = len(lines) * self.metrics.line_height(size)
+            bw, bh = text_w + 2 * pad, text_h + 2 * pad
+            bx = x0 + 12 if side == 'left' else x1 - 12 - bw
+            by = y0 + 12
+            # Push down past any earlier balloon it would cover, leaving room for that balloon's tail
+            for placed in balloons:
+                px0, py0, px1, py1 = placed['box']
+                if bx < px1 and bx + bw > px0 and by < py1 + 24:
+                    by = py1 + 24
+            if by + bh > y1 - 12:
+                by = max(y0 + 12, y1 - 12 - bh)
+
+            balloons.append({
+                'box': (bx, by, bx + bw, by + bh),
+                'size': size,
+                'lines': lines,
+                'tail': (bx + bw * (0.3 if side == 'left' else 0.7), min(y1 - 10, by + bh + 30))
+            })
+        return balloons
+
+    # Rendering
+    def render_page(self, page: Dict[str, Any], page_number: int) -> Image.Image:
+        """Draw every panel with its art, caption and balloons"""
+        image = Image.new('RGB', self.page_size, 'white')
+        draw = ImageDraw.Draw(image)
+        panels = page.get('panels', [])
+
+        for index, (panel, box) in enumerate(zip(panels, self.panel_boxes(len(panels), page_number))):
+            seed = zlib.crc32(f"{page_number}:{index}:{panel.get('description', '')}".encode('utf-8'))
+            image.paste(self._panel_art(box, seed), box[:2])
+            draw.rectangle(box, outline='black', width=4)
+
+            if panel.get('caption'):
+                self._draw_caption(image, draw, panel['caption'], box)
+            for balloon in self.place_balloons(panel, box):
+                self._draw_balloon(image, draw, balloon)
+
+        font_cache.draw_text(image, (self.page_size[0] / 2, self.page_size[1] - self.margin / 2), str(page_number),
+                             20, 'black', anchor='mm', draw=draw)
+        return image
+
+    def _panel_art(self, box: Tuple[int, int, int, int], seed: int) -> Image.Image:
+        """Placeholder art: seeded two-tone backdrop with a horizon"""
+        rng = np.random.default_rng(seed)
+        width, height = box[2] - box[0], box[3] - box[1]
+        top, bottom = rng.integers(120, 256, size=(2, 3))
+        ramp = np.linspace(0, 1, height)[:, None, None]
+        sky = (top * (1 - ramp) + bottom * ramp).astype(np.uint8)
+        art = Image.fromarray(np.broadcast_to(sky, (height, width, 3)).copy(), 'RGB')
+
+        draw = ImageDraw.Draw(art)
+        horizon = int(height * rng.uniform(0.55, 0.8))
+        ground = tuple(int(c) for c in rng.integers(40, 140, size=3))
+        draw.rectangle([0, horizon, width, height], fill=ground)
+        return art
+
+    def _draw_caption(self, image: Image.Image, draw: ImageDraw.ImageDraw, caption: str,
+                      box: Tuple[int, int, int, int]):
+        x0, y0, x1, y1 = box
+        max_w = (x1 - x0) - 40
+        size, lines = self.metrics.fit(caption, max_w, (y1 - y0) * 0.25, sizes=(20, 17, 15, 13, 11))
+        line_h = self.metrics.line_height(size)
+        top = y1 - 12 - len(lines) * line_h - 16
+        draw.rectangle([x0 + 12, top, x1 - 12, y1 - 12], fill=(255, 245, 190), outline='black', width=2)
+        for i, line in enumerate(lines):
+            font_cache.draw_text(image, (x0 + 20, top + 8 + i * line_h), line, size, 'black', draw=draw)
+
+    def _draw_balloon(self, image: Image.Image, draw: ImageDraw.ImageDraw, balloon: Dict[str, Any]):
+        bx0, by0, bx1, by1 = balloon['box']
+        tx, ty = balloon['tail']
+        base = bx0 + (bx1 - bx0) * 0.45
+        draw.polygon([(base - 12, by1 - 4), (base + 12, by1 - 4), (tx, ty)], fill='white', outline='black')
+        draw.rounded_rectangle(balloon['box'], radius=18, fill='white', outline='black', width=3)
+        line_h = self.metrics.line_height(balloon['size'])
+        for i, line in enumerate(balloon['lines']):
+            font_cache.draw_text(image, (bx0 + 14, by0 + 14 + i * line_h), line, balloon['size'], 'black', draw=draw)
+
+    # Packaging
+    def _write_cbz(self, page_files: List[str], path: str):
+        # PNGs are already deflated, so store them as-is
+        with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_STORED) as archive:
+            for i, page_file in enumerate(page_files, 1):
+                archive.write(page_file, f"{i:03d}.png")
+
+    def _write_pdf(self, page_files: List[str], path: str, title: str):
+        # A PDF needs at least one page, so an issue without pages gets a blank one
+        pages = [Image.open(page_file) for page_file in page_files] or [Image.new('RGB', self.page_size, 'white')]
+        try:
+            pages[0].save(path, save_all=True, append_images=pages[1:], resolution=150.0, title=title)
+        finally:
+            for page in pages:
+                page.close()
@@ -0,0 +1,309 @@
+# src/generation/dot_to_dot.py
+
+import os
+import heapq
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+from PIL import Image, ImageDraw
+
+from .raster_ops import row_runs, run_adjacency, union_runs, load_font
+from .font_cache import font_cache
+
+# Contours are traced on a copy no larger than this along its long side
+TRACE_MAX_SIDE = 400
+
+# Moore neighbourhood as (dy, dx), clockwise starting west
+MOORE_OFFSETS = [(0, -1), (-1, -1), (-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1)]
+MOORE_INDEX = {offset: i for i, offset in enumerate(MOORE_OFFSETS)}
+
+# Unit directions tried for each number label, ordered by preference at runtime
+LABEL_DIRECTIONS = np.array([
+    (1, 0), (0.707, -0.707), (0, -1), (-0.707, -0.707),
+    (-1, 0), (-0.707, 0.707), (0, 1), (0.707, 0.707)
+])
+
+
+class SpatialGrid:
+    """Uniform grid of boxes for fast overlap queries"""
+
+    def __init__(self, cell_size: float):
+        self.cell_size = cell_size
+        self.cells = defaultdict(list)
+
+    def _cells(self, box: Tuple[float, float, float, float]):
+        x0, y0, x1, y1 = box
+        for cx in range(int(x0 // self.cell_size), int(x1 // self.cell_size) + 1):
+            for cy in range(int(y0 // self.cell_size), int(y1 // self.cell_size) + 1):
+                yield cx, cy
+
+    def insert(self, box: Tuple[float, float, float, float]):
+        for cell in self._cells(box):
+            self.cells[cell].append(box)
+
+    def overlaps(self, box: Tuple[float, float, float, float]) -> bool:
+        x0, y0, x1, y1 = box
+        for cell in self._cells(box):
+            for ox0, oy0, ox1, oy1 in self.cells.get(cell, ()):
+                if x0 < ox1 and ox0 < x1 and y0 < oy1 and oy0 < y1:
+                    return True
+        return False
+
+
+class DotToDotEngine:
+    """Builds numbered dot-to-dot pages from silhouette images"""
+
+    def __init__(self, output_dir: str = "outputs/images/dot_to_dot", dots_count: int = 50,
+                 page_size: Tuple[int, int] = (1275, 1650), margin: int = 120, dot_radius: int = 5,
+                 font_size: int = 22):
+        self.output_dir = output_dir
+        self.dots_count = dots_count
+        self.page_size = page_size
+        self.margin = margin
+        self.dot_radius = dot_radius
+        self.font_size = font_size
+        self.font = load_font(font_size)
+        self.title_font = load_font(font_size + 14)
+        self._label_sizes = {}
+        os.makedirs(output_dir, exist_ok=True)
+
+    def generate(self, source: Any, title: str = "Dot to Dot", page_number: int = 1) -> Dict[str, Any]:
+        """Trace, simplify and lay out one page from a silhouette image or path"""
+        mask, scale = self._load_silhouette(source)
+        contour = trace_outer_contour(mask)
+        points = simplify_to_count(contour.astype(np.float64) / scale, self.dots_count)
+        points = self._fit_to_page(points)
+        labels = self.layout_labels(points)
+
+        stem = f"dots_{datetime.now().strftime('%Y%m%d_%H%M%S')}_p{page_number:03d}"
+        page_path = os.path.join(self.output_dir, f"{stem}.png")
+        solution_path = os.path.join(self.output_dir, f"{stem}_solution.png")
+
+        page = self.render(points, labels, title)
+        # Mostly-white line art; fast deflate keeps batch runs from being encode-bound
+        page.save(page_path, compress_level=1)
+        ImageDraw.Draw(page).line([tuple(p) for p in points] + [tuple(points[0])], fill=160, width=2)
+        page.save(solution_path, compress_level=1)
+
+        return {
+            'page': page_number,
+            'puzzle': page_path,
+            'solution': solution_path,
+            'dots': len(points),
+            'points': np.rint(points).astype(int).tolist()
+        }
+
+    def generate_batch(self, sources: List[Any], title: str = "Dot to Dot",
+                       workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Render many pages on a thread pool; results keep source order"""
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            futures = [pool.submit(self.generate, source, title, i) for i, source in enumerate(sources, 1)]
+            return [future.result() for future in futures]
+
+    def synthesize_silhouette(self, seed: int, size: int = TRACE_MAX_SIDE) -> Image.Image:
+        """Procedural blob silhouette used when no source artwork is supplied"""
+        rng = np.random.default_rng(seed)
+        theta = np.linspace(0, 2 * np.pi, 360, endpoint=False)
+        radius = np.ones_like(theta)
+        for k in range(2, 7):
+            radius += rng.uniform(0, 0.35 / k * 2) * np.cos(k * theta + rng.uniform(0, 2 * np.pi))
+        radius *= 0.4 * size / radius.max()
+
+        outline = np.stack([size / 2 + radius * np.cos(theta), size / 2 + radius * np.sin(theta)], axis=1)
+        image = Image.new('L', (size, size), 255)
+        ImageDraw.Draw(image).polygon([tuple(p) for p in outline], fill=0)
+        return image
+
+    def layout_labels(self, points: np.ndarray) -> List[Dict]:
+        """Greedy placement of number labels that avoids dots, path and other labels"""
+        width, height = self.page_size
+        sizes = [self._label_size(i) for i in range(1, len(points) + 1)]
+        grid = SpatialGrid(max(max(w, h) for w, h in sizes) * 2)
+
+        r = self.dot_radius + 1
+        for x, y in points:
+            grid.insert((x - r, y - r, x + r, y + r))
+        # Sample the hidden path so labels do not sit on the line a child will draw
+        closed = np.vstack([points, points[:1]])
+        for a, b in zip(closed[:-1], closed[1:]):
+            steps = max(1, int(np.hypot(*(b - a)) // 6))
+            for x, y in a + (b - a) * (np.arange(1, steps)[:, None] / steps):
+                grid.insert((x - 1, y - 1, x + 1, y + 1))
+
+        # Prefer pointing labels away from the figure's centre
+        center = points.mean(axis=0)
+        labels = []
+        for i, (x, y) in enumerate(points):
+            w, h = sizes[i]
+            outward = np.array([x, y]) - center
+            order = np.argsort(-(LABEL_DIRECTIONS @ outward))
+
+            chosen = None
+            for direction in LABEL_DIRECTIONS[order]:
+                cx = x + direction[0] * (self.dot_radius + 3 + w / 2)
+                cy = y + direction[1] * (self.dot_radius + 3 + h / 2)
+                box = (cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2)
+                if box[0] < 0 or box[1] < 0 or box[2] > width or box[3] > height:
+                    continue
+                if not grid.overlaps(box):
+                    chosen = box
+                    break
+            if chosen is None:
+                direction = LABEL_DIRECTIONS[order[0]]
+                cx = x + direction[0] * (self.dot_radius + 3 + w / 2)
+                cy = y + direction[1] * (self.dot_radius + 3 + h / 2)
+                chosen = (cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2)
+
+            grid.insert(chosen)
+            labels.append({'number': i + 1, 'x': (chosen[0] + chosen[2]) / 2, 'y': (chosen[1] + chosen[3]) / 2})
+        return labels
+
+    def render(self, points: np.ndarray, labels: List[Dict], title: str) -> Image.Image:
+        """Dots and numbers on a white page"""
+        page = Image.new('L', self.page_size, 255)
+        draw = ImageDraw.Draw(page)
+        draw.text((self.page_size[0] / 2, self.margin / 2), title, fill=0, font=self.title_font, anchor='mm')
+
+        r = self.dot_radius
+        for x, y in points:
+            draw.ellipse([x - r, y - r, x + r, y + r], fill=0)
+        for label in labels:
+            font_cache.draw_text(page, (label['x'], label['y']), str(label['number']), self.font_size, 0,
+                                 anchor='mm', draw=draw)
+        return page
+
+    def _label_size(self, number: int) -> Tuple[int, int]:
+        size = self._label_sizes.get(number)
+        if size is None:
+            x0, y0, x1, y1 = self.font.getbbox(str(number))
+            size = self._label_sizes[number] = (x1 - x0 + 2, y1 - y0 + 2)
+        return size
+
+    def _fit_to_page(self, points: np.ndarray) -> np.ndarray:
+        """Scale and centre the outline inside the page margins"""
+        width, height = self.page_size
+        low, high = points.min(axis=0), points.max(axis=0)
+        span = np.maximum(high - low, 1e-6)
+        scale = min((width - 2 * self.margin) / span[0], (height - 2 * self.margin) / span[1])
+        offset = (np.array([width, height]) - span * scale) / 2
+        return (points - low) * scale + offset
+
+    def _load_silhouette(self, source: Any) -> Tuple[np.ndarray, float]:
+        """Foreground mask of the largest shape, plus the trace scale factor"""
+        image = source if isinstance(source, Image.Image) else Image.open(source)
+        scale = min(1.0, TRACE_MAX_SIDE / float(max(image.size)))
+        if scale < 1.0:
+            image.draft('L', (int(image.width * scale), int(image.height * scale)))
+            scale = min(1.0, TRACE_MAX_SIDE / float(max(image.size)))
+            image = image.resize((max(1, int(image.width * scale)), max(1, int(image.height * scale))),
+                                 Image.Resampling.BOX)
+
+        if 'A' in image.getbands():
+            mask = np.asarray(image.getchannel('A')) > 127
+        else:
+            gray = np.asarray(image.convert('L'))
+            mask = gray <= otsu_threshold(gray)
+            # Treat whichever class dominates the border as background
+            border = np.concatenate([mask[0], mask[-1], mask[:, 0], mask[:, -1]])
+            if border.mean() > 0.5:
+                mask = ~mask
+        return largest_component(mask), scale
+
+
+def otsu_threshold(gray: np.ndarray) -> int:
+    """Grey level that maximises between-class variance"""
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    p = hist / hist.sum()
+    omega = np.cumsum(p)
+    mu = np.cumsum(p * np.arange(256))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        between = (mu[-1] * omega - mu) ** 2 / (omega * (1.0 - omega))
+    return int(np.nanargmax(np.nan_to_num(between, nan=-1.0)))
+
+
+def largest_component(mask: np.ndarray) -> np.ndarray:
+    """Keep only the biggest 4-connected foreground region"""
+    starts, ends = row_runs(mask.view(np.uint8))
+    run_value = mask.ravel()[starts]
+    edge_a, edge_b, _ = run_adjacency(starts, ends, mask.shape[1])
+    region = union_runs(len(starts), edge_a, edge_b, run_value.astype(np.int32))
+    area = np.bincount(region, weights=(ends - starts) * run_value, minlength=int(region.max()) + 1)
+    if not area.any():
+        raise ValueError("Silhouette image has no foreground shape")
+    keep = (region == area.argmax())
+    return np.repeat(keep, ends - starts).reshape(mask.shape)
+
+
+def trace_outer_contour(mask: np.ndarray) -> np.ndarray:
+    """Moore-neighbour trace of the outer boundary, as (x, y) points in order"""
+    padded = np.pad(mask, 1)
+    start_index = int(np.flatnonzero(padded)[0])
+    start = divmod(start_index, padded.shape[1])
+
+    # Topmost-leftmost pixel, so its western neighbour is background
+    current, backtrack = start, 0
+    contour = [start]
+    seen = set()
+    while (current, backtrack) not in seen:
+        seen.add((current, backtrack))
+        for step in range(1, 9):
+            direction = (backtrack + step) % 8
+            dy, dx = MOORE_OFFSETS[direction]
+            candidate = (current[0] + dy, current[1] + dx)
+            if padded[candidate]:
+                break
+        else:
+            break  # isolated pixel
+
+        # Jacob's criterion: back at the start and about to repeat the first move
+        if current == start and len(contour) > 2 and candidate == contour[1]:
+            break
+
+        # The last background pixel checked becomes the next backtrack point
+        by, bx = MOORE_OFFSETS[(direction - 1) % 8]
+        back = (current[0] + by - candidate[0], current[1] + bx - candidate[1])
+        current, backtrack = candidate, MOORE_INDEX[back]
+        contour.append(current)
+
+    if len(contour) > 1 and contour[-1] == start:
+        contour.pop()
+    points = np.array(contour, dtype=np.int64) - 1
+    return points[:, ::-1]
+
+
+def simplify_to_count(points: np.ndarray, count: int) -> np.ndarray:
+    """Ramer-Douglas-Peucker on a closed path, keeping the `count` most significant points"""
+    total = len(points)
+    if total <= count:
+        return points
+
+    def farthest(i: int, j: int):
+        inner = points[i + 1:j]
+        if len(inner) == 0:
+            return None
+        a, b = points[i], points[j % total]
+        chord = b - a
+        length = np.hypot(*chord)
+        if length == 0:
+            distance = np.hypot(*(inner - a).T)
+        else:
+            distance = np.abs(chord[0] * (inner[:, 1] - a[1]) - chord[1] * (inner[:, 0] - a[0])) / length
+        k = int(distance.argmax())
+        return (-float(distance[k]), i + 1 + k, i, j)
+
+    # Split the loop at the point farthest from the first one
+    far = int(np.hypot(*(points - points[0]).T).argmax())
+    keep = [0, far]
+    heap = [entry for entry in (farthest(0, far), farthest(far, total)) if entry]
+    heapq.heapify(heap)
+
+    while len(keep) < count and heap:
+        _, k, i, j = heapq.heappop(heap)
+        keep.append(k)
+        for entry in (farthest(i, k), farthest(k, j)):
+            if entry:
+                heapq.heappush(heap, entry)
+
+    return points[sorted(keep)]
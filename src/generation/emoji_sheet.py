@@ -0,0 +1,285 @@
+# src/generation/emoji_sheet.py
+
+import os
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+from PIL import Image, ImageDraw
+
+# Face palette and the features each emoji type draws from
+TYPE_STYLES = {
+    'safe': {'faces': [(255, 204, 77)], 'eyes': ['dot', 'happy', 'wide'], 'mouths': ['smile', 'grin', 'o'],
+             'extras': ['none', 'blush']},
+    'funny': {'faces': [(255, 196, 60)], 'eyes': ['x', 'wink', 'happy', 'wide'],
+              'mouths': ['tongue', 'grin', 'wavy'], 'extras': ['tear', 'sweat', 'none']},
+    'cute': {'faces': [(255, 214, 120), (255, 190, 200)], 'eyes': ['heart', 'happy', 'star'],
+             'mouths': ['smile', 'o'], 'extras': ['blush', 'sparkle']},
+    'professional': {'faces': [(250, 200, 90)], 'eyes': ['dot', 'sleepy'], 'mouths': ['flat', 'smile', 'smirk'],
+                     'extras': ['none', 'sweat']},
+    'expressive': {'faces': [(255, 200, 70), (240, 120, 90)], 'eyes': ['wide', 'x', 'heart', 'star'],
+                   'mouths': ['o', 'frown', 'grin', 'wavy'], 'extras': ['tear', 'sparkle', 'sweat']},
+    'adult': {'faces': [(235, 150, 110)], 'eyes': ['sleepy', 'wink'], 'mouths': ['smirk', 'tongue'],
+              'extras': ['blush', 'sweat']},
+    'humor': {'faces': [(255, 196, 60)], 'eyes': ['x', 'happy', 'wink'], 'mouths': ['grin', 'tongue', 'wavy'],
+              'extras': ['tear', 'none']},
+    'horror': {'faces': [(150, 200, 140), (200, 200, 210)], 'eyes': ['wide', 'x', 'dot'],
+               'mouths': ['o', 'wavy', 'frown'], 'extras': ['sweat', 'none']},
+    'romance': {'faces': [(255, 180, 190)], 'eyes': ['heart', 'happy', 'sleepy'], 'mouths': ['smile', 'o'],
+                'extras': ['blush', 'sparkle']},
+    'sarcastic': {'faces': [(250, 200, 90)], 'eyes': ['sleepy', 'dot'], 'mouths': ['smirk', 'flat'],
+                  'extras': ['none', 'sweat']}
+}
+
+OUTLINE = (90, 60, 20, 255)
+INK = (60, 40, 20, 255)
+
+
+class SkylinePacker:
+    """Bottom-left skyline bin packing into a strip of fixed width"""
+
+    def __init__(self, width: int):
+        self.width = width
+        self.skyline = [[0, 0, width]]  # x, y, segment width
+        self.height = 0
+
+    def insert(self, w: int, h: int) -> Optional[Tuple[int, int]]:
+        best = None
+        for i, (x, _, _) in enumerate(self.skyline):
+            if x + w > self.width:
+                break
+            # Resting height is the tallest segment under the rectangle's span
+            y, remaining, j = 0, w, i
+            while remaining > 0:
+                y = max(y, self.skyline[j][1])
+                remaining -= self.skyline[j][2]
+                j += 1
+            if best is None or (y + h, x) < (best[0] + best[2], best[1]):
+                best = (y, x, h, i)
+        if best is None:
+            return None
+
+        y, x, h, i = best
+        self._raise(i, x, w, y + h)
+        self.height = max(self.height, y + h)
+        return x, y
+
+    def _raise(self, i: int, x: int, w: int, top: int):
+        segments = self.skyline[:i] + [[x, top, w]]
+        end = x + w
+        for sx, sy, sw in self.skyline[i:]:
+            if sx + sw <= end:
+                continue
+            if sx < end:
+                sw, sx = sx + sw - end, end
+            segments.append([sx, sy, sw])
+
+        # Merge neighbours at the same height to keep the skyline short
+        merged = [segments[0]]
+        for segment in segments[1:]:
+            if segment[1] == merged[-1][1]:
+                merged[-1][2] += segment[2]
+            else:
+                merged.append(segment)
+        self.skyline = merged
+
+
+def downsample(stack: np.ndarray, factor: int) -> np.ndarray:
+    """Box-filter a (N, H, W, 4) premultiplied float stack by an integer factor in one pass"""
+    n, height, width, channels = stack.shape
+    return stack.reshape(n, height // factor, factor, width // factor, factor, channels).mean(axis=(2, 4))
+
+
+def to_rgba8(premultiplied: np.ndarray) -> np.ndarray:
+    alpha = premultiplied[..., 3:4]
+    rgb = np.divide(premultiplied[..., :3], alpha, out=np.zeros_like(premultiplied[..., :3]), where=alpha > 0)
+    return np.clip(np.concatenate([rgb * 255, alpha * 255], axis=-1) + 0.5, 0, 255).astype(np.uint8)
+
+
+class EmojiEngine:
+    """Renders an emoji set once at master size and packs every size variant into one atlas"""
+
+    def __init__(self, output_dir: str = "outputs/images/emoji", master_size: int = 256,
+                 sizes: Tuple[int, ...] = (128, 64, 32), padding: int = 2, workers: Optional[int] = None):
+        for size in sizes:
+            if master_size % size:
+                raise ValueError(f"Emoji size {size} must divide the master size {master_size}")
+        self.output_dir = output_dir
+        self.master_size = master_size
+        self.sizes = sizes
+        self.padding = padding
+        self.workers = workers or os.cpu_count()
+        os.makedirs(output_dir, exist_ok=True)
+
+    def generate(self, emoji_types: List[str], count: int = 50, seed: int = 0) -> Dict[str, Any]:
+        """Design, render, downsample and pack a full set; returns atlas and index paths"""
+        designs = self.design_set(emoji_types, count, seed)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            masters = list(pool.map(self.render_glyph, designs))
+
+        # One premultiplied float stack feeds every size in a single vectorised step per size
+        stack = np.stack([np.asarray(master, dtype=np.float32) for master in masters]) / 255.0
+        stack[..., :3] *= stack[..., 3:4]
+        variants = {size: to_rgba8(downsample(stack, self.master_size // size)) for size in self.sizes}
+        del stack
+
+        sprites = []
+        for size, pixels in variants.items():
+            for design, glyph in zip(designs, pixels):
+                image = Image.fromarray(glyph, 'RGBA')
+                bbox = image.getchannel('A').getbbox() or (0, 0, 1, 1)
+                sprites.append({'name': design['name'], 'size': size, 'image': image.crop(bbox), 'trim': bbox})
+
+        atlas, index = self.pack(sprites)
+
+        set_dir = os.path.join(self.output_dir, f"emoji_{datetime.now().strftime('%Y%m%d_%H%M%S%f')}")
+        os.makedirs(set_dir, exist_ok=True)
+        atlas_path = os.path.join(set_dir, "atlas.png")
+        index_path = os.path.join(set_dir, "atlas.json")
+        atlas.save(atlas_path, optimize=True)
+        with open(index_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'image': 'atlas.png',
+                'atlas_size': list(atlas.size),
+                'sizes': list(self.sizes),
+                'emoji': {design['name']: {
+                    'type': design['type'],
+                    'features': {key: design[key] for key in ('eyes', 'mouth', 'extra')},
+                    'frames': index[design['name']]
+                } for design in designs}
+            }, f, indent=2)
+
+        return {'path': set_dir, 'atlas': atlas_path, 'index': index_path, 'count': len(designs),
+                'atlas_size': list(atlas.size)}
+
+    def design_set(self, emoji_types: List[str], count: int, seed: int) -> List[Dict[str, Any]]:
+        """Distinct feature combinations spread evenly over the requested types"""
+        rng = np.random.default_rng(seed)
+        designs, seen = [], set()
+        for i in range(count):
+            emoji_type = emoji_types[i % len(emoji_types)]
+            style = TYPE_STYLES.get(emoji_type, TYPE_STYLES['expressive'])
+            for _ in range(20):
+                eyes = str(rng.choice(style['eyes']))
+                mouth = str(rng.choice(style['mouths']))
+                extra = str(rng.choice(style['extras']))
+                face = tuple(int(c) for c in style['faces'][int(rng.integers(len(style['faces'])))])
+                if (emoji_type, eyes, mouth, extra, face) not in seen:
+                    break
+            seen.add((emoji_type, eyes, mouth, extra, face))
+            designs.append({'name': f"{emoji_type}_{i:02d}_{eyes}_{mouth}", 'type': emoji_type,
+                            'face': face, 'eyes': eyes, 'mouth': mouth, 'extra': extra})
+        return designs
+
+    def render_glyph(self, design: Dict[str, Any]) -> Image.Image:
+        """Draw one face at twice master size and reduce to master"""
+        s = self.master_size * 2
+        image = Image.new('RGBA', (s, s), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(image)
+        u = s / 100  # drawing unit: the face spans 4..96
+
+        draw.ellipse([4 * u, 4 * u, 96 * u, 96 * u], fill=design['face'] + (255,), outline=OUTLINE, width=round(2 * u))
+        for side in (-1, 1):
+            self._eye(draw, design['eyes'], 50 + side * 17, 40, u, wink=design['eyes'] == 'wink' and side == 1)
+        self._mouth(draw, design['mouth'], u)
+        # Extras go on their own layer: drawing a translucent fill straight onto RGBA
+        # replaces the face's alpha instead of blending over it
+        overlay = Image.new('RGBA', (s, s), (0, 0, 0, 0))
+        self._extra(ImageDraw.Draw(overlay), design['extra'], u)
+        image = Image.alpha_composite(image, overlay)
+        return image.reduce(2)
+
+    def _eye(self, draw, kind, cx, cy, u, wink=False):
+        def box(rx, ry=None):
+            ry = rx if ry is None else ry
+            return [(cx - rx) * u, (cy - ry) * u, (cx + rx) * u, (cy + ry) * u]
+
+        if kind == 'wink' and wink or kind == 'happy':
+            draw.arc(box(8, 6), 200, 340, fill=INK, width=round(3 * u))
+        elif kind == 'heart':
+            r = 5
+            draw.ellipse([(cx - 2 * r) * u, (cy - r - 2) * u, cx * u, (cy + r - 2) * u], fill=(220, 40, 60, 255))
+            draw.ellipse([cx * u, (cy - r - 2) * u, (cx + 2 * r) * u, (cy + r - 2) * u], fill=(220, 40, 60, 255))
+            draw.polygon([((cx - 2 * r + 0.5) * u, (cy + 0.5) * u), ((cx + 2 * r - 0.5) * u, (cy + 0.5) * u),
+                          (cx * u, (cy + 11) * u)], fill=(220, 40, 60, 255))
+        elif kind == 'x':
+            draw.line([(cx - 6) * u, (cy - 6) * u, (cx + 6) * u, (cy + 6) * u], fill=INK, width=round(3 * u))
+            draw.line([(cx - 6) * u, (cy + 6) * u, (cx + 6) * u, (cy - 6) * u], fill=INK, width=round(3 * u))
+        elif kind == 'wide':
+            draw.ellipse(box(8, 10), fill=(255, 255, 255, 255), outline=INK, width=round(1.5 * u))
+            draw.ellipse(box(4), fill=INK)
+        elif kind == 'star':
+            points = [((cx + (9 if i % 2 == 0 else 4) * math.cos(math.pi * i / 5 - math.pi / 2)) * u,
+                       (cy + (9 if i % 2 == 0 else 4) * math.sin(math.pi * i / 5 - math.pi / 2)) * u)
+                      for i in range(10)]
+            draw.polygon(points, fill=(255, 250, 220, 255), outline=INK)
+        elif kind == 'sleepy':
+            draw.chord(box(7, 6), 0, 180, fill=INK)
+            draw.line([(cx - 8) * u, cy * u, (cx + 8) * u, cy * u], fill=INK, width=round(2 * u))
+        else:
+            draw.ellipse(box(5, 7), fill=INK)
+
+    def _mouth(self, draw, kind, u):
+        width = round(3 * u)
+        if kind == 'smile':
+            draw.arc([28 * u, 45 * u, 72 * u, 78 * u], 20, 160, fill=INK, width=width)
+        elif kind == 'grin':
+            draw.chord([28 * u, 50 * u, 72 * u, 82 * u], 0, 180, fill=INK)
+            draw.chord([34 * u, 52 * u, 66 * u, 62 * u], 0, 180, fill=(255, 255, 255, 255))
+        elif kind == 'frown':
+            draw.arc([32 * u, 66 * u, 68 * u, 92 * u], 200, 340, fill=INK, width=width)
+        elif kind == 'o':
+            draw.ellipse([42 * u, 62 * u, 58 * u, 80 * u], fill=INK)
+        elif kind == 'tongue':
+            draw.chord([30 * u, 52 * u, 70 * u, 80 * u], 0, 180, fill=INK)
+            draw.ellipse([42 * u, 66 * u, 58 * u, 86 * u], fill=(235, 90, 110, 255))
+        elif kind == 'smirk':
+            draw.arc([40 * u, 52 * u, 72 * u, 74 * u], 10, 120, fill=INK, width=width)
+        elif kind == 'wavy':
+            points = [((30 + i) * u, (70 + 3 * math.sin(i / 4)) * u) for i in range(0, 41, 2)]
+            draw.line(points, fill=INK, width=width, joint='curve')
+        else:
+            draw.line([34 * u, 70 * u, 66 * u, 70 * u], fill=INK, width=width)
+
+    def _extra(self, draw, kind, u):
+        if kind == 'blush':
+            for cx in (24, 76):
+                draw.ellipse([(cx - 8) * u, 54 * u, (cx + 8) * u, 62 * u], fill=(240, 110, 120, 200))
+        elif kind == 'tear':
+            draw.ellipse([24 * u, 50 * u, 32 * u, 62 * u], fill=(90, 170, 240, 255))
+        elif kind == 'sweat':
+            draw.polygon([(80 * u, 12 * u), (74 * u, 26 * u), (86 * u, 26 * u)], fill=(110, 190, 250, 255))
+            draw.ellipse([74 * u, 20 * u, 86 * u, 32 * u], fill=(110, 190, 250, 255))
+        elif kind == 'sparkle':
+            for cx, cy, r in ((86, 14, 6), (12, 20, 4)):
+                draw.polygon([(cx * u, (cy - r) * u), ((cx + r / 3) * u, cy * u), (cx * u, (cy + r) * u),
+                              ((cx - r / 3) * u, cy * u)], fill=(255, 240, 120, 255))
+
+    def pack(self, sprites: List[Dict[str, Any]]) -> Tuple[Image.Image, Dict[str, Dict[str, Any]]]:
+        """Skyline-pack trimmed sprites tallest first; returns the atlas and per-emoji frames"""
+        pad = self.padding
+        area = sum((sprite['image'].width + pad) * (sprite['image'].height + pad) for sprite in sprites)
+        width = 2 ** math.ceil(math.log2(max(math.sqrt(area * 1.1), max(s['image'].width for s in sprites) + pad)))
+
+        packer = SkylinePacker(width)
+        order = sorted(range(len(sprites)), key=lambda i: (-sprites[i]['image'].height, -sprites[i]['image'].width))
+        positions = {}
+        for i in order:
+            image = sprites[i]['image']
+            positions[i] = packer.insert(image.width + pad, image.height + pad)
+
+        atlas = Image.new('RGBA', (width, packer.height), (0, 0, 0, 0))
+        index = {}
+        for i, sprite in enumerate(sprites):
+            x, y = positions[i]
+            image = sprite['image']
+            atlas.paste(image, (x, y))
+            left, top = sprite['trim'][:2]
+            index.setdefault(sprite['name'], {})[str(sprite['size'])] = {
+                'x': x, 'y': y, 'w': image.width, 'h': image.height,
+                'offset_x': left, 'offset_y': top, 'source_w': sprite['size'], 'source_h': sprite['size']
+            }
+        return atlas, index
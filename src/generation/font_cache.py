@@ -0,0 +1,161 @@
+# src/generation/font_cache.py
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+from PIL import Image, ImageDraw, ImageFont
+
+DEFAULT_FONT = "DejaVuSans.ttf"
+
+# Printable ASCII covers labels, numerals and most titles
+ATLAS_CHARSET = ''.join(chr(c) for c in range(32, 127))
+
+# Above this size strings are rare one-off titles, so drawing directly is cheaper than an atlas
+ATLAS_MAX_SIZE = 64
+
+
+class GlyphAtlas:
+    """Printable ASCII for one font and size, each glyph rasterised and cropped once"""
+
+    def __init__(self, font: ImageFont.FreeTypeFont, charset: str = ATLAS_CHARSET):
+        self.font = font
+        self.ascent, self.descent = font.getmetrics()
+        self.advances = {}
+        self.glyphs = {}
+        self.kerning = {}
+
+        for char in charset:
+            self.advances[char] = font.getlength(char)
+            mask, offset = font.getmask2(char, mode='L', anchor='ls')
+            w, h = mask.size
+            if w == 0 or h == 0:
+                continue
+            # Masks are cropped once here so drawing is a plain paste
+            self.glyphs[char] = (Image.frombytes('L', (w, h), bytes(mask)), offset)
+
+    def covers(self, text: str) -> bool:
+        advances = self.advances
+        return all(char in advances for char in text)
+
+    def kern(self, left: str, right: str) -> float:
+        pair = left + right
+        value = self.kerning.get(pair)
+        if value is None:
+            value = self.kerning[pair] = self.font.getlength(pair) - self.advances[left] - self.advances[right]
+        return value
+
+    def width(self, text: str) -> float:
+        width = sum(self.advances[char] for char in text)
+        return width + sum(self.kern(a, b) for a, b in zip(text, text[1:]))
+
+    def draw(self, image: Image.Image, xy: Tuple[float, float], text: str, fill: Any, anchor: str = 'la'):
+        """Stamp glyph masks onto `image` at ImageDraw.text's anchor, snapped to whole pixels"""
+        x, y = xy
+        horizontal, vertical = anchor[0], anchor[1]
+        if horizontal != 'l':
+            x -= self.width(text) / (2 if horizontal == 'm' else 1)
+        if vertical == 'a':
+            y += self.ascent
+        elif vertical == 'm':
+            y += (self.ascent - self.descent) / 2
+        elif vertical == 'd':
+            y -= self.descent
+
+        previous = None
+        for char in text:
+            if previous is not None:
+                x += self.kern(previous, char)
+            glyph = self.glyphs.get(char)
+            if glyph is not None:
+                mask, (ox, oy) = glyph
+                left, top = int(round(x + ox)), int(round(y + oy))
+                image.paste(fill, (left, top, left + mask.width, top + mask.height), mask)
+            x += self.advances[char]
+            previous = char
+
+
+class FontCache:
+    """Process-wide FreeType fonts, memoised text widths and glyph atlases"""
+
+    def __init__(self, default_path: str = DEFAULT_FONT, max_widths: int = 65536):
+        self.default_path = default_path
+        self.max_widths = max_widths
+        self.fonts = {}
+        self.atlases = {}
+        self.widths = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def font(self, size: int, path: Optional[str] = None):
+        """Loaded font for (path, size); Pillow's bundled font when the file is missing"""
+        key = (path or self.default_path, int(size))
+        font = self.fonts.get(key)
+        if font is None:
+            with self.lock:
+                font = self.fonts.get(key)
+                if font is None:
+                    try:
+                        font = ImageFont.truetype(key[0], key[1])
+                    except OSError:
+                        font = ImageFont.load_default(key[1])
+                    self.fonts[key] = font
+        return font
+
+    def atlas(self, size: int, path: Optional[str] = None) -> Optional[GlyphAtlas]:
+        """Glyph atlas for (path, size), built on first use; None for large sizes or bitmap fonts"""
+        key = (path or self.default_path, int(size))
+        atlas = self.atlases.get(key, False)
+        if atlas is False:
+            font = self.font(size, path)
+            atlas = GlyphAtlas(font) if key[1] <= ATLAS_MAX_SIZE and isinstance(font, ImageFont.FreeTypeFont) else None
+            with self.lock:
+                self.atlases[key] = atlas
+        return atlas
+
+    def warm(self, sizes, path: Optional[str] = None):
+        """Pre-rasterise atlases for sizes a renderer is about to use heavily"""
+        for size in sizes:
+            self.atlas(size, path)
+
+    def text_width(self, text: str, size: int, path: Optional[str] = None) -> float:
+        key = (path or self.default_path, int(size), text)
+        width = self.widths.get(key)
+        if width is not None:
+            self.hits += 1
+            with self.lock:
+                if key in self.widths:
+                    self.widths.move_to_end(key)
+            return width
+
+        self.misses += 1
+        width = self.font(size, path).getlength(text)
+        with self.lock:
+            self.widths[key] = width
+            if len(self.widths) > self.max_widths:
+                self.widths.popitem(last=False)
+        return width
+
+    def draw_text(self, image: Image.Image, xy: Tuple[float, float], text: str, size: int, fill: Any,
+                  anchor: str = 'la', path: Optional[str] = None, draw: Optional[ImageDraw.ImageDraw] = None):
+        """Draw single-line text from the glyph atlas, falling back to ImageDraw for anything it can't cover"""
+        atlas = self.atlas(size, path)
+        if atlas is not None and anchor[0] in 'lmr' and anchor[1:] in ('a', 'm', 's', 'd') and atlas.covers(text):
+            atlas.draw(image, xy, text, fill, anchor)
+        else:
+            (draw or ImageDraw.Draw(image)).text(xy, text, fill=fill, font=self.font(size, path), anchor=anchor)
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'fonts': len(self.fonts),
+            'atlases': sum(1 for atlas in self.atlases.values() if atlas is not None),
+            'widths': len(self.widths),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
+
+
+# Global instance
+font_cache = FontCache()
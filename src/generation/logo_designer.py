@@ -0,0 +1,330 @@
+# src/generation/logo_designer.py
+
+import os
+import json
+import math
+import colorsys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+from xml.sax.saxutils import escape
+import numpy as np
+from PIL import Image, ImageDraw
+
+from .font_cache import font_cache
+
+VARIATIONS = ['emblem', 'horizontal', 'monogram', 'badge', 'wordmark']
+SCHEMES = ['brand', 'monochrome', 'inverse']
+FORMATS = ['vector', 'png', 'business_card', 'letterhead']
+
+FONT_FILES = {'normal': "DejaVuSans.ttf", 'bold': "DejaVuSans-Bold.ttf"}
+SVG_FONT_FAMILY = "DejaVu Sans, Verdana, sans-serif"
+
+# Pixel sizes of the raster formats (business card and letterhead at 300 and 150 dpi)
+PNG_WIDTH = 1024
+CARD_SIZE = (1050, 600)
+LETTERHEAD_SIZE = (1275, 1650)
+
+STOP_WORDS = {'a', 'an', 'the', 'of', 'and', 'or', 'to', 'in', 'on', 'for', 'with', 'about', 'who', 'that'}
+
+
+# Scene graph
+#
+# A scene is {'width', 'height', 'background', 'nodes'}; each node is a dict whose
+# colours are theme roles ('primary', 'accent', ...) rather than concrete values, so
+# one layout can be written to SVG or rasterised under any colour scheme.
+def rect(x: float, y: float, w: float, h: float, fill: Optional[str] = None, stroke: Optional[str] = None,
+         stroke_width: float = 0, rx: float = 0) -> Dict[str, Any]:
+    return {'type': 'rect', 'x': x, 'y': y, 'w': w, 'h': h, 'rx': rx,
+            'fill': fill, 'stroke': stroke, 'stroke_width': stroke_width}
+
+
+def circle(cx: float, cy: float, r: float, fill: Optional[str] = None, stroke: Optional[str] = None,
+           stroke_width: float = 0) -> Dict[str, Any]:
+    return {'type': 'circle', 'cx': cx, 'cy': cy, 'r': r, 'fill': fill, 'stroke': stroke, 'stroke_width': stroke_width}
+
+
+def polygon(points: List[Tuple[float, float]], fill: Optional[str] = None) -> Dict[str, Any]:
+    return {'type': 'polygon', 'points': [(float(x), float(y)) for x, y in points], 'fill': fill}
+
+
+def text(x: float, y: float, content: str, size: float, fill: str, anchor: str = 'middle',
+         weight: str = 'normal') -> Dict[str, Any]:
+    """Text positioned on its baseline, as in SVG"""
+    return {'type': 'text', 'x': x, 'y': y, 'text': content, 'size': size, 'fill': fill,
+            'anchor': anchor, 'weight': weight}
+
+
+def group(children: List[Dict[str, Any]], tx: float = 0, ty: float = 0, scale: float = 1) -> Dict[str, Any]:
+    return {'type': 'group', 'tx': tx, 'ty': ty, 'scale': scale, 'children': children}
+
+
+def text_width(content: str, size: float, weight: str = 'normal') -> float:
+    """Layout width in scene units, measured once at a reference size"""
+    return font_cache.text_width(content, 100, FONT_FILES[weight]) * size / 100
+
+
+def build_theme(scheme: str, hue: float) -> Dict[str, str]:
+    """Concrete colours for each role under a colour scheme"""
+    def hls(h, l, s):
+        r, g, b = colorsys.hls_to_rgb(h % 1.0, l, s)
+        return '#%02x%02x%02x' % (round(r * 255), round(g * 255), round(b * 255))
+
+    if scheme == 'monochrome':
+        return {'background': '#ffffff', 'primary': '#1a1a1a', 'secondary': '#5c5c5c',
+                'accent': '#9a9a9a', 'text': '#1a1a1a', 'muted': '#8a8a8a', 'on_primary': '#ffffff'}
+    if scheme == 'inverse':
+        return {'background': hls(hue, 0.14, 0.35), 'primary': hls(hue, 0.72, 0.65),
+                'secondary': hls(hue + 0.5, 0.68, 0.55), 'accent': hls(hue + 0.08, 0.85, 0.7),
+                'text': '#f4f4f4', 'muted': hls(hue, 0.6, 0.15), 'on_primary': hls(hue, 0.14, 0.35)}
+    return {'background': '#ffffff', 'primary': hls(hue, 0.38, 0.65), 'secondary': hls(hue + 0.5, 0.45, 0.6),
+            'accent': hls(hue + 0.08, 0.55, 0.85), 'text': '#202124', 'muted': '#6b6f76', 'on_primary': '#ffffff'}
+
+
+def to_svg(scene: Dict[str, Any], theme: Dict[str, str]) -> str:
+    """Serialise a scene graph under a theme"""
+    def paint(node):
+        fill = theme[node['fill']] if node.get('fill') else 'none'
+        attrs = f' fill="{fill}"'
+        if node.get('stroke'):
+            attrs += f' stroke="{theme[node["stroke"]]}" stroke-width="{node["stroke_width"]:g}"'
+        return attrs
+
+    def emit(node):
+        kind = node['type']
+        if kind == 'group':
+            inner = ''.join(emit(child) for child in node['children'])
+            return f'<g transform="translate({node["tx"]:g} {node["ty"]:g}) scale({node["scale"]:g})">{inner}</g>'
+        if kind == 'rect':
+            return (f'<rect x="{node["x"]:g}" y="{node["y"]:g}" width="{node["w"]:g}" height="{node["h"]:g}" '
+                    f'rx="{node["rx"]:g}"{paint(node)}/>')
+        if kind == 'circle':
+            return f'<circle cx="{node["cx"]:g}" cy="{node["cy"]:g}" r="{node["r"]:g}"{paint(node)}/>'
+        if kind == 'polygon':
+            points = ' '.join(f'{x:.2f},{y:.2f}' for x, y in node['points'])
+            return f'<polygon points="{points}"{paint(node)}/>'
+        return (f'<text x="{node["x"]:g}" y="{node["y"]:g}" font-family="{SVG_FONT_FAMILY}" '
+                f'font-size="{node["size"]:g}" font-weight="{node["weight"]}" text-anchor="{node["anchor"]}" '
+                f'fill="{theme[node["fill"]]}">{escape(node["text"])}</text>')
+
+    width, height = scene['width'], scene['height']
+    body = ''.join(emit(node) for node in scene['nodes'])
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:g}" height="{height:g}" '
+            f'viewBox="0 0 {width:g} {height:g}"><rect width="100%" height="100%" '
+            f'fill="{theme[scene["background"]]}"/>{body}</svg>\n')
+
+
+def rasterize(scene: Dict[str, Any], theme: Dict[str, str], width: int, supersample: int = 2) -> Image.Image:
+    """Draw a scene graph with Pillow at `width` pixels, supersampled for smooth edges"""
+    scale = width * supersample / scene['width']
+    size = (round(scene['width'] * scale), round(scene['height'] * scale))
+    image = Image.new('RGB', size, theme[scene['background']])
+    draw = ImageDraw.Draw(image)
+
+    def walk(nodes, tx, ty, s):
+        for node in nodes:
+            kind = node['type']
+            if kind == 'group':
+                walk(node['children'], tx + node['tx'] * s, ty + node['ty'] * s, s * node['scale'])
+                continue
+
+            fill = theme[node['fill']] if node.get('fill') else None
+            outline = theme[node['stroke']] if node.get('stroke') else None
+            line = max(1, round(node.get('stroke_width', 0) * s)) if outline else 0
+            if kind == 'rect':
+                box = [tx + node['x'] * s, ty + node['y'] * s,
+                       tx + (node['x'] + node['w']) * s, ty + (node['y'] + node['h']) * s]
+                draw.rounded_rectangle(box, radius=node['rx'] * s, fill=fill, outline=outline, width=line)
+            elif kind == 'circle':
+                cx, cy, r = tx + node['cx'] * s, ty + node['cy'] * s, node['r'] * s
+                draw.ellipse([cx - r, cy - r, cx + r, cy + r], fill=fill, outline=outline, width=line)
+            elif kind == 'polygon':
+                draw.polygon([(tx + x * s, ty + y * s) for x, y in node['points']], fill=fill)
+            else:
+                anchor = {'start': 'ls', 'middle': 'ms', 'end': 'rs'}[node['anchor']]
+                font_cache.draw_text(image, (tx + node['x'] * s, ty + node['y'] * s), node['text'],
+                                     max(1, round(node['size'] * s)), fill, anchor=anchor,
+                                     path=FONT_FILES[node['weight']], draw=draw)
+
+    walk(scene['nodes'], 0.0, 0.0, scale)
+    if supersample > 1:
+        image = image.reduce(supersample)
+    return image
+
+
+class LogoEngine:
+    """Lays out logo concepts once as scene graphs, then themes and rasterises every variant"""
+
+    def __init__(self, output_dir: str = "outputs/images/logos", workers: Optional[int] = None):
+        self.output_dir = output_dir
+        self.workers = workers or os.cpu_count()
+        os.makedirs(output_dir, exist_ok=True)
+
+    def generate(self, name: str, tagline: str = "", seed: int = 0,
+                 schemes: Optional[List[str]] = None, formats: Optional[List[str]] = None) -> Dict[str, Any]:
+        """One layout pass, then variation x scheme x format assets rendered in parallel"""
+        schemes = schemes or SCHEMES
+        formats = formats or FORMATS
+        rng = np.random.default_rng(seed)
+        hue = float(rng.uniform(0, 1))
+
+        concept = self.layout(name, tagline, rng)
+        themes = {scheme: build_theme(scheme, hue) for scheme in schemes}
+
+        logo_dir = os.path.join(self.output_dir, f"logo_{datetime.now().strftime('%Y%m%d_%H%M%S%f')}")
+        os.makedirs(logo_dir, exist_ok=True)
+
+        def render(job: Tuple[str, str, str]) -> Dict[str, Any]:
+            variation, scheme, fmt = job
+            scenes, theme = concept[variation], themes[scheme]
+            stem = os.path.join(logo_dir, f"{variation}_{scheme}_{fmt}")
+            if fmt == 'vector':
+                path = stem + '.svg'
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(to_svg(scenes['logo'], theme))
+            else:
+                scene, width = {'png': (scenes['logo'], PNG_WIDTH),
+                                'business_card': (scenes['business_card'], CARD_SIZE[0]),
+                                'letterhead': (scenes['letterhead'], LETTERHEAD_SIZE[0])}[fmt]
+                path = stem + '.png'
+                rasterize(scene, theme, width).save(path, compress_level=1)
+            return {'variation': variation, 'scheme': scheme, 'format': fmt, 'file': path}
+
+        jobs = [(v, s, f) for v in VARIATIONS for s in schemes for f in formats]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            assets = list(pool.map(render, jobs))
+
+        manifest = {'name': name, 'tagline': tagline, 'seed': seed, 'themes': themes, 'assets': assets}
+        with open(os.path.join(logo_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+        return {'path': logo_dir, 'assets': assets, 'themes': themes}
+
+    # Layout
+    def layout(self, name: str, tagline: str, rng: np.random.Generator) -> Dict[str, Dict[str, Any]]:
+        """Scene graphs for every variation and its stationery, independent of colour"""
+        mark = self._mark(rng)
+        initials = ''.join(word[0] for word in name.split()[:2]).upper() or name[:1].upper()
+
+        logos = {
+            'emblem': self._emblem(mark, name, tagline),
+            'horizontal': self._horizontal(mark, name, tagline),
+            'monogram': self._monogram(initials, rng),
+            'badge': self._badge(name, tagline),
+            'wordmark': self._wordmark(name, tagline)
+        }
+        return {variation: {'logo': logo,
+                            'business_card': self._business_card(logo, name, tagline),
+                            'letterhead': self._letterhead(logo, name, tagline)}
+                for variation, logo in logos.items()}
+
+    def _mark(self, rng: np.random.Generator) -> List[Dict[str, Any]]:
+        """Abstract symbol in a 200x200 box: a ring of petals, a star or stacked facets"""
+        style = int(rng.integers(0, 3))
+        cx = cy = 100
+        nodes = [circle(cx, cy, 96, fill='primary')]
+        if style == 0:
+            petals = int(rng.integers(5, 9))
+            for i in range(petals):
+                angle = 2 * math.pi * i / petals
+                nodes.append(circle(cx + 48 * math.cos(angle), cy + 48 * math.sin(angle), 26, fill='accent'))
+            nodes.append(circle(cx, cy, 28, fill='on_primary'))
+        elif style == 1:
+            spikes = int(rng.integers(5, 8))
+            inner = float(rng.uniform(0.35, 0.55))
+            points = []
+            for i in range(spikes * 2):
+                radius = 72 if i % 2 == 0 else 72 * inner
+                angle = math.pi * i / spikes - math.pi / 2
+                points.append((cx + radius * math.cos(angle), cy + radius * math.sin(angle)))
+            nodes.append(polygon(points, fill='on_primary'))
+            nodes.append(circle(cx, cy, 16, fill='accent'))
+        else:
+            for i, role in enumerate(['on_primary', 'accent', 'secondary']):
+                top = 48 + i * 36
+                nodes.append(polygon([(cx, top), (cx + 62 - i * 10, top + 30), (cx, top + 60),
+                                      (cx - 62 + i * 10, top + 30)], fill=role))
+        return nodes
+
+    def _emblem(self, mark, name, tagline):
+        name_size = self._fit_size(name, 560, 96, 'bold')
+        nodes = [group(mark, tx=200, ty=20, scale=1.0),
+                 text(300, 300, name, name_size, 'text', weight='bold')]
+        if tagline:
+            nodes.append(text(300, 350, tagline, self._fit_size(tagline, 520, 34), 'muted'))
+        return {'width': 600, 'height': 380, 'background': 'background', 'nodes': nodes}
+
+    def _horizontal(self, mark, name, tagline):
+        name_size = self._fit_size(name, 640, 88, 'bold')
+        nodes = [group(mark, tx=20, ty=20, scale=1.0),
+                 text(250, 130 if tagline else 150, name, name_size, 'text', anchor='start', weight='bold')]
+        if tagline:
+            nodes.append(text(252, 180, tagline, self._fit_size(tagline, 620, 32), 'muted', anchor='start'))
+        return {'width': 900, 'height': 240, 'background': 'background', 'nodes': nodes}
+
+    def _monogram(self, initials, rng):
+        sides = int(rng.integers(5, 9))
+        hexagon = [(200 + 180 * math.cos(2 * math.pi * i / sides - math.pi / 2),
+                    200 + 180 * math.sin(2 * math.pi * i / sides - math.pi / 2)) for i in range(sides)]
+        nodes = [polygon(hexagon, fill='primary'),
+                 circle(200, 200, 130, stroke='accent', stroke_width=10),
+                 text(200, 245, initials, self._fit_size(initials, 200, 140, 'bold'), 'on_primary', weight='bold')]
+        return {'width': 400, 'height': 400, 'background': 'background', 'nodes': nodes}
+
+    def _badge(self, name, tagline):
+        name_size = self._fit_size(name, 600, 80, 'bold')
+        nodes = [rect(10, 10, 680, 260, fill='primary', rx=40),
+                 rect(30, 30, 640, 220, stroke='accent', stroke_width=6, rx=28),
+                 text(350, 150 if tagline else 170, name, name_size, 'on_primary', weight='bold')]
+        if tagline:
+            nodes.append(text(350, 205, tagline, self._fit_size(tagline, 560, 30), 'accent'))
+        return {'width': 700, 'height': 280, 'background': 'background', 'nodes': nodes}
+
+    def _wordmark(self, name, tagline):
+        name_size = self._fit_size(name, 760, 110, 'bold')
+        underline = min(760, text_width(name, name_size, 'bold'))
+        nodes = [text(400, 140, name, name_size, 'primary', weight='bold'),
+                 rect(400 - underline / 2, 165, underline, 12, fill='accent', rx=6)]
+        if tagline:
+            nodes.append(text(400, 225, tagline, self._fit_size(tagline, 700, 34), 'muted'))
+        return {'width': 800, 'height': 260, 'background': 'background', 'nodes': nodes}
+
+    def _business_card(self, logo, name, tagline):
+        """3.5 x 2 inch card: logo left, contact block right"""
+        width, height = 1050, 600
+        scale = min(420 / logo['width'], 420 / logo['height'])
+        nodes = [rect(0, 0, 18, height, fill='primary'),
+                 group(logo['nodes'], tx=60 + (420 - logo['width'] * scale) / 2,
+                       ty=(height - logo['height'] * scale) / 2, scale=scale),
+                 text(540, 250, name, self._fit_size(name, 470, 48, 'bold'), 'text', anchor='start', weight='bold'),
+                 text(540, 300, tagline or 'Creative Studio', 28, 'muted', anchor='start'),
+                 rect(540, 330, 120, 6, fill='accent'),
+                 text(540, 400, 'hello@example.com', 26, 'text', anchor='start'),
+                 text(540, 445, '+1 555 0100', 26, 'text', anchor='start'),
+                 text(540, 490, 'www.example.com', 26, 'text', anchor='start')]
+        return {'width': width, 'height': height, 'background': 'background', 'nodes': nodes}
+
+    def _letterhead(self, logo, name, tagline):
+        """US letter at 150 dpi: logo header, rule and footer"""
+        width, height = 1275, 1650
+        scale = min(360 / logo['width'], 150 / logo['height'])
+        nodes = [group(logo['nodes'], tx=90, ty=70, scale=scale),
+                 text(width - 90, 120, name, 34, 'text', anchor='end', weight='bold'),
+                 text(width - 90, 165, tagline or '', 22, 'muted', anchor='end'),
+                 rect(90, 250, width - 180, 4, fill='primary'),
+                 rect(90, height - 130, width - 180, 2, fill='accent'),
+                 text(width / 2, height - 85, 'hello@example.com  |  +1 555 0100  |  www.example.com', 22, 'muted')]
+        return {'width': width, 'height': height, 'background': 'background', 'nodes': nodes}
+
+    def _fit_size(self, content: str, max_width: float, max_size: float, weight: str = 'normal') -> float:
+        """Largest font size up to max_size that keeps the text within max_width"""
+        if not content:
+            return max_size
+        return min(max_size, max_size * max_width / max(1.0, text_width(content, max_size, weight)))
+
+
+def brand_name(description: str) -> str:
+    """Short title-cased name from the first significant words of a description"""
+    words = [word.strip('.,!?;:"\'') for word in description.split()]
+    significant = [word for word in words if word and word.lower() not in STOP_WORDS]
+    return ' '.join(word.capitalize() for word in significant[:2]) or 'Studio'
@@ -0,0 +1,344 @@
+# src/generation/manuscript_export.py
+
+import os
+import re
+import sys
+import time
+import uuid
+import zlib
+import zipfile
+import tracemalloc
+from datetime import datetime, timezone
+from html import escape
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Tuple
+
+# Helvetica advance widths (1/1000 em) for WinAnsiEncoding codes 32-126
+HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584
+]
+# Typographic punctuation above 127: ellipsis, curly quotes, dashes
+HELVETICA_EXTRA = {0x85: 1000, 0x91: 222, 0x92: 222, 0x93: 333, 0x94: 333, 0x96: 556, 0x97: 1000}
+
+CONTAINER_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
+  <rootfiles>
+    <rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/>
+  </rootfiles>
+</container>
+"""
+
+STYLESHEET = """body { font-family: serif; line-height: 1.4; margin: 0 5%; }
+h1 { text-align: center; margin: 2em 0 1em; }
+p { text-indent: 1.5em; margin: 0; }
+h1 + p { text-indent: 0; }
+"""
+
+
+def paragraphs_of(chapter: Dict[str, Any]) -> Iterator[str]:
+    """A chapter's paragraphs: an explicit iterable if given, else the non-blank lines of its text"""
+    if chapter.get('paragraphs') is not None:
+        for paragraph in chapter['paragraphs']:
+            if paragraph.strip():
+                yield paragraph.strip()
+        return
+    for line in chapter.get('text', '').splitlines():
+        if line.strip():
+            yield line.strip()
+
+
+class EpubWriter:
+    """EPUB 3 assembled chapter by chapter; only the table of contents is kept until close()"""
+
+    def __init__(self, path: str, title: str, author: str = 'Anonymous', language: str = 'en'):
+        self.path = path
+        self.title = title
+        self.author = author
+        self.language = language
+        self.identifier = f"urn:uuid:{uuid.uuid5(uuid.NAMESPACE_URL, title + author)}"
+        self.chapters: List[Tuple[str, str]] = []
+        self.archive = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED)
+        # The mimetype must come first and uncompressed
+        self.archive.writestr(zipfile.ZipInfo('mimetype'), 'application/epub+zip', compress_type=zipfile.ZIP_STORED)
+        self.archive.writestr('META-INF/container.xml', CONTAINER_XML)
+        self.archive.writestr('OEBPS/style.css', STYLESHEET)
+
+    def add_chapter(self, title: str, paragraphs: Iterable[str]):
+        name = f"chapter_{len(self.chapters) + 1:03d}.xhtml"
+        self.chapters.append((name, title))
+        with self.archive.open(f"OEBPS/{name}", 'w') as handle:
+            handle.write(self._page_head(title).encode('utf-8'))
+            handle.write(f"<section epub:type=\"chapter\">\n<h1>{escape(title)}</h1>\n".encode('utf-8'))
+            for paragraph in paragraphs:
+                handle.write(f"<p>{escape(paragraph)}</p>\n".encode('utf-8'))
+            handle.write(b"</section>\n</body>\n</html>\n")
+
+    def close(self):
+        modified = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        manifest = ''.join(f'    <item id="c{i}" href="{name}" media-type="application/xhtml+xml"/>\n'
+                           for i, (name, _) in enumerate(self.chapters, 1))
+        spine = ''.join(f'    <itemref idref="c{i}"/>\n' for i in range(1, len(self.chapters) + 1))
+        self.archive.writestr('OEBPS/content.opf', f"""<?xml version="1.0" encoding="UTF-8"?>
+<package xmlns="http://www.idpf.org/2007/opf" version="3.0" unique-identifier="book-id">
+  <metadata xmlns:dc="http://purl.org/dc/elements/1.1/">
+    <dc:identifier id="book-id">{self.identifier}</dc:identifier>
+    <dc:title>{escape(self.title)}</dc:title>
+    <dc:creator>{escape(self.author)}</dc:creator>
+    <dc:language>{self.language}</dc:language>
+    <meta property="dcterms:modified">{modified}</meta>
+  </metadata>
+  <manifest>
+    <item id="nav" href="nav.xhtml" media-type="application/xhtml+xml" properties="nav"/>
+    <item id="ncx" href="toc.ncx" media-type="application/x-dtbncx+xml"/>
+    <item id="css" href="style.css" media-type="text/css"/>
+{manifest}  </manifest>
+  <spine toc="ncx">
+{spine}  </spine>
+</package>
+""")
+
+        links = ''.join(f'      <li><a href="{name}">{escape(title)}</a></li>\n' for name, title in self.chapters)
+        self.archive.writestr('OEBPS/nav.xhtml', self._page_head(self.title) +
+                              f'<nav epub:type="toc" id="toc">\n  <h1>Contents</h1>\n  <ol>\n{links}  </ol>\n</nav>\n'
+                              '</body>\n</html>\n')
+
+        points = ''.join(f'    <navPoint id="p{i}" playOrder="{i}"><navLabel><text>{escape(title)}</text></navLabel>'
+                         f'<content src="{name}"/></navPoint>\n' for i, (name, title) in enumerate(self.chapters, 1))
+        self.archive.writestr('OEBPS/toc.ncx', f"""<?xml version="1.0" encoding="UTF-8"?>
+<ncx xmlns="http://www.daisy.org/z3986/2005/ncx/" version="2005-1">
+  <head><meta name="dtb:uid" content="{self.identifier}"/></head>
+  <docTitle><text>{escape(self.title)}</text></docTitle>
+  <navMap>
+{points}  </navMap>
+</ncx>
+""")
+        self.archive.close()
+
+    def _page_head(self, title: str) -> str:
+        return ('<?xml version="1.0" encoding="UTF-8"?>\n<!DOCTYPE html>\n'
+                f'<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops" lang="{self.language}">\n'
+                f'<head>\n<title>{escape(title)}</title>\n<link rel="stylesheet" type="text/css" href="style.css"/>\n</head>\n<body>\n')
+
+
+class PdfWriter:
+    """Text-only PDF written object by object as pages fill up.
+
+    Pages use the built-in Helvetica font, so nothing is embedded; memory use is
+    one page of text plus the byte offset of each object for the xref table.
+    """
+
+    def __init__(self, path: str, title: str, author: str = 'Anonymous',
+                 page_size: Tuple[float, float] = (432, 648), margin: float = 54,
+                 font_size: float = 11, title_size: float = 20):
+        self.path = path
+        self.title = title
+        self.author = author
+        self.width, self.height = page_size
+        self.margin = margin
+        self.font_size = font_size
+        self.leading = font_size * 1.4
+        self.title_size = title_size
+        self.handle = open(path, 'wb')
+        self.offsets: Dict[int, int] = {}
+        self.page_ids: List[int] = []
+        self.outline: List[Tuple[str, int]] = []
+        self.next_id = 5
+        self.lines: List[Tuple[float, float, float, bytes]] = []
+        self.y = 0.0
+        # Objects 1-4 are reserved for the catalog, page tree, font and outline root
+        self.handle.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._write_object(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+
+    def add_chapter(self, title: str, paragraphs: Iterable[str]):
+        self._new_page()
+        self.outline.append((title, self.next_id + 1))
+        self.y -= self.title_size * 2
+        for line in self.wrap(title, self.title_size):
+            self._add_line(self.margin, line, self.title_size)
+            self.y -= self.title_size * 1.3
+        self.y -= self.leading
+
+        indent = self.font_size * 1.5
+        for paragraph in paragraphs:
+            for i, line in enumerate(self.wrap(paragraph, self.font_size, first_indent=indent)):
+                if self.y < self.margin + self.leading:
+                    self._new_page()
+                self._add_line(self.margin + (indent if i == 0 else 0), line, self.font_size)
+                self.y -= self.leading
+
+    def wrap(self, text: str, size: float, first_indent: float = 0) -> List[bytes]:
+        """Greedy word wrap measured with the Helvetica metrics"""
+        limit = (self.width - 2 * self.margin) * 1000 / size
+        space = HELVETICA_WIDTHS[0]
+        lines, current, current_width = [], [], 0
+        available = limit - first_indent * 1000 / size
+        for word in text.encode('cp1252', errors='replace').split():
+            word_width = sum(self._glyph_width(byte) for byte in word)
+            needed = word_width if not current else current_width + space + word_width
+            if current and needed > available:
+                lines.append(b' '.join(current))
+                current, current_width, available = [word], word_width, limit
+            else:
+                current.append(word)
+                current_width = needed
+        if current:
+            lines.append(b' '.join(current))
+        return lines
+
+    def close(self):
+        self._flush_page()
+        kids = b' '.join(b"%d 0 R" % page_id for page_id in self.page_ids)
+        self._write_object(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self.page_ids)))
+
+        # Chapter bookmarks as a flat outline
+        first_item = self.next_id
+        for i, (title, page_id) in enumerate(self.outline):
+            entry = b"<< /Title (%s) /Parent 4 0 R /Dest [%d 0 R /Fit]" % (
+                self._escape(title.encode('cp1252', errors='replace')), page_id)
+            if i > 0:
+                entry += b" /Prev %d 0 R" % (first_item + i - 1)
+            if i < len(self.outline) - 1:
+                entry += b" /Next %d 0 R" % (first_item + i + 1)
+            self._write_object(first_item + i, entry + b" >>")
+        self.next_id += len(self.outline)
+        if self.outline:
+            self._write_object(4, b"<< /Type /Outlines /First %d 0 R /Last %d 0 R /Count %d >>" % (
+                first_item, first_item + len(self.outline) - 1, len(self.outline)))
+        else:
+            self._write_object(4, b"<< /Type /Outlines /Count 0 >>")
+        self._write_object(1, b"<< /Type /Catalog /Pages 2 0 R /Outlines 4 0 R /PageMode /UseOutlines >>")
+
+        info_id = self.next_id
+        self._write_object(info_id, b"<< /Title (%s) /Author (%s) /Producer (RawAI manuscript export) >>" % (
+            self._escape(self.title.encode('cp1252', errors='replace')),
+            self._escape(self.author.encode('cp1252', errors='replace'))))
+
+        xref = self.handle.tell()
+        self.handle.write(b"xref\n0 %d\n0000000000 65535 f \n" % (info_id + 1))
+        for object_id in range(1, info_id + 1):
+            self.handle.write(b"%010d 00000 n \n" % self.offsets[object_id])
+        self.handle.write(b"trailer\n<< /Size %d /Root 1 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+            info_id + 1, info_id, xref))
+        self.handle.close()
+
+    def _glyph_width(self, byte: int) -> int:
+        if 32 <= byte <= 126:
+            return HELVETICA_WIDTHS[byte - 32]
+        return HELVETICA_EXTRA.get(byte, 556)
+
+    def _add_line(self, x: float, text: bytes, size: float):
+        self.lines.append((x, self.y, size, text))
+
+    def _new_page(self):
+        self._flush_page()
+        self.y = self.height - self.margin
+
+    def _flush_page(self):
+        if not self.lines:
+            return
+        number = str(len(self.page_ids) + 1).encode('ascii')
+        number_width = sum(self._glyph_width(byte) for byte in number) * 9 / 1000
+        parts = [b"BT"]
+        for x, y, size, text in self.lines:
+            parts.append(b"/F1 %.1f Tf 1 0 0 1 %.2f %.2f Tm (%s) Tj" % (size, x, y, self._escape(text)))
+        parts.append(b"/F1 9 Tf 1 0 0 1 %.2f %.2f Tm (%s) Tj" % ((self.width - number_width) / 2, self.margin / 2, number))
+        parts.append(b"ET")
+        stream = zlib.compress(b"\n".join(parts), 6)
+        self.lines = []
+
+        content_id, page_id = self.next_id, self.next_id + 1
+        self.next_id += 2
+        self._write_object(content_id, b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(stream), stream))
+        self._write_object(page_id, b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %g %g] "
+                                    b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (
+                                        self.width, self.height, content_id))
+        self.page_ids.append(page_id)
+
+    def _write_object(self, object_id: int, body: bytes):
+        self.offsets[object_id] = self.handle.tell()
+        self.handle.write(b"%d 0 obj\n%s\nendobj\n" % (object_id, body))
+
+    @staticmethod
+    def _escape(text: bytes) -> bytes:
+        return text.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+class ManuscriptExporter:
+    """Feeds one pass over a book's chapters into every requested format at once"""
+
+    WRITERS = {'epub': EpubWriter, 'pdf': PdfWriter}
+
+    def __init__(self, output_dir: str = "outputs/books"):
+        self.output_dir = output_dir
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    def export(self, title: str, chapters: Iterable[Dict[str, Any]], author: str = 'Anonymous',
+               basename: Optional[str] = None, formats: Tuple[str, ...] = ('epub', 'pdf')) -> Dict[str, Any]:
+        """`chapters` may be a generator; each chapter is read once and then dropped"""
+        basename = basename or re.sub(r'[^A-Za-z0-9]+', '_', title).strip('_').lower() or 'manuscript'
+        paths = {fmt: os.path.join(self.output_dir, f"{basename}.{fmt}") for fmt in formats}
+        writers = [self.WRITERS[fmt](path, title, author) for fmt, path in paths.items()]
+
+        count, words = 0, 0
+        try:
+            for chapter in chapters:
+                # One chapter's paragraphs are held so every writer can read them
+                paragraphs = list(paragraphs_of(chapter))
+                count += 1
+                words += sum(len(paragraph.split()) for paragraph in paragraphs)
+                heading = chapter.get('title') or f"Chapter {count}"
+                if chapter.get('chapter') is not None and not heading.startswith('Chapter'):
+                    heading = f"Chapter {chapter['chapter']}: {heading}"
+                for writer in writers:
+                    writer.add_chapter(heading, paragraphs)
+        finally:
+            for writer in writers:
+                writer.close()
+
+        return {'files': paths, 'chapters': count, 'words': words}
+
+
+def benchmark_export(words: int = 100000, chapters: int = 30, output_dir: str = "outputs/books/benchmark") -> Dict[str, Any]:
+    """Export a synthetic book of `words` words and report time and memory"""
+    # Unix-only; imported here so the exporter itself works everywhere
+    import resource
+    sentence = "The lanterns swayed as the travellers crossed the river and nobody spoke of what they had seen."
+    per_sentence = len(sentence.split())
+
+    def book() -> Iterator[Dict[str, Any]]:
+        per_chapter = words // chapters
+        for c in range(chapters):
+            sentences = per_chapter // per_sentence
+            paragraphs = (' '.join([sentence] * 6) for _ in range(sentences // 6))
+            yield {'chapter': c + 1, 'title': f"Part {c + 1}", 'paragraphs': paragraphs}
+
+    exporter = ManuscriptExporter(output_dir)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    start = time.time()
+    result = exporter.export('Benchmark Manuscript', book(), basename='benchmark')
+    elapsed = time.time() - start
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return {
+        'words': result['words'],
+        'seconds': round(elapsed, 3),
+        'words_per_second': int(result['words'] / elapsed) if elapsed else 0,
+        'python_peak_mb': round(traced_peak / 2 ** 20, 2),
+        'peak_rss_mb': round(rss_after * scale / 2 ** 20, 1),
+        'rss_growth_mb': round((rss_after - rss_before) * scale / 2 ** 20, 1),
+        'sizes_kb': {fmt: os.path.getsize(path) // 1024 for fmt, path in result['files'].items()}
+    }
+
+
+if __name__ == "__main__":
+    for total in (10000, 100000, 400000):
+        print(total, benchmark_export(words=total))
@@ -0,0 +1,105 @@
+# src/generation/raster_ops.py
+
+from typing import Tuple
+import numpy as np
+
+from .font_cache import font_cache
+
+
+def row_runs(index: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Horizontal runs of equal colour as flat [start, end) offsets"""
+    height, width = index.shape
+    run_start = np.ones((height, width), dtype=bool)
+    run_start[:, 1:] = index[:, 1:] != index[:, :-1]
+    starts = np.flatnonzero(run_start)
+    # Every row opens with a run, so the next start always closes the current one
+    ends = np.empty_like(starts)
+    ends[:-1] = starts[1:]
+    ends[-1] = height * width
+    return starts, ends
+
+
+def run_adjacency(starts: np.ndarray, ends: np.ndarray, width: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """4-connected run pairs with their shared border length"""
+    # Runs on the row above that overlap each run
+    first = np.searchsorted(ends, starts - width, side='right')
+    last = np.searchsorted(starts, ends - width, side='left') - 1
+    counts = np.maximum(last - first + 1, 0)
+
+    below = np.repeat(np.arange(len(starts)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    above = np.repeat(first, counts) + offsets
+    overlap = (np.minimum(ends[below], ends[above] + width) -
+               np.maximum(starts[below], starts[above] + width))
+
+    # Neighbouring runs on the same row touch along one pixel edge
+    left = np.flatnonzero(starts[1:] % width != 0)
+    edge_a = np.concatenate([above, left])
+    edge_b = np.concatenate([below, left + 1])
+    weight = np.concatenate([overlap, np.ones(len(left), dtype=overlap.dtype)])
+    return edge_a, edge_b, weight
+
+
+def union_runs(run_count: int, edge_a: np.ndarray, edge_b: np.ndarray, run_color: np.ndarray) -> np.ndarray:
+    """Dense region id per run, joining adjacent runs of the same colour"""
+    same = run_color[edge_a] == run_color[edge_b]
+    a, b = edge_a[same], edge_b[same]
+
+    label = np.arange(run_count)
+    while True:
+        lowest = np.minimum(label[a], label[b])
+        updated = label.copy()
+        np.minimum.at(updated, label[a], lowest)
+        np.minimum.at(updated, label[b], lowest)
+        while True:
+            jumped = updated[updated]
+            if np.array_equal(jumped, updated):
+                break
+            updated = jumped
+        if np.array_equal(updated, label):
+            break
+        label = updated
+
+    _, region = np.unique(label, return_inverse=True)
+    return region.astype(np.int64)
+
+
+def boundaries(regions: np.ndarray) -> np.ndarray:
+    """Pixels whose right or lower neighbour belongs to another region"""
+    edge = np.zeros(regions.shape, dtype=bool)
+    edge[:, :-1] |= regions[:, :-1] != regions[:, 1:]
+    edge[:-1, :] |= regions[:-1, :] != regions[1:, :]
+    return edge
+
+
+def chamfer_distance(boundary: np.ndarray) -> np.ndarray:
+    """3-4 chamfer distance (in pixels) to the nearest outline or image edge"""
+    height, width = boundary.shape
+    distance = np.where(boundary, 0, 3 * (height + width)).astype(np.float32)
+    distance[[0, -1], :] = 0
+    distance[:, [0, -1]] = 0
+    ramp = 3.0 * np.arange(width, dtype=np.float32)
+
+    def sweep(row: np.ndarray) -> np.ndarray:
+        # row[x] = min over x' of row[x'] + 3|x - x'|, in both directions
+        row = np.minimum(row, np.minimum.accumulate(row - ramp) + ramp)
+        reverse = row[::-1]
+        reverse = np.minimum(reverse, np.minimum.accumulate(reverse - ramp) + ramp)
+        return reverse[::-1]
+
+    def relax(y: int, neighbour: np.ndarray):
+        candidate = neighbour + 3
+        candidate[1:] = np.minimum(candidate[1:], neighbour[:-1] + 4)
+        candidate[:-1] = np.minimum(candidate[:-1], neighbour[1:] + 4)
+        distance[y] = sweep(np.minimum(distance[y], candidate))
+
+    for y in range(1, height):
+        relax(y, distance[y - 1])
+    for y in range(height - 2, -1, -1):
+        relax(y, distance[y + 1])
+    return distance / 3.0
+
+
+def load_font(size: int):
+    """TrueType font when available, Pillow's bundled font otherwise; loaded once per size"""
+    return font_cache.font(size)
@@ -0,0 +1,237 @@
+# src/generation/tarot_deck.py
+
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+from PIL import Image, ImageDraw
+
+from .font_cache import font_cache
+
+MAJOR_ARCANA = [
+    'The Fool', 'The Magician', 'The High Priestess', 'The Empress', 'The Emperor',
+    'The Hierophant', 'The Lovers', 'The Chariot', 'Strength', 'The Hermit',
+    'Wheel of Fortune', 'Justice', 'The Hanged Man', 'Death', 'Temperance',
+    'The Devil', 'The Tower', 'The Star', 'The Moon', 'The Sun', 'Judgement', 'The World'
+]
+MINOR_RANKS = ['Ace', 'Two', 'Three', 'Four', 'Five', 'Six', 'Seven', 'Eight', 'Nine', 'Ten',
+               'Page', 'Knight', 'Queen', 'King']
+ROMAN = ['0', 'I', 'II', 'III', 'IV', 'V', 'VI', 'VII', 'VIII', 'IX', 'X', 'XI', 'XII', 'XIII',
+         'XIV', 'XV', 'XVI', 'XVII', 'XVIII', 'XIX', 'XX', 'XXI']
+
+# Accent colour per suit; major arcana use gold
+SUIT_COLORS = {
+    'Major': (201, 162, 39),
+    'Wands': (196, 84, 36),
+    'Cups': (44, 110, 170),
+    'Swords': (120, 130, 150),
+    'Pentacles': (70, 140, 60)
+}
+
+FRAME_BACKGROUND = (24, 18, 40, 255)
+
+
+def build_deck(suits: List[str]) -> List[Dict[str, Any]]:
+    """The 22 major and 56 minor arcana in traditional order"""
+    cards = [{'index': i, 'name': name, 'suit': 'Major', 'numeral': ROMAN[i]}
+             for i, name in enumerate(MAJOR_ARCANA)]
+    for suit in suits:
+        for rank in MINOR_RANKS:
+            cards.append({'index': len(cards), 'name': f"{rank} of {suit}", 'suit': suit, 'numeral': ''})
+    return cards
+
+
+# Shared layers. Each is built once per card size (and suit) and reused for every card.
+@lru_cache(maxsize=16)
+def frame_layer(size: Tuple[int, int]) -> Image.Image:
+    """Card border, art window cut-out and title plate"""
+    width, height = size
+    border = width // 18
+    layer = Image.new('RGBA', size, FRAME_BACKGROUND)
+    draw = ImageDraw.Draw(layer)
+
+    # Punch a transparent window where the per-card art shows through
+    x0, y0, x1, y1 = art_window(size)
+    draw.rectangle([x0, y0, x1 - 1, y1 - 1], fill=(0, 0, 0, 0))
+
+    draw.rounded_rectangle([border // 3, border // 3, width - border // 3, height - border // 3],
+                           radius=border, outline=(230, 210, 160, 255), width=max(2, border // 6))
+    draw.rectangle([x0 - 3, y0 - 3, x1 + 2, y1 + 2], outline=(230, 210, 160, 255), width=3)
+
+    plate_top = y1 + border // 2
+    draw.rounded_rectangle([border, plate_top, width - border, height - border],
+                           radius=border // 2, fill=(245, 235, 210, 255), outline=(120, 90, 40, 255), width=2)
+
+    # Corner ornaments
+    r = border // 2
+    for cx, cy in [(border, border), (width - border, border),
+                   (border, height - border), (width - border, height - border)]:
+        draw.ellipse([cx - r, cy - r, cx + r, cy + r], outline=(230, 210, 160, 255), width=2)
+    return layer
+
+
+@lru_cache(maxsize=64)
+def suit_layer(size: Tuple[int, int], suit: str) -> Image.Image:
+    """Suit-coloured inner rule and emblem over the frame"""
+    width, height = size
+    color = SUIT_COLORS.get(suit, SUIT_COLORS['Major']) + (255,)
+    layer = Image.new('RGBA', size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer)
+
+    x0, y0, x1, y1 = art_window(size)
+    draw.rectangle([x0 - 8, y0 - 8, x1 + 7, y1 + 7], outline=color, width=3)
+
+    # Emblem badge centred on the top border
+    r = width // 14
+    cx, cy = width // 2, y0 - 8
+    draw.ellipse([cx - r, cy - r, cx + r, cy + r], fill=FRAME_BACKGROUND, outline=color, width=3)
+    inner = r // 2
+    if suit == 'Wands':
+        draw.line([cx, cy - inner, cx, cy + inner], fill=color, width=4)
+    elif suit == 'Cups':
+        draw.chord([cx - inner, cy - inner, cx + inner, cy + inner], 0, 180, fill=color)
+    elif suit == 'Swords':
+        draw.polygon([(cx, cy - inner), (cx + inner // 3, cy + inner), (cx - inner // 3, cy + inner)], fill=color)
+    elif suit == 'Pentacles':
+        draw.regular_polygon((cx, cy, inner), 5, fill=color)
+    else:
+        draw.regular_polygon((cx, cy, inner), 4, rotation=45, fill=color)
+    return layer
+
+
+@lru_cache(maxsize=16)
+def polar_grid(size: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+    """Radius and angle of every art-window pixel, shared by all card art"""
+    width, height = size
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    x = (x - width / 2) / (width / 2)
+    y = (y - height / 2) / (width / 2)
+    return np.hypot(x, y), np.arctan2(y, x)
+
+
+def art_window(size: Tuple[int, int]) -> Tuple[int, int, int, int]:
+    width, height = size
+    border = width // 18
+    return (border * 2, border * 3, width - border * 2, int(height * 0.78))
+
+
+class TarotDeckEngine:
+    """Renders a full 78-card deck from cached frame layers and per-card art"""
+
+    def __init__(self, output_dir: str = "outputs/images/tarot", card_size: Tuple[int, int] = (550, 950),
+                 sheet_size: Tuple[int, int] = (1700, 2200), workers: Optional[int] = None):
+        self.output_dir = output_dir
+        self.card_size = card_size
+        self.sheet_size = sheet_size
+        self.workers = workers or os.cpu_count()
+        os.makedirs(output_dir, exist_ok=True)
+
+    def render_deck(self, title: str, suits: Optional[List[str]] = None, seed: int = 0,
+                    art: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Render every card in parallel, then write PNGs and a print sheet PDF"""
+        cards = build_deck(suits or ['Wands', 'Cups', 'Swords', 'Pentacles'])
+        art = art or {}
+
+        deck_dir = os.path.join(self.output_dir, f"deck_{datetime.now().strftime('%Y%m%d_%H%M%S%f')}")
+        os.makedirs(deck_dir, exist_ok=True)
+
+        # Warm the shared layers before the workers start
+        frame_layer(self.card_size)
+        for suit in {card['suit'] for card in cards}:
+            suit_layer(self.card_size, suit)
+
+        def render_and_save(card: Dict[str, Any]) -> Tuple[Image.Image, str]:
+            image = self.render_card(card, art.get(card['name']), seed)
+            path = os.path.join(deck_dir, f"{card['index']:02d}_{card['name'].lower().replace(' ', '_')}.png")
+            image.save(path, compress_level=1)
+            return image, path
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            rendered = list(pool.map(render_and_save, cards))
+
+        sheet_path = os.path.join(deck_dir, "print_sheet.pdf")
+        self.render_print_sheet([image for image, _ in rendered], sheet_path, title)
+
+        return {
+            'title': title,
+            'cards': [dict(card, file=path) for card, (_, path) in zip(cards, rendered)],
+            'print_sheet': sheet_path,
+            'card_size': list(self.card_size)
+        }
+
+    def render_card(self, card: Dict[str, Any], art: Any = None, seed: int = 0) -> Image.Image:
+        """Per-card art under the shared layers, then the card's title"""
+        x0, y0, x1, y1 = art_window(self.card_size)
+        window = (x1 - x0, y1 - y0)
+        if art is None:
+            art_image = self.synthesize_art(card, window, seed)
+        else:
+            art_image = (art if isinstance(art, Image.Image) else Image.open(art)).convert('RGB').resize(
+                window, Image.Resampling.LANCZOS)
+
+        card_image = Image.new('RGBA', self.card_size, FRAME_BACKGROUND)
+        card_image.paste(art_image, (x0, y0))
+        card_image.alpha_composite(frame_layer(self.card_size))
+        card_image.alpha_composite(suit_layer(self.card_size, card['suit']))
+
+        width, height = self.card_size
+        border = width // 18
+        plate_top, plate_bottom = y1 + border // 2, height - border
+        plate_height = plate_bottom - plate_top
+        draw = ImageDraw.Draw(card_image)
+        if card['numeral']:
+            font_cache.draw_text(card_image, (width / 2, plate_top + plate_height * 0.3), card['numeral'],
+                                 width // 18, (120, 90, 40, 255), anchor='mm', draw=draw)
+            name_y = plate_top + plate_height * 0.65
+        else:
+            name_y = plate_top + plate_height / 2
+        font_cache.draw_text(card_image, (width / 2, name_y), card['name'], width // 14, (40, 25, 10, 255),
+                             anchor='mm', draw=draw)
+        return card_image.convert('RGB')
+
+    def synthesize_art(self, card: Dict[str, Any], size: Tuple[int, int], seed: int = 0) -> Image.Image:
+        """Vectorised mandala in the suit's palette, seeded per card"""
+        rng = np.random.default_rng(seed + zlib.crc32(card['name'].encode('utf-8')))
+        r, theta = polar_grid(size)
+        petals = int(rng.integers(3, 12))
+        rings = rng.uniform(4, 14)
+
+        pattern = (np.sin(petals * theta + rng.uniform(0, np.pi) + r * rng.uniform(-3, 3)) *
+                   np.cos(r * rings) + np.sin(r * rings * 0.5 - theta * rng.integers(1, 4)))
+        glow = np.clip(1.2 - r, 0, 1)
+        value = (pattern * 0.25 + 0.5) * glow
+
+        accent = np.array(SUIT_COLORS.get(card['suit'], SUIT_COLORS['Major']), dtype=np.float32)
+        shadow = rng.uniform(10, 60, size=3).astype(np.float32)
+        pixels = shadow + value[..., None] * (accent * 1.3 - shadow)
+        return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8), 'RGB')
+
+    def render_print_sheet(self, cards: List[Image.Image], path: str, title: str) -> str:
+        """Lay cards out on letter sheets with cut marks and save as one PDF"""
+        sheet_w, sheet_h = self.sheet_size
+        card_w, card_h = self.card_size
+        gap = 20
+        columns = max(1, (sheet_w + gap) // (card_w + gap))
+        rows = max(1, (sheet_h + gap) // (card_h + gap))
+        per_sheet = columns * rows
+        left = (sheet_w - columns * card_w - (columns - 1) * gap) // 2
+        top = (sheet_h - rows * card_h - (rows - 1) * gap) // 2
+
+        sheets = []
+        for start in range(0, len(cards), per_sheet):
+            sheet = Image.new('RGB', self.sheet_size, 'white')
+            draw = ImageDraw.Draw(sheet)
+            for slot, card in enumerate(cards[start:start + per_sheet]):
+                x = left + (slot % columns) * (card_w + gap)
+                y = top + (slot // columns) * (card_h + gap)
+                sheet.paste(card, (x, y))
+                for cx, cy in [(x, y), (x + card_w, y), (x, y + card_h), (x + card_w, y + card_h)]:
+                    draw.line([cx - 8, cy, cx + 8, cy], fill=(150, 150, 150))
+                    draw.line([cx, cy - 8, cx, cy + 8], fill=(150, 150, 150))
+            sheets.append(sheet)
+
+        sheets[0].save(path, save_all=True, append_images=sheets[1:], resolution=200.0, title=title)
+        return path
@@ -0,0 +1,475 @@
+# src/generation/text_engine.py
+
+import os
+import re
+import time
+import zlib
+import queue
+import hashlib
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Iterator, Tuple
+import numpy as np
+
+try:
+    from llama_cpp import Llama
+    LLAMA_CPP_AVAILABLE = True
+except ImportError:
+    LLAMA_CPP_AVAILABLE = False
+
+# Characters the local model knows; anything else is read as a space
+VOCAB = ("\n !\"'(),-.:;?0123456789"
+         "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz")
+CHAR_IDS = {char: i for i, char in enumerate(VOCAB)}
+SPACE_ID = CHAR_IDS[' ']
+
+# Small built-in corpus so the local model works out of the box; more text can be added with train()
+SEED_CORPUS = """
+The road climbed out of the valley in long grey loops, and by the time the sun touched the hills the travellers
+could see the whole of the old kingdom spread below them. Nobody spoke. They had come too far to pretend that
+the journey was still an adventure, and not far enough to believe it would end well.
+
+She remembered the first night in the city, the way the lanterns had swung in the wind and the river had smelled
+of rain and iron. She had promised herself then that she would never go back. Now the promise felt like a
+stone in her pocket, small and heavy and impossible to throw away.
+
+"You knew," he said quietly. "You knew from the beginning and you let me walk into it."
+"I knew what might happen," she answered. "That is not the same thing. Nothing is certain until it is done."
+He looked at her for a long moment, and then he laughed, because there was nothing else left to do.
+
+In the morning the village was quiet. Smoke rose from the chimneys, a dog barked somewhere near the mill, and the
+children ran down to the water as if the world had not changed at all. Only the old woman at the well watched
+the strangers as they passed, her hands folded, her eyes bright and patient and very sharp.
+
+The letter was short. It said that the house had been sold, that the garden was gone, and that the writer was
+sorry. It did not say why. He read it three times by the window and then he folded it carefully and put it
+inside his coat, next to his heart, where he kept all the things he did not want to think about.
+
+They found the door at the end of the tunnel, exactly where the map had promised. It was smaller than they had
+imagined and very old, and there was a handprint pressed into the wood as if someone had tried to hold it shut
+from the other side. For a while nobody moved. Then the youngest of them stepped forward and knocked.
+
+The storm broke just after midnight. Thunder rolled over the roofs, the shutters rattled, and the candles
+guttered in their dishes. Somewhere below, a door slammed and footsteps hurried across the yard. By the time
+anyone thought to look outside, the stable was empty and the gate was swinging open in the rain.
+
+Years later, when people asked her how it had started, she always told them the same story. There was a
+stranger, she would say, and a question nobody could answer, and a morning when the whole town woke up and
+decided to be brave. It was not exactly true, but it was true enough, and it was the part worth remembering.
+
+The dragon did not look up when the knight entered the cave. It was reading, or seemed to be, turning the pages
+of an enormous book with one careful claw. "You are late," it said at last. "I expected you yesterday. Sit
+down, and mind the candles. We have a great deal to talk about, you and I, and very little time."
+
+Every choice has a price, the teacher had told them, and most of the time you pay it without noticing. The
+trouble begins when the bill arrives all at once. That was what happened to the town that winter: every small
+choice came due together, and there was no one left who could say they had not been warned.
+"""
+
+
+def encode(text: str) -> np.ndarray:
+    return np.array([CHAR_IDS.get(char, SPACE_ID) for char in text], dtype=np.int64)
+
+
+class NgramTable:
+    """Next-character counts for every context of one order, as sorted keys plus a dense count block"""
+
+    def __init__(self, ids: np.ndarray, order: int):
+        self.order = order
+        vocab = len(VOCAB)
+        if len(ids) <= order:
+            self.keys = np.zeros(0, dtype=np.int64)
+            self.counts = np.zeros((0, vocab), dtype=np.float32)
+        else:
+            keys = context_keys(ids, order)[:-1]
+            nxt = ids[order:]
+            self.keys, inverse = np.unique(keys, return_inverse=True)
+            self.counts = np.zeros((len(self.keys), vocab), dtype=np.float32)
+            np.add.at(self.counts, (inverse, nxt), 1)
+        self._finish()
+
+    def _finish(self):
+        self.totals = self.counts.sum(axis=1)
+        self.distinct = (self.counts > 0).sum(axis=1).astype(np.float32)
+
+    def lookup(self, keys: np.ndarray):
+        """Rows for each query key, with a mask of which contexts were seen"""
+        if not len(self.keys):
+            return np.zeros(len(keys), dtype=bool), np.zeros(len(keys), dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        return self.keys[pos] == keys, pos
+
+
+def context_keys(ids: np.ndarray, order: int) -> np.ndarray:
+    """Integer key of every length-`order` window, one per position from order-1 on"""
+    windows = np.lib.stride_tricks.sliding_window_view(ids, order)
+    powers = len(VOCAB) ** np.arange(order - 1, -1, -1, dtype=np.int64)
+    return windows @ powers
+
+
+class NgramModel:
+    """Witten-Bell interpolated n-gram tables over the character vocabulary"""
+
+    def __init__(self, ids: np.ndarray, max_order: int):
+        self.max_order = max_order
+        unigram = np.bincount(ids, minlength=len(VOCAB)).astype(np.float32) + 0.01
+        self.unigram = unigram / unigram.sum()
+        self.tables = [NgramTable(ids, order) for order in range(1, max_order + 1)]
+
+    def distribution(self, history: np.ndarray) -> np.ndarray:
+        """(batch, vocab) probabilities of the next character given each row's trailing history"""
+        batch = history.shape[0]
+        probs = np.broadcast_to(self.unigram, (batch, len(VOCAB))).copy()
+        for table in self.tables:
+            order = table.order
+            if history.shape[1] < order:
+                break
+            powers = len(VOCAB) ** np.arange(order - 1, -1, -1, dtype=np.int64)
+            keys = history[:, -order:] @ powers
+            found, rows = table.lookup(keys)
+            if not found.any():
+                continue
+            rows = rows[found]
+            totals = table.totals[rows][:, None]
+            weight = totals / (totals + table.distinct[rows][:, None])
+            probs[found] = weight * table.counts[rows] / totals + (1 - weight) * probs[found]
+        return probs
+
+
+class PrefixState:
+    """Processed shared context: its n-gram cache and trailing characters"""
+
+    def __init__(self, text: str, model: Optional[NgramModel] = None, payload: Any = None):
+        self.text = text
+        self.tail = text[-32:]
+        self.model = model
+        self.payload = payload
+        self.tokens = len(text)
+
+
+class TextBackend(ABC):
+    """Interface shared by every generation backend"""
+
+    name = 'base'
+
+    def encode_prefix(self, text: str) -> PrefixState:
+        return PrefixState(text)
+
+    @abstractmethod
+    def run(self, prompts: List[str], max_tokens: int, prefix: Optional[PrefixState] = None,
+            temperature: float = 0.4, seed: int = 0) -> Iterator[List[str]]:
+        """Yield one token per prompt per step until max_tokens ('' for prompts with nothing new)"""
+
+    def generate_batch(self, prompts: List[str], max_tokens: int = 400, prefix: Optional[PrefixState] = None,
+                       temperature: float = 0.4, seed: int = 0) -> List[str]:
+        return self.generate_counted(prompts, max_tokens, prefix, temperature, seed)[0]
+
+    def generate_counted(self, prompts: List[str], max_tokens: int = 400, prefix: Optional[PrefixState] = None,
+                         temperature: float = 0.4, seed: int = 0) -> Tuple[List[str], int]:
+        """Outputs plus the number of tokens actually produced, which can stop short of max_tokens"""
+        outputs = [[] for _ in prompts]
+        count = 0
+        for step in self.run(prompts, max_tokens, prefix, temperature, seed):
+            for out, token in zip(outputs, step):
+                if token:
+                    out.append(token)
+                    count += 1
+        return [''.join(out) for out in outputs], count
+
+    def stream(self, prompt: str, max_tokens: int = 400, prefix: Optional[PrefixState] = None,
+               temperature: float = 0.4, seed: int = 0) -> Iterator[str]:
+        for step in self.run([prompt], max_tokens, prefix, temperature, seed):
+            yield step[0]
+
+
+class StubBackend(TextBackend):
+    """Deterministic word salad seeded by the prompt; for tests and offline demos"""
+
+    name = 'stub'
+    WORDS = ('the story turns as night falls and the old road leads home while a stranger waits by the river '
+             'with a secret that changes everything she knew about him').split()
+
+    def run(self, prompts, max_tokens, prefix=None, temperature=0.4, seed=0):
+        context = prefix.text if prefix else ''
+        rngs = [np.random.default_rng(seed + zlib.crc32((context + prompt).encode('utf-8'))) for prompt in prompts]
+        for step in range(max_tokens):
+            tokens = []
+            for rng in rngs:
+                word = self.WORDS[int(rng.integers(len(self.WORDS)))]
+                tokens.append(word if step == 0 else ' ' + word)
+            yield tokens
+
+
+class CharModelBackend(TextBackend):
+    """Local CPU character model: interpolated n-grams plus a cache model built from the story context.
+
+    The shared context is processed once into its own n-gram tables (the prefix
+    state). Each request only builds tables for its own prompt and mixes them with
+    the prefix's at lookup time, so its cost does not grow with the context. All
+    prompts in a batch are sampled together with vectorised lookups.
+    """
+
+    name = 'char_model'
+
+    def __init__(self, corpus: Optional[str] = None, max_order: int = 8, cache_weight: float = 0.35):
+        self.max_order = max_order
+        self.cache_weight = cache_weight
+        self.corpus = corpus if corpus is not None else SEED_CORPUS
+        self.model = NgramModel(encode(self.corpus), max_order)
+
+    def train(self, text: str):
+        self.corpus += '\n' + text
+        self.model = NgramModel(encode(self.corpus), self.max_order)
+
+    def encode_prefix(self, text: str) -> PrefixState:
+        return PrefixState(text, NgramModel(encode(text), self.max_order))
+
+    def run(self, prompts, max_tokens, prefix=None, temperature=0.4, seed=0):
+        rng = np.random.default_rng(seed)
+        deltas = [(row, NgramModel(encode(prompt), self.max_order), len(prompt))
+                  for row, prompt in enumerate(prompts) if len(prompt) > self.max_order]
+
+        width = self.max_order
+        history = np.full((len(prompts), width), SPACE_ID, dtype=np.int64)
+        for row, prompt in enumerate(prompts):
+            tail = encode(((prefix.tail if prefix else '') + prompt)[-width:])
+            if len(tail):
+                history[row, -len(tail):] = tail
+
+        for _ in range(max_tokens):
+            probs = self.model.distribution(history)
+            if prefix is not None or deltas:
+                # Cache model: the shared prefix tables for the whole batch, then each prompt's own
+                # tables weighted by its share of the context
+                cache = prefix.model.distribution(history) if prefix is not None else np.zeros_like(probs)
+                for row, delta, length in deltas:
+                    share = length / (length + (prefix.tokens if prefix else 0))
+                    cache[row] = (1 - share) * cache[row] + share * delta.distribution(history[row:row + 1])[0]
+                probs = (1 - self.cache_weight) * probs + self.cache_weight * cache
+            if temperature != 1.0:
+                probs = probs ** (1.0 / max(temperature, 1e-3))
+            cumulative = np.cumsum(probs, axis=1)
+            draws = rng.random(len(prompts)) * cumulative[:, -1]
+            chosen = np.minimum((cumulative < draws[:, None]).sum(axis=1), len(VOCAB) - 1)
+
+            history = np.roll(history, -1, axis=1)
+            history[:, -1] = chosen
+            yield [VOCAB[i] for i in chosen]
+
+
+class LlamaCppBackend(TextBackend):
+    """Quantised GGUF model through llama.cpp; the prefix state is a saved KV cache"""
+
+    name = 'llama_cpp'
+
+    def __init__(self, model_path: str, n_ctx: int = 4096, n_threads: Optional[int] = None):
+        self.llm = Llama(model_path=model_path, n_ctx=n_ctx, n_threads=n_threads or os.cpu_count(), verbose=False)
+        self.lock = threading.Lock()
+
+    def encode_prefix(self, text: str) -> PrefixState:
+        with self.lock:
+            self.llm.reset()
+            self.llm.eval(self.llm.tokenize(text.encode('utf-8')))
+            state = self.llm.save_state()
+        return PrefixState(text, payload=state)
+
+    def run(self, prompts, max_tokens, prefix=None, temperature=0.4, seed=0):
+        # llama.cpp evaluates one sequence at a time, so prompts are generated one after another
+        # (sharing the restored prefix) on a worker thread that holds the model lock only while
+        # sampling. Tokens reach the caller through a queue as they are sampled, so a slow or
+        # abandoned consumer never keeps the model from other requests; closing it stops the worker.
+        tokens = queue.Queue()
+        cancelled = threading.Event()
+
+        def produce():
+            try:
+                for i, prompt in enumerate(prompts):
+                    with self.lock:
+                        if prefix is not None:
+                            # Restored tokens match the start of the prompt, so only the new part is evaluated
+                            self.llm.load_state(prefix.payload)
+                        text = (prefix.text if prefix else '') + prompt
+                        for chunk in self.llm.create_completion(text, max_tokens=max_tokens, temperature=temperature,
+                                                                seed=seed, stream=True):
+                            if cancelled.is_set():
+                                return
+                            tokens.put((i, chunk['choices'][0]['text']))
+            except Exception as e:
+                tokens.put(e)
+            finally:
+                tokens.put(None)
+
+        threading.Thread(target=produce, daemon=True).start()
+        try:
+            while True:
+                item = tokens.get()
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                i, token = item
+                step = [''] * len(prompts)
+                step[i] = token
+                yield step
+        finally:
+            cancelled.set()
+
+
+class PromptPrefixCache:
+    """Processed shared context per work (novel, series, ...), evicted least-recently-used.
+
+    Each work keeps one entry. When its context text changes, for example after a
+    character edit, the entry is re-encoded in place rather than piling up stale versions.
+    """
+
+    def __init__(self, max_works: int = 8, max_tokens: int = 2_000_000):
+        self.max_works = max_works
+        self.max_tokens = max_tokens
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, work_id: str, prefix: str, encode) -> PrefixState:
+        key = hashlib.sha1(prefix.encode('utf-8')).hexdigest()
+        with self.lock:
+            entry = self.entries.get(work_id)
+            if entry is not None and entry['key'] == key:
+                self.hits += 1
+                self.entries.move_to_end(work_id)
+                return entry['state']
+            self.misses += 1
+
+        state = encode(prefix)
+        with self.lock:
+            self.entries[work_id] = {'key': key, 'state': state}
+            self.entries.move_to_end(work_id)
+            while len(self.entries) > 1 and (len(self.entries) > self.max_works or self.cached_tokens() > self.max_tokens):
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        return state
+
+    def evict(self, work_id: str) -> bool:
+        with self.lock:
+            return self.entries.pop(work_id, None) is not None
+
+    def cached_tokens(self) -> int:
+        return sum(entry['state'].tokens for entry in self.entries.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'works': list(self.entries), 'tokens': self.cached_tokens(), 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions}
+
+
+class TextEngine:
+    """Prose generation over a pluggable backend with prefix caching, batching and streaming"""
+
+    def __init__(self, memory_system=None, backend: str = 'auto', model_path: Optional[str] = None,
+                 corpus_dir: str = "training_data/text", prefix_cache_size: int = 8):
+        self.memory_system = memory_system
+        self.backend_name = backend
+        self.model_path = model_path or os.environ.get('RAWAI_LLAMA_MODEL')
+        self.corpus_dir = corpus_dir
+        self.prefix_cache = PromptPrefixCache(max_works=prefix_cache_size)
+        self.lock = threading.Lock()
+        self._backend = None
+        self.stats = {'requests': 0, 'tokens': 0, 'seconds': 0.0}
+
+    @property
+    def backend(self) -> TextBackend:
+        """Chosen on first use so importing the engine stays cheap"""
+        if self._backend is None:
+            with self.lock:
+                if self._backend is None:
+                    self._backend = self._create_backend()
+        return self._backend
+
+    def _create_backend(self) -> TextBackend:
+        name = self.backend_name
+        if name == 'stub':
+            return StubBackend()
+        if name in ('auto', 'llama_cpp') and LLAMA_CPP_AVAILABLE and self.model_path:
+            return LlamaCppBackend(self.model_path)
+        if name == 'llama_cpp':
+            print("⚠️  llama.cpp model not available, using local character model")
+
+        corpus = SEED_CORPUS
+        if os.path.isdir(self.corpus_dir):
+            for filename in sorted(os.listdir(self.corpus_dir)):
+                if filename.endswith('.txt'):
+                    with open(os.path.join(self.corpus_dir, filename), 'r', encoding='utf-8', errors='ignore') as f:
+                        corpus += '\n' + f.read()
+        return CharModelBackend(corpus)
+
+    def prefix_state(self, prefix: Optional[str], work_id: Optional[str] = None) -> Optional[PrefixState]:
+        """Processed shared context for a work; anonymous prefixes are keyed by their own hash"""
+        if not prefix:
+            return None
+        work_id = work_id or 'prefix:' + hashlib.sha1(prefix.encode('utf-8')).hexdigest()
+        return self.prefix_cache.get(work_id, prefix, self.backend.encode_prefix)
+
+    def release_work(self, work_id: str) -> bool:
+        """Drop a finished work's cached context"""
+        return self.prefix_cache.evict(work_id)
+
+    def generate(self, prompt: str, max_tokens: int = 400, prefix: Optional[str] = None,
+                 temperature: float = 0.4, seed: Optional[int] = None, work_id: Optional[str] = None) -> str:
+        return self.generate_batch([prompt], max_tokens, prefix, temperature, seed, work_id)[0]
+
+    def generate_batch(self, prompts: List[str], max_tokens: int = 400, prefix: Optional[str] = None,
+                       temperature: float = 0.4, seed: Optional[int] = None,
+                       work_id: Optional[str] = None) -> List[str]:
+        """Generate for several prompts at once, trimmed back to the last complete sentence"""
+        start = time.time()
+        state = self.prefix_state(prefix, work_id)
+        seed = zlib.crc32(''.join(prompts).encode('utf-8'), len(prefix or '')) if seed is None else seed
+        outputs, count = self.backend.generate_counted(prompts, max_tokens, state, temperature, seed)
+        self._record(count, time.time() - start, len(prompts))
+        return [_trim_sentence(text) for text in outputs]
+
+    def stream(self, prompt: str, max_tokens: int = 400, prefix: Optional[str] = None,
+               temperature: float = 0.4, seed: Optional[int] = None, work_id: Optional[str] = None) -> Iterator[str]:
+        """Yield tokens as soon as they are sampled"""
+        start = time.time()
+        state = self.prefix_state(prefix, work_id)
+        seed = zlib.crc32(prompt.encode('utf-8'), len(prefix or '')) if seed is None else seed
+        count = 0
+        for token in self.backend.stream(prompt, max_tokens, state, temperature, seed):
+            count += 1
+            yield token
+        self._record(count, time.time() - start, 1)
+
+    def _record(self, tokens: int, seconds: float, requests: int):
+        with self.lock:
+            self.stats['requests'] += requests
+            self.stats['tokens'] += tokens
+            self.stats['seconds'] += seconds
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats, backend=self.backend.name if self._backend else None,
+                     prefix_cache=self.prefix_cache.get_stats())
+        stats['tokens_per_second'] = stats['tokens'] / stats['seconds'] if stats['seconds'] else 0.0
+        return stats
+
+
+def _trim_sentence(text: str) -> str:
+    """Cut a sampled continuation back to its last full sentence, if that keeps most of it"""
+    end = max(text.rfind(mark) for mark in '.!?')
+    if end > len(text) // 2:
+        if text[end + 1:end + 2] == '"':
+            end += 1
+        return text[:end + 1].strip()
+    return text.strip()
+
+
+SENTENCE_END = re.compile(r'(?<=[.!?])["\']?\s+')
+
+
+def first_sentence(text: str) -> str:
+    return SENTENCE_END.split(text.strip(), 1)[0]
+
+
+def last_sentence(text: str) -> str:
+    return SENTENCE_END.split(text.strip())[-1]
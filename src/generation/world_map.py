@@ -0,0 +1,312 @@
+# src/generation/world_map.py
+
+import os
+import json
+import heapq
+from datetime import datetime
+from typing import Dict, List, Any
+import numpy as np
+from PIL import Image, ImageDraw
+
+from .font_cache import font_cache
+
+# Height -> colour stops for the hypsometric tint (sea level is 0.0)
+HEIGHT_STOPS = np.array([-1.0, -0.25, -0.02, 0.0, 0.04, 0.2, 0.4, 0.6, 1.0])
+COLOR_STOPS = np.array([
+    (10, 30, 80), (25, 70, 140), (70, 130, 190), (210, 200, 150), (90, 150, 70),
+    (60, 120, 50), (120, 110, 80), (150, 140, 130), (250, 250, 250)
+], dtype=np.float64)
+
+SYLLABLES = ['ar', 'bel', 'cor', 'dun', 'el', 'fen', 'gar', 'hal', 'ith', 'kor', 'lan', 'mor',
+             'nar', 'os', 'pel', 'quin', 'ros', 'sil', 'tor', 'ul', 'val', 'wyn', 'yr', 'zan']
+
+
+def _hash2(ix: np.ndarray, iy: np.ndarray, seed: int) -> np.ndarray:
+    """Deterministic per-lattice-point random values in [0, 1)"""
+    seed_mix = np.uint32((seed * 2246822519) & 0xFFFFFFFF)
+    h = ix.astype(np.uint32) * np.uint32(374761393) + iy.astype(np.uint32) * np.uint32(668265263) + seed_mix
+    h = (h ^ (h >> np.uint32(13))) * np.uint32(1274126177)
+    h ^= h >> np.uint32(16)
+    return h.astype(np.float64) / 4294967296.0
+
+
+def value_noise(xs: np.ndarray, ys: np.ndarray, seed: int) -> np.ndarray:
+    """Smooth value noise on the grid spanned by 1-D `xs` (columns) and `ys` (rows)"""
+    x0, y0 = np.floor(xs), np.floor(ys)
+    fx, fy = xs - x0, ys - y0
+    fx = fx * fx * (3 - 2 * fx)
+    fy = fy * fy * (3 - 2 * fy)
+
+    ix = x0.astype(np.int64)[None, :]
+    iy = y0.astype(np.int64)[:, None]
+    v00 = _hash2(ix, iy, seed)
+    v10 = _hash2(ix + 1, iy, seed)
+    v01 = _hash2(ix, iy + 1, seed)
+    v11 = _hash2(ix + 1, iy + 1, seed)
+
+    top = v00 + (v10 - v00) * fx[None, :]
+    bottom = v01 + (v11 - v01) * fx[None, :]
+    return top + (bottom - top) * fy[:, None]
+
+
+class WorldMapEngine:
+    """Procedural fantasy world rendered straight into a zoomable tile pyramid"""
+
+    def __init__(self, output_dir: str = "outputs/images/maps", world_size: int = 4096,
+                 tile_size: int = 256, regions: int = 24, octaves: int = 9,
+                 overview_size: int = 512, seed: int = 0):
+        self.output_dir = output_dir
+        self.tile_size = tile_size
+        self.regions = regions
+        self.octaves = octaves
+        self.overview_size = overview_size
+        self.seed = seed
+        self.max_zoom = max(0, int(np.ceil(np.log2(world_size / tile_size))))
+        # Level z is always 2**z tiles across, so the world is a whole power-of-two number of tiles
+        self.world_size = tile_size * 2 ** self.max_zoom
+        os.makedirs(output_dir, exist_ok=True)
+
+    # Terrain
+    def height(self, xs: np.ndarray, ys: np.ndarray, pixel_size: float) -> np.ndarray:
+        """Band-limited fBm heightmap with a continental falloff, coordinates in [0, 1]"""
+        total = np.zeros((len(ys), len(xs)))
+        amplitude, frequency, norm = 1.0, 3.0, 0.0
+        for octave in range(self.octaves):
+            # Skip octaves finer than the sampling rate so coarse tiles do not alias
+            if 1.0 / frequency < 2 * pixel_size and octave > 0:
+                break
+            total += amplitude * value_noise(xs * frequency, ys * frequency, self.seed + octave * 7919)
+            norm += amplitude
+            amplitude *= 0.5
+            frequency *= 2.0
+        total = total / norm * 2 - 1
+
+        dx = (xs - 0.5)[None, :]
+        dy = (ys - 0.5)[:, None]
+        falloff = (dx * dx + dy * dy) * 2.2
+        return total + 0.35 - falloff
+
+    def build_world(self) -> Dict[str, Any]:
+        """Global features computed once on a bounded overview grid"""
+        n = self.overview_size
+        coords = (np.arange(n) + 0.5) / n
+        overview = self.height(coords, coords, 1.0 / n)
+
+        cities = self._place_cities(overview)
+        rivers = self._trace_rivers(overview)
+        return {'cities': cities, 'rivers': rivers}
+
+    def _place_cities(self, overview: np.ndarray) -> List[Dict[str, Any]]:
+        """Voronoi seeds: well-separated lowland cells, each one a region capital"""
+        rng = np.random.default_rng(self.seed)
+        n = overview.shape[0]
+        land = np.argwhere((overview > 0.02) & (overview < 0.4))
+        if len(land) == 0:
+            land = np.argwhere(overview > 0)
+        rng.shuffle(land)
+
+        min_gap = 0.5 / np.sqrt(max(self.regions, 1))
+        chosen = []
+        for gap in (min_gap, min_gap / 2, 0.0):
+            for row, col in land:
+                point = np.array([(col + 0.5) / n, (row + 0.5) / n])
+                if all(np.hypot(*(point - other)) >= gap for other in chosen):
+                    chosen.append(point)
+                if len(chosen) >= self.regions:
+                    break
+            if len(chosen) >= self.regions:
+                break
+
+        cities = []
+        for i, (x, y) in enumerate(chosen):
+            name = ''.join(rng.choice(SYLLABLES, size=rng.integers(2, 4))).capitalize()
+            cities.append({'id': i, 'name': name, 'x': float(x), 'y': float(y)})
+        return cities
+
+    def _trace_rivers(self, overview: np.ndarray, threshold: float = 0.0015) -> np.ndarray:
+        """Rivers from D8 flow accumulation; returns segments (x0, y0, x1, y1, flow) in map units"""
+        n = overview.shape[0]
+        filled = _priority_flood(overview)
+
+        # D8 steepest descent on the depression-filled surface
+        padded = np.pad(filled, 1, constant_values=np.inf)
+        offsets = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+        drops = np.stack([
+            (filled - padded[1 + dy:1 + dy + n, 1 + dx:1 + dx + n]) / np.hypot(dy, dx)
+            for dy, dx in offsets
+        ])
+        best = drops.argmax(axis=0)
+        has_outlet = (drops.max(axis=0) > 0) & (overview > 0)
+
+        rows, cols = np.mgrid[0:n, 0:n]
+        offset_array = np.array(offsets)
+        down_row = rows + offset_array[best, 0]
+        down_col = cols + offset_array[best, 1]
+        receiver = np.where(has_outlet, down_row * n + down_col, -1).ravel()
+
+        accumulation = _flow_accumulation(receiver)
+        flow = accumulation / float(n * n)
+        source = np.flatnonzero((flow > threshold) & (receiver >= 0))
+        target = receiver[source]
+
+        scale = 1.0 / n
+        return np.stack([
+            (source % n + 0.5) * scale, (source // n + 0.5) * scale,
+            (target % n + 0.5) * scale, (target // n + 0.5) * scale,
+            flow[source]
+        ], axis=1)
+
+    # Tiles
+    def render_tile(self, world: Dict[str, Any], zoom: int, tx: int, ty: int) -> Image.Image:
+        """Render one tile directly from the continuous terrain model"""
+        size = self.tile_size
+        pixel = 1.0 / (size * 2 ** zoom)
+        # One pixel of halo on each side for shading and border detection
+        xs = (tx * size + np.arange(-1, size + 1) + 0.5) * pixel
+        ys = (ty * size + np.arange(-1, size + 1) + 0.5) * pixel
+        height = self.height(xs, ys, pixel)
+
+        rgb = np.stack([np.interp(height, HEIGHT_STOPS, COLOR_STOPS[:, c]) for c in range(3)], axis=-1)
+        land = height > 0
+
+        # Hillshade from the local gradient, scaled so relief reads at every zoom
+        gy, gx = np.gradient(height, pixel * 40)
+        shade = np.clip(1.0 - (gx - gy) * 0.35, 0.55, 1.25)
+        rgb = np.where(land[..., None], rgb * shade[..., None], rgb)
+
+        if world['cities']:
+            seeds = np.array([(c['x'], c['y']) for c in world['cities']])
+            dist = ((xs[None, :, None] - seeds[None, None, :, 0]) ** 2 +
+                    (ys[:, None, None] - seeds[None, None, :, 1]) ** 2)
+            region = dist.argmin(axis=2)
+            border = np.zeros_like(land)
+            border[:, :-1] |= region[:, :-1] != region[:, 1:]
+            border[:-1, :] |= region[:-1, :] != region[1:, :]
+            rgb[border & land] *= 0.45
+
+        coast = np.zeros_like(land)
+        coast[:, :-1] |= land[:, :-1] != land[:, 1:]
+        coast[:-1, :] |= land[:-1, :] != land[1:, :]
+        rgb[coast] = (40, 40, 40)
+
+        image = Image.fromarray(np.clip(rgb[1:-1, 1:-1], 0, 255).astype(np.uint8), 'RGB')
+        self._draw_vectors(image, world, zoom, tx, ty)
+        return image
+
+    def _draw_vectors(self, image: Image.Image, world: Dict[str, Any], zoom: int, tx: int, ty: int):
+        """Rivers, cities and names clipped to the tile"""
+        size = self.tile_size
+        scale = size * 2 ** zoom
+        left, top = tx * size, ty * size
+        draw = ImageDraw.Draw(image)
+
+        rivers = world['rivers']
+        if len(rivers):
+            # Small streams only appear once zoomed in
+            visible = rivers[:, 4] > 0.006 / 2 ** zoom
+            x0, y0 = rivers[visible, 0] * scale - left, rivers[visible, 1] * scale - top
+            x1, y1 = rivers[visible, 2] * scale - left, rivers[visible, 3] * scale - top
+            inside = ((np.maximum(x0, x1) >= -2) & (np.minimum(x0, x1) <= size + 2) &
+                      (np.maximum(y0, y1) >= -2) & (np.minimum(y0, y1) <= size + 2))
+            widths = np.clip(np.sqrt(rivers[visible, 4]) * 15 * 2 ** (zoom / 2), 1, 6)
+            for ax, ay, bx, by, w in zip(x0[inside], y0[inside], x1[inside], y1[inside], widths[inside]):
+                draw.line([(ax, ay), (bx, by)], fill=(60, 110, 190), width=int(round(w)))
+
+        label_size = max(10, 9 + zoom * 2)
+        for city in world['cities']:
+            cx, cy = city['x'] * scale - left, city['y'] * scale - top
+            if -40 <= cx <= size + 40 and -20 <= cy <= size + 20:
+                r = 2 + zoom // 2
+                draw.ellipse([cx - r, cy - r, cx + r, cy + r], fill=(150, 20, 20), outline='black')
+                if zoom >= 1:
+                    font_cache.draw_text(image, (cx + r + 3, cy), city['name'], label_size, 'black',
+                                         anchor='lm', draw=draw)
+
+    def generate(self, title: str = "World Map") -> Dict[str, Any]:
+        """Render the pyramid coarse-to-fine, publishing progress after each level"""
+        map_id = f"map_{datetime.now().strftime('%Y%m%d_%H%M%S%f')}"
+        map_dir = os.path.join(self.output_dir, map_id)
+        os.makedirs(map_dir, exist_ok=True)
+
+        world = self.build_world()
+        metadata = {
+            'id': map_id,
+            'title': title,
+            'seed': self.seed,
+            'world_size': self.world_size,
+            'tile_size': self.tile_size,
+            'max_zoom': self.max_zoom,
+            'levels_ready': 0,
+            'status': 'rendering',
+            'cities': world['cities'],
+            'river_segments': int(len(world['rivers'])),
+            'created_at': datetime.now().isoformat()
+        }
+        self._write_metadata(map_dir, metadata)
+
+        for zoom in range(self.max_zoom + 1):
+            tiles = 2 ** zoom
+            for tx in range(tiles):
+                column_dir = os.path.join(map_dir, 'tiles', str(zoom), str(tx))
+                os.makedirs(column_dir, exist_ok=True)
+                for ty in range(tiles):
+                    tile = self.render_tile(world, zoom, tx, ty)
+                    tile.save(os.path.join(column_dir, f"{ty}.png"), compress_level=1)
+            metadata['levels_ready'] = zoom + 1
+            self._write_metadata(map_dir, metadata)
+
+        metadata['status'] = 'completed'
+        self._write_metadata(map_dir, metadata)
+        return dict(metadata, path=map_dir)
+
+    def _write_metadata(self, map_dir: str, metadata: Dict[str, Any]):
+        # Write-then-rename so a viewer polling map.json never reads a partial file
+        path = os.path.join(map_dir, 'map.json')
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, indent=2)
+        os.replace(path + '.tmp', path)
+
+
+def _priority_flood(height: np.ndarray, epsilon: float = 1e-5) -> np.ndarray:
+    """Fill depressions so every land cell drains to the map edge or the sea"""
+    n_rows, n_cols = height.shape
+    filled = height.copy()
+    done = np.zeros(height.shape, dtype=bool)
+
+    heap = []
+    edge = np.zeros(height.shape, dtype=bool)
+    edge[[0, -1], :] = True
+    edge[:, [0, -1]] = True
+    for row, col in np.argwhere(edge | (height <= 0)):
+        heap.append((filled[row, col], row, col))
+        done[row, col] = True
+    heapq.heapify(heap)
+
+    flat = filled.tolist()
+    done_list = done.tolist()
+    while heap:
+        level, row, col = heapq.heappop(heap)
+        for nr, nc in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+            if 0 <= nr < n_rows and 0 <= nc < n_cols and not done_list[nr][nc]:
+                done_list[nr][nc] = True
+                if flat[nr][nc] <= level:
+                    flat[nr][nc] = level + epsilon
+                heapq.heappush(heap, (flat[nr][nc], nr, nc))
+    return np.array(flat)
+
+
+def _flow_accumulation(receiver: np.ndarray) -> np.ndarray:
+    """Upstream cell count per cell, processed in topological waves"""
+    accumulation = np.ones(len(receiver))
+    has_receiver = receiver >= 0
+    indegree = np.bincount(receiver[has_receiver], minlength=len(receiver))
+    frontier = np.flatnonzero(indegree == 0)
+
+    while len(frontier):
+        frontier = frontier[has_receiver[frontier]]
+        targets = receiver[frontier]
+        np.add.at(accumulation, targets, accumulation[frontier])
+        np.subtract.at(indegree, targets, 1)
+        unique_targets = np.unique(targets)
+        frontier = unique_targets[indegree[unique_targets] == 0]
+    return accumulation
@@ -0,0 +1,371 @@
+# src/processing/manuscript_analyzer.py
+
+import os
+import re
+import threading
+from itertools import repeat
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+
+try:
+    from processing.text_stats import StreamingTextStats, SENTENCE_END, STOP_WORDS, count_syllables
+except ImportError:
+    from src.processing.text_stats import StreamingTextStats, SENTENCE_END, STOP_WORDS, count_syllables
+
+try:
+    from generation.text_engine import SEED_CORPUS
+except ImportError:
+    try:
+        from src.generation.text_engine import SEED_CORPUS
+    except ImportError:
+        SEED_CORPUS = ''
+
+# Words (letters in any script), or runs of anything else that isn't whitespace
+# (punctuation ends phrases and negation scope); only words fill the capture group
+TOKEN = re.compile(r"([^\W\d_]+(?:'[^\W\d_]+)*)|(?:[\d_]|[^\w\s'])+")
+BREAK = '<break>'
+
+NEGATIONS = frozenset("not no never nor none nobody nothing neither nowhere without hardly barely".split())
+NEGATION_SCOPE = 3
+NEGATION_FLIP = -0.5
+
+# Compact general-purpose sentiment lexicon; the second word list in each pair carries double weight
+POSITIVE = """
+good fine nice glad happy happily joy joyful pleased pleasant love loved lovely loving kind kindly gentle warm
+warmth calm peace peaceful safe hope hopeful bright smile smiled smiling laugh laughed laughing laughter sweet
+beautiful pretty friend friendly trust trusted brave courage proud pride free freedom win won victory success
+successful comfort comfortable grateful thank thanks thankful gift bless blessed heal healed healing alive
+fortunate lucky better best wise clever gentle tender delight delighted enjoy enjoyed fun funny generous
+honest fair faithful loyal strong strength admire admired charming cheerful cheer eager easy relief relieved
+rescue rescued soft triumph true truth welcome welcomed wonder wonderful worth promise promised dear
+""", """
+wonderful excellent amazing brilliant glorious perfect magnificent beloved adore adored ecstatic thrilled
+marvelous splendid radiant blissful overjoyed
+"""
+NEGATIVE = """
+bad sad sadly sorrow sorry grief grieve pain painful hurt hurting cry cried crying tears tear fear feared afraid
+scared fright frightened angry anger rage hate hated hating cruel cold dark darkness alone lonely lost lose losing
+loss fail failed failure weak wrong guilt guilty shame ashamed blame blood bleed bleeding wound wounded sick ill
+death dead die died dying kill killed grave danger dangerous threat threatened worry worried anxious nervous
+trouble troubled broken break bitter harsh ugly poor hungry tired weary doubt lie lied liar enemy war fight fought
+attack attacked scream screamed strange empty cursed curse storm gloom grim heavy regret despair desperate
+suffer suffering ruin ruined betray betrayed
+""", """
+terrible horrible awful dreadful hideous horror horrified terror terrified agony miserable misery murder
+murdered evil wicked disaster tragic tragedy devastated hopeless
+"""
+
+
+def _lexicon() -> Dict[str, float]:
+    weights = {}
+    for sign, (words, strong) in ((1.0, POSITIVE), (-1.0, NEGATIVE)):
+        weights.update((word, sign) for word in words.split())
+        weights.update((word, 2 * sign) for word in strong.split())
+    return weights
+
+
+LEXICON = _lexicon()
+
+
+def _tokenize(text: str) -> List[str]:
+    return [word or BREAK for word in TOKEN.findall(text.lower())]
+
+
+class CorpusVocabulary:
+    """Document frequencies over a reference corpus, used as the IDF side of TF-IDF.
+
+    Each paragraph of the built-in seed corpus and of every .txt file in corpus_dir
+    counts as one document.
+    """
+
+    def __init__(self, corpus_dir: str = "training_data/text"):
+        self.corpus_dir = corpus_dir
+        self.fingerprint = self._fingerprint(corpus_dir)
+        self.df: Dict[str, int] = {}
+        self.documents = 0
+        for document in self._documents():
+            self.documents += 1
+            for term in set(_tokenize(document)):
+                self.df[term] = self.df.get(term, 0) + 1
+        self.df.pop(BREAK, None)
+
+    @staticmethod
+    def _fingerprint(corpus_dir: str) -> Tuple:
+        if not os.path.isdir(corpus_dir):
+            return ()
+        return tuple((entry.name, entry.stat().st_size, entry.stat().st_mtime)
+                     for entry in sorted(os.scandir(corpus_dir), key=lambda e: e.name)
+                     if entry.name.endswith('.txt'))
+
+    def _documents(self):
+        texts = [SEED_CORPUS]
+        for name, _, _ in self.fingerprint:
+            with open(os.path.join(self.corpus_dir, name), 'r', encoding='utf-8', errors='ignore') as f:
+                texts.append(f.read())
+        for text in texts:
+            for paragraph in re.split(r'\n\s*\n', text):
+                if paragraph.strip():
+                    yield paragraph
+
+    def idf(self, terms: List[str]) -> np.ndarray:
+        """Smoothed IDF; terms the corpus has never seen get the maximum weight"""
+        df = np.fromiter((self.df.get(term, 0) for term in terms), dtype=np.float64, count=len(terms))
+        return np.log((1 + self.documents) / (1 + df)) + 1.0
+
+
+_vocabularies: Dict[str, CorpusVocabulary] = {}
+_vocabulary_lock = threading.Lock()
+
+
+def get_vocabulary(corpus_dir: str = "training_data/text") -> CorpusVocabulary:
+    """Cached vocabulary, rebuilt only when the corpus files change"""
+    with _vocabulary_lock:
+        vocabulary = _vocabularies.get(corpus_dir)
+        if vocabulary is None or vocabulary.fingerprint != CorpusVocabulary._fingerprint(corpus_dir):
+            vocabulary = _vocabularies[corpus_dir] = CorpusVocabulary(corpus_dir)
+        return vocabulary
+
+
+class ManuscriptAnalysis(StreamingTextStats):
+    """Readability, TF-IDF topics and key phrases, and lexicon sentiment over a text stream.
+
+    Each chunk is tokenized once and mapped to integer term ids; everything after
+    that is array arithmetic over per-term feature tables (syllables, letters,
+    sentiment weight, negation, content word). Memory is bounded however large
+    or varied the stream: the first max_terms distinct terms get ids, later new
+    terms share one overflow id (their readability features are summed directly
+    and topic candidates kept in Misra-Gries counters), the bigram table is pruned
+    when it outgrows max_bigrams, and the sentiment arc halves its resolution
+    rather than growing past MAX_ARC_BINS.
+    """
+
+    ARC_SEGMENTS = 10
+    ARC_BIN = 1000
+    MAX_ARC_BINS = 2048
+    OVERFLOW = 1
+
+    def __init__(self, vocabulary: Optional[CorpusVocabulary] = None, max_terms: int = 50000,
+                 max_bigrams: int = 100000, overflow_topics: int = 2000):
+        super().__init__(topic_capacity=overflow_topics)
+        self.vocabulary = vocabulary or get_vocabulary()
+        self.max_terms = max_terms
+        self.max_bigrams = max_bigrams
+        self.index: Dict[str, int] = {}
+        self.terms: List[str] = []
+        self.tables = {
+            'syllables': np.zeros(0, dtype=np.int64),
+            'letters': np.zeros(0, dtype=np.int64),
+            'weight': np.zeros(0, dtype=np.float64),
+            'negation': np.zeros(0, dtype=bool),
+            'content': np.zeros(0, dtype=bool)
+        }
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.bigrams: Dict[int, int] = {}
+        self.tail = np.zeros(0, dtype=np.int64)
+        self.arc: List[Tuple[int, float]] = []
+        self.arc_bin = self.ARC_BIN
+        self.positive = 0.0
+        self.negative = 0.0
+        self.overflow = {'syllables': 0, 'letters': 0, 'polysyllables': 0}
+        # Sentiment and negation words always get their own ids, so overflow never hides them
+        self._add_terms([BREAK, '<overflow>'] + sorted(set(LEXICON) | NEGATIONS))
+
+    def _add_terms(self, terms: List[str]):
+        """Give new terms ids and their feature rows, growing the tables geometrically"""
+        start = len(self.terms)
+        end = start + len(terms)
+        if end > len(self.counts):
+            size = max(end, 2 * len(self.counts), 1024)
+            for name, table in self.tables.items():
+                grown = np.zeros(size, dtype=table.dtype)
+                grown[:start] = table[:start]
+                self.tables[name] = grown
+            counts = np.zeros(size, dtype=np.int64)
+            counts[:start] = self.counts[:start]
+            self.counts = counts
+
+        words = [term if term[0] != '<' else '' for term in terms]
+        tables = self.tables
+        tables['syllables'][start:end] = [count_syllables(word) if word else 0 for word in words]
+        tables['letters'][start:end] = [len(word.replace("'", '')) for word in words]
+        tables['weight'][start:end] = [LEXICON.get(word, 0.0) for word in words]
+        tables['negation'][start:end] = [word in NEGATIONS or word.endswith("n't") for word in words]
+        tables['content'][start:end] = [len(word) > 2 and word not in STOP_WORDS for word in words]
+        for term_id, term in enumerate(terms, start):
+            self.index[term] = term_id
+        self.terms.extend(terms)
+
+    def _count(self, text: str):
+        self.sentences += len(SENTENCE_END.findall(text))
+        tokens = _tokenize(text)
+        if not tokens:
+            return
+        index = self.index
+        room = self.max_terms - len(self.terms)
+        if room > 0:
+            # First-appearance order keeps ids, and so tie-breaks, independent of hash seeds
+            new = [term for term in dict.fromkeys(tokens) if term not in index]
+            if new:
+                self._add_terms(new[:room])
+        ids = np.fromiter(map(index.get, tokens, repeat(self.OVERFLOW)), dtype=np.int64, count=len(tokens))
+        self.counts += np.bincount(ids, minlength=len(self.counts))
+
+        if len(self.terms) >= self.max_terms:
+            self._count_overflow([tokens[i] for i in np.flatnonzero(ids == self.OVERFLOW)])
+
+        # Prepend the previous chunk's last tokens so negation and bigrams cross chunk boundaries
+        window = np.concatenate([self.tail, ids])
+        self._score_sentiment(window, len(self.tail))
+        self._count_bigrams(window[max(0, len(self.tail) - 1):])
+        self.tail = ids[-NEGATION_SCOPE:]
+
+    def _count_overflow(self, words: List[str]):
+        """Terms beyond max_terms: readability sums and approximate topic counts only"""
+        overflow = self.overflow
+        for word in words:
+            syllables = count_syllables(word)
+            overflow['syllables'] += syllables
+            overflow['letters'] += len(word) - word.count("'")
+            if syllables >= 3:
+                overflow['polysyllables'] += 1
+            if len(word) > 2 and word not in STOP_WORDS:
+                self.topics.add(word)
+
+    def _score_sentiment(self, window: np.ndarray, skip: int):
+        weight = self.tables['weight'][window]
+        negation = self.tables['negation'][window]
+        is_break = window == 0
+        # A negator flips the next few words, up to the next punctuation
+        negated = np.zeros(len(window), dtype=bool)
+        reach = negation
+        for _ in range(NEGATION_SCOPE):
+            reach = np.concatenate([[False], reach[:-1]]) & ~is_break
+            negated |= reach
+        scores = np.where(negated, weight * NEGATION_FLIP, weight)[skip:]
+        self.positive += float(scores[scores > 0].sum())
+        self.negative -= float(scores[scores < 0].sum())
+        # Per-bin totals are all the sentiment arc needs to keep; top up the last partial bin first
+        if self.arc and self.arc[-1][0] < self.arc_bin:
+            size, total = self.arc[-1]
+            fill = min(self.arc_bin - size, len(scores))
+            self.arc[-1] = (size + fill, total + float(scores[:fill].sum()))
+            scores = scores[fill:]
+        if not len(scores):
+            return
+        starts = np.arange(0, len(scores), self.arc_bin)
+        sizes = np.diff(np.append(starts, len(scores)))
+        self.arc.extend(zip(sizes.tolist(), np.add.reduceat(scores, starts).tolist()))
+        if len(self.arc) > self.MAX_ARC_BINS:
+            # Merge neighbouring bins; later bins are twice as wide
+            self.arc = [(a[0] + b[0], a[1] + b[1]) if b else a
+                        for a, b in zip(self.arc[::2], self.arc[1::2] + [None])]
+            self.arc_bin *= 2
+
+    def _count_bigrams(self, ids: np.ndarray):
+        content = self.tables['content'][ids]
+        pairs = content[:-1] & content[1:]
+        codes = (ids[:-1][pairs] << 32) | ids[1:][pairs]
+        if not len(codes):
+            return
+        codes, counts = np.unique(codes, return_counts=True)
+        bigrams = self.bigrams
+        for code, count in zip(codes.tolist(), counts.tolist()):
+            bigrams[code] = bigrams.get(code, 0) + count
+        if len(bigrams) > self.max_bigrams:
+            # Drop the rarest pairs until the table is back under half its limit
+            threshold = 1
+            while len(bigrams) > self.max_bigrams // 2:
+                bigrams = {code: count for code, count in bigrams.items() if count > threshold}
+                threshold += 1
+            self.bigrams = bigrams
+
+    def result(self, topics: int = 10) -> Dict[str, Any]:
+        used = len(self.terms)
+        counts = self.counts[:used]
+        syllables = self.tables['syllables'][:used]
+        overflow = self.overflow
+        self.words = int(counts[1:].sum())
+        self.syllables = int(counts @ syllables) + overflow['syllables']
+        self.letters = int(counts @ self.tables['letters'][:used]) + overflow['letters']
+        self.polysyllables = int(counts[syllables >= 3].sum()) + overflow['polysyllables']
+        result = super().result(topics)
+
+        terms, term_counts, scores = self._topic_scores()
+        order = sorted(np.argsort(-scores, kind='stable')[:4 * topics], key=lambda i: (-scores[i], terms[i]))[:topics]
+        result['topics'] = [terms[i] for i in order]
+        result['topic_counts'] = {terms[i]: int(term_counts[i]) for i in order}
+        result['topic_scores'] = {terms[i]: round(float(scores[i]), 3) for i in order}
+        result['key_phrases'] = self._key_phrases(terms, scores, topics)
+        result.update(self._sentiment())
+        return result
+
+    def _topic_scores(self) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """Sublinear TF times corpus IDF for every content word, plus the overflow's heavy hitters"""
+        used = len(self.terms)
+        content = np.flatnonzero(self.tables['content'][:used] & (self.counts[:used] > 0))
+        terms = [self.terms[i] for i in content] + list(self.topics.counts)
+        if not terms:
+            return [], np.zeros(0), np.zeros(0)
+        counts = np.concatenate([self.counts[content], np.fromiter(self.topics.counts.values(), dtype=np.int64)])
+        return terms, counts, (1.0 + np.log(counts)) * self.vocabulary.idf(terms)
+
+    def _key_phrases(self, terms: List[str], scores: np.ndarray, limit: int) -> List[str]:
+        """Repeated two-word phrases and single terms ranked together; words inside a chosen phrase aren't repeated"""
+        candidates = list(zip(terms, scores.tolist()))
+        repeated = [(code, count) for code, count in self.bigrams.items() if count > 1]
+        if repeated:
+            codes = np.array([code for code, _ in repeated], dtype=np.int64)
+            counts = np.array([count for _, count in repeated], dtype=np.float64)
+            left, right = codes >> 32, codes & 0xFFFFFFFF
+            idf = self.vocabulary.idf([self.terms[i] for i in np.concatenate([left, right])])
+            bigram_scores = (1.0 + np.log(counts)) * (idf[:len(codes)] + idf[len(codes):]) / 2
+            top = np.argsort(-bigram_scores, kind='stable')[:limit]
+            candidates += [(f"{self.terms[left[i]]} {self.terms[right[i]]}", float(bigram_scores[i])) for i in top]
+
+        phrases, covered = [], set()
+        for phrase, _ in sorted(candidates, key=lambda item: (-item[1], item[0])):
+            words = phrase.split()
+            if len(words) == 1 and phrase in covered:
+                continue
+            phrases.append(phrase)
+            covered.update(words)
+            if len(phrases) == limit:
+                break
+        return phrases
+
+    def _sentiment(self) -> Dict[str, Any]:
+        total = self.positive + self.negative
+        score = (self.positive - self.negative) / (total + 1.0)
+        if score > 0.1:
+            label, confidence = 'positive', self.positive / total
+        elif score < -0.1:
+            label, confidence = 'negative', self.negative / total
+        else:
+            label, confidence = 'neutral', 1.0 - abs(score)
+        return {
+            'sentiment': label,
+            'sentiment_score': round(score, 3),
+            'confidence': round(confidence, 3),
+            'positive_weight': round(self.positive, 1),
+            'negative_weight': round(self.negative, 1),
+            'sentiment_arc': self._sentiment_arc()
+        }
+
+    def _sentiment_arc(self) -> List[float]:
+        """Average sentiment per token for equal tenths of the text"""
+        if not self.arc:
+            return []
+        tokens = np.array([size for size, _ in self.arc], dtype=np.float64)
+        scores = np.array([score for _, score in self.arc])
+        middle = np.cumsum(tokens) - tokens / 2
+        segments = np.minimum((middle * self.ARC_SEGMENTS / tokens.sum()).astype(int), self.ARC_SEGMENTS - 1)
+        totals = np.bincount(segments, weights=scores, minlength=self.ARC_SEGMENTS)
+        sizes = np.bincount(segments, weights=tokens, minlength=self.ARC_SEGMENTS)
+        return [round(float(value), 4) for value, size in zip(totals / np.maximum(sizes, 1), sizes) if size]
+
+
+def analyze_text(text: str, topics: int = 10) -> Dict[str, Any]:
+    """Full analysis of an in-memory text"""
+    analysis = ManuscriptAnalysis()
+    analysis.feed(text)
+    return analysis.close().result(topics)
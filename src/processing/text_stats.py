@@ -0,0 +1,149 @@
+# src/processing/text_stats.py
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, List, Any, Tuple
+
+# Letters in any script: word characters other than digits and underscore
+WORD = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)*")
+SENTENCE_END = re.compile(r"[.!?]+(?=[\s\"')\]]|$)")
+
+STOP_WORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below between both
+but by can could did do does doing down during each few for from further had has have having he her here hers
+herself him himself his how i if in into is it its itself just me more most my myself no nor not now of off on
+once only or other our ours ourselves out over own same she should so some such than that the their theirs them
+themselves then there these they this those through to too under until up very was we were what when where which
+while who whom why will with would you your yours yourself yourselves said says one two also back like get got
+went go going come came know knew see saw made make much many even still way well us let upon
+""".split())
+
+# Flesch-Kincaid grade bands
+GRADE_LABELS = [(5, 'elementary'), (8, 'middle_school'), (12, 'high_school'), (16, 'college')]
+
+
+@lru_cache(maxsize=65536)
+def count_syllables(word: str) -> int:
+    """Vowel-group estimate with the usual silent-e and -le/-es/-ed corrections"""
+    word = word.lower().replace("'", '')
+    if not word.isascii():
+        # Strip accents so é, ï and friends count as vowels
+        word = ''.join(c for c in unicodedata.normalize('NFKD', word) if not unicodedata.combining(c))
+    if len(word) <= 3:
+        return 1
+    if word.endswith('le') and len(word) > 2 and word[-3] not in 'aeiouy':
+        stem, extra = word[:-2], 1
+    elif word.endswith(('es', 'ed')) and not word.endswith(('ted', 'ded', 'ses', 'zes', 'ces', 'ges')):
+        stem, extra = word[:-2], 0
+    elif word.endswith('e'):
+        stem, extra = word[:-1], 0
+    else:
+        stem, extra = word, 0
+    groups = len(re.findall(r'[aeiouy]+', stem))
+    return max(1, groups + extra)
+
+
+def grade_label(grade: float) -> str:
+    for limit, label in GRADE_LABELS:
+        if grade < limit:
+            return label
+    return 'graduate'
+
+
+class TopTerms:
+    """Misra-Gries heavy hitters: approximate top terms in a fixed number of counters"""
+
+    def __init__(self, capacity: int = 2000):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+
+    def add(self, term: str):
+        counts = self.counts
+        if term in counts:
+            counts[term] += 1
+        elif len(counts) < self.capacity:
+            counts[term] = 1
+        else:
+            # Decrement everyone; terms that reach zero make room
+            for key in list(counts):
+                counts[key] -= 1
+                if counts[key] == 0:
+                    del counts[key]
+
+    def top(self, n: int = 10) -> List[Tuple[str, int]]:
+        return sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))[:n]
+
+
+class StreamingTextStats:
+    """Word, character, sentence, readability and topic statistics fed one chunk at a time.
+
+    Only the unfinished last token of each chunk is carried over, so memory stays
+    bounded by the chunk size and the fixed-size topic counters, not the document.
+    """
+
+    MAX_CARRY = 1 << 16
+
+    def __init__(self, topic_capacity: int = 2000):
+        self.characters = 0
+        self.words = 0
+        self.sentences = 0
+        self.syllables = 0
+        self.polysyllables = 0
+        self.letters = 0
+        self.topics = TopTerms(topic_capacity)
+        self.carry = ''
+
+    def feed(self, chunk: str):
+        self.characters += len(chunk)
+        text = self.carry + chunk
+        # Hold back everything after the last whitespace; it may continue in the next chunk
+        cut = max(text.rfind(' '), text.rfind('\n'), text.rfind('\t'))
+        if cut < 0 and len(text) < self.MAX_CARRY:
+            self.carry = text
+            return
+        if cut < 0:
+            cut = len(text) - 1
+        self.carry = text[cut + 1:]
+        self._count(text[:cut + 1])
+
+    def close(self) -> 'StreamingTextStats':
+        if self.carry:
+            self._count(self.carry)
+            self.carry = ''
+        return self
+
+    def _count(self, text: str):
+        self.sentences += len(SENTENCE_END.findall(text))
+        for word in WORD.findall(text):
+            self.words += 1
+            self.letters += len(word)
+            syllables = count_syllables(word)
+            self.syllables += syllables
+            if syllables >= 3:
+                self.polysyllables += 1
+            lower = word.lower()
+            if len(lower) > 2 and lower not in STOP_WORDS:
+                self.topics.add(lower)
+
+    def result(self, topics: int = 10) -> Dict[str, Any]:
+        words = max(1, self.words)
+        # A text without terminal punctuation still counts as one sentence
+        sentences = max(1, self.sentences)
+        words_per_sentence = self.words / sentences
+        syllables_per_word = self.syllables / words
+        grade = 0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59
+        return {
+            'word_count': self.words,
+            'character_count': self.characters,
+            'sentence_count': self.sentences,
+            'average_word_length': round(self.letters / words, 2),
+            'average_sentence_length': round(words_per_sentence, 2),
+            'syllables_per_word': round(syllables_per_word, 3),
+            'flesch_reading_ease': round(206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word, 1),
+            'flesch_kincaid_grade': round(grade, 1),
+            'gunning_fog': round(0.4 * (words_per_sentence + 100 * self.polysyllables / words), 1),
+            'grade_level': grade_label(grade),
+            'topics': [term for term, _ in self.topics.top(topics)],
+            'topic_counts': dict(self.topics.top(topics))
+        }